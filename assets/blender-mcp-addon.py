@@ -2,16 +2,30 @@
 
 import bpy
 import mathutils
+import numpy as np
+import bisect
+import hashlib
+import itertools
 import json
 import threading
 import socket
 import time
+from collections import OrderedDict, deque
 import requests
 import tempfile
 import traceback
 import os
+import sys
+import types as _types
+import re
 import shutil
+import stat
+import struct
+import base64
+import zlib
+import uuid
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from bpy.props import StringProperty, IntProperty, BoolProperty, EnumProperty
 import io
 from contextlib import redirect_stdout, suppress
@@ -32,14 +46,1801 @@ RODIN_FREE_TRIAL_KEY = "k9TcfFoEhNd9cCPP2guHAHHHkctZHIRhZDywZ1euGUXwihbYLpOjQhof
 REQ_HEADERS = requests.utils.default_headers()
 REQ_HEADERS.update({"User-Agent": "blender-mcp"})
 
+# Remote API roots; override through the environment to point at a local stand-in
+POLYHAVEN_API_URL = os.environ.get("BLENDERMCP_POLYHAVEN_API_URL", "https://api.polyhaven.com")
+SKETCHFAB_API_URL = os.environ.get("BLENDERMCP_SKETCHFAB_API_URL", "https://api.sketchfab.com/v3")
+RODIN_API_URL = os.environ.get("BLENDERMCP_RODIN_API_URL", "https://hyperhuman.deemos.com/api/v2")
+FAL_AI_RODIN_URL = os.environ.get("BLENDERMCP_FAL_AI_RODIN_URL", "https://queue.fal.run/fal-ai/hyper3d")
+
+# Wire framings a connection can negotiate with the "hello" command.
+# "legacy" is the original protocol: bare JSON objects back to back.
+FRAMING_LEGACY = "legacy"
+FRAMING_NDJSON = "ndjson"
+FRAMING_LENGTH = "length"
+SUPPORTED_FRAMINGS = (FRAMING_LEGACY, FRAMING_NDJSON, FRAMING_LENGTH)
+
+PROTOCOL_VERSION = 3
+LISTEN_BACKLOG = 16
+
+# Local clients skip the TCP stack through this Unix domain socket when the
+# platform has one; the TCP listener keeps running next to it
+UNIX_SOCKETS_SUPPORTED = hasattr(socket, "AF_UNIX")
+DEFAULT_UNIX_SOCKET_PATH = os.environ.get(
+    "BLENDERMCP_SOCKET",
+    os.path.join(tempfile.gettempdir(), "blendermcp.sock"),
+)
+MAX_FRAME_SIZE = 512 * 1024 * 1024  # Refuse single commands larger than 512 MB
+
+# Reply compression a connection can negotiate with "hello". A compressed
+# reply is a small header message followed by compressed_length raw bytes.
+COMPRESSION_NONE = "none"
+COMPRESSION_ZLIB = "zlib"
+SUPPORTED_COMPRESSIONS = (COMPRESSION_NONE, COMPRESSION_ZLIB)
+DEFAULT_COMPRESSION_THRESHOLD = 16 * 1024  # Smaller replies are not worth the CPU
+DEFAULT_COMPRESSION_LEVEL = 1  # Fastest level; JSON still shrinks several times
+
+# Main-thread command queue defaults
+DEFAULT_QUEUE_SIZE = 256
+DEFAULT_TICK_BUDGET_MS = 20
+QUEUE_IDLE_INTERVAL = 0.01  # Seconds between drain ticks while the queue is empty
+
+# Commands carry an optional "priority"; classes are served in this order
+COMMAND_PRIORITIES = ("high", "normal", "low")
+DEFAULT_COMMAND_PRIORITY = "normal"
+CLIENT_QUEUE_SHARE = 0.75  # Largest fraction of the queue a single client may fill
+
+# Background download jobs
+JOB_WORKERS = 4
+MAX_FINISHED_JOBS = 200  # Finished jobs kept around for get_job_status
+
+# Parallel file downloads within one asset (texture maps, glTF includes)
+DOWNLOAD_WORKERS = 8
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Server-side polling of submitted Hyper3D Rodin generations
+RODIN_POLL_MIN_INTERVAL = 1.0  # Seconds before the first status request
+RODIN_POLL_MAX_INTERVAL = 10.0
+RODIN_POLL_BACKOFF = 1.5  # Interval growth per poll while the job is still running
+RODIN_POLL_ERROR_INTERVAL = 60.0  # Upper bound while status requests keep failing
+RODIN_POLL_MAX_ERRORS = 5  # Consecutive failed requests before the watch gives up
+RODIN_POLL_REQUEST_TIMEOUT = 15
+RODIN_POLL_TIMEOUT = 30 * 60  # Generations still running after this are reported failed
+FAL_AI_FAILED_STATES = ("FAILED", "ERROR", "CANCELLED")  # fal.ai queue states that will not complete
+MAX_FINISHED_RODIN_WATCHES = 100
+
+# Persistent asset cache shared by every remote import
+DEFAULT_CACHE_DIR = os.environ.get(
+    "BLENDERMCP_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "blendermcp", "assets"),
+)
+DEFAULT_CACHE_SIZE_MB = 2048
+
+# Download progress and archive extraction
+PROGRESS_EVENT_INTERVAL = 0.5  # Minimum seconds between job_progress events
+MAX_ARCHIVE_ENTRY_BYTES = 2 * 1024 * 1024 * 1024
+MAX_ARCHIVE_TOTAL_BYTES = 4 * 1024 * 1024 * 1024
+MAX_ARCHIVE_ENTRIES = 10000
+
+# Poly Haven listing kept on disk for searches
+DEFAULT_CATALOG_TTL = 6 * 60 * 60  # Seconds before the listing is revalidated
+
+# Scene change feed
+MAX_SCENE_TOMBSTONES = 10000  # Removed objects remembered for get_scene_changes
+DEFAULT_SCENE_PAGE_SIZE = 500
+
+# get_mesh_buffers: arrays sent as one raw payload after the JSON reply
+MESH_BUFFER_ATTRIBUTES = ("positions", "normals", "loops", "polygons", "uvs")
+BINARY_ALIGNMENT = 16  # Every array starts on a multiple of this many bytes
+
+# query_objects columns; the numeric ones are computed for all objects at once
+QUERY_OBJECT_FIELDS = (
+    "location", "rotation", "scale", "matrix_world", "world_aabb",
+    "parent", "collections", "vertex_count", "polygon_count", "materials",
+)
+DEFAULT_QUERY_OBJECT_FIELDS = ("location", "rotation", "scale", "world_aabb")
+BOUNDLESS_OBJECT_TYPES = {"EMPTY", "LIGHT", "CAMERA", "SPEAKER", "LIGHT_PROBE"}
+
+# Imported images carry their content hash in this custom property, so an
+# identical map is reused (and packed once) instead of loaded again
+IMAGE_HASH_PROPERTY = "blendermcp_sha256"
+# A texture's material records its asset id and {map type: content hash};
+# a reused map keeps the name it got under the asset that loaded it first
+TEXTURE_ASSET_PROPERTY = "blendermcp_texture"
+TEXTURE_MAPS_PROPERTY = "blendermcp_texture_maps"
+
+# In-memory viewport captures
+VIEWPORT_CACHE_SIZE = 8  # Encoded captures kept, keyed by scene state and view
+PNG_COMPRESS_LEVEL = 3
+
+# get_metrics histogram buckets (upper bounds; a final +Inf bucket is implied)
+LATENCY_BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+SIZE_BUCKETS_BYTES = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216, 67108864, 268435456)
+
+# execute_code compiled-code cache and named sessions
+CODE_CACHE_SIZE = 256  # Compiled blocks kept, keyed by source hash
+MAX_CODE_SESSIONS = 16
+DEFAULT_SESSION_MEMORY_MB = 256
+
+# execute_code output: reply size cap and stdout/progress event batching
+DEFAULT_MAX_OUTPUT_CHARS = 256 * 1024
+STREAM_FLUSH_CHARS = 8192
+STREAM_FLUSH_INTERVAL = 0.25  # Seconds between stdout events while output trickles in
+PROGRESS_MIN_INTERVAL = 0.05  # Seconds between progress events; the final 1.0 always goes out
+
+class FramingError(Exception):
+    """Raised when a client sends bytes that cannot be framed"""
+    pass
+
+class FrameDecoder:
+    """Incremental decoder that splits a byte stream into command payloads.
+
+    Every byte is scanned once, no matter how many recv() calls a frame spans,
+    and any number of pipelined frames can sit in the buffer at once.
+    """
+
+    # Characters that matter while scanning a bare JSON object
+    _LEGACY_TOKENS = re.compile(rb'[{}"]')
+    _STRING_TOKENS = re.compile(rb'["\\]')
+    _NON_WHITESPACE = re.compile(rb'[^ \t\r\n]')
+
+    def __init__(self, framing=FRAMING_LEGACY, max_frame_size=MAX_FRAME_SIZE):
+        self.buffer = bytearray()
+        self.max_frame_size = max_frame_size
+        self.framing = framing
+        self._reset_scan()
+
+    def _reset_scan(self):
+        self._scan_pos = 0
+        self._depth = 0
+        self._in_string = False
+
+    def set_framing(self, framing):
+        """Switch framing for all bytes that have not been consumed yet"""
+        if framing not in SUPPORTED_FRAMINGS:
+            raise FramingError(f"Unsupported framing: {framing}")
+        self.framing = framing
+        self._reset_scan()
+
+    def feed(self, data):
+        self.buffer += data
+
+    def next_frame(self):
+        """Return the next complete payload as bytes, or None if more data is needed"""
+        if self.framing == FRAMING_NDJSON:
+            return self._next_ndjson_frame()
+        if self.framing == FRAMING_LENGTH:
+            return self._next_length_frame()
+        return self._next_legacy_frame()
+
+    def _take(self, end, skip=0):
+        payload = bytes(self.buffer[:end])
+        del self.buffer[:end + skip]
+        self._reset_scan()
+        return payload
+
+    def _check_size(self, size):
+        if size > self.max_frame_size:
+            raise FramingError(f"Frame of {size} bytes exceeds limit of {self.max_frame_size} bytes")
+
+    def _next_ndjson_frame(self):
+        while True:
+            newline = self.buffer.find(b'\n', self._scan_pos)
+            if newline < 0:
+                self._scan_pos = len(self.buffer)
+                self._check_size(len(self.buffer))
+                return None
+            payload = self._take(newline, skip=1)
+            if payload.strip():
+                return payload
+
+    def _next_length_frame(self):
+        if len(self.buffer) < 4:
+            return None
+        (size,) = struct.unpack(">I", self.buffer[:4])
+        self._check_size(size)
+        if len(self.buffer) < 4 + size:
+            return None
+        del self.buffer[:4]
+        return self._take(size)
+
+    def _next_legacy_frame(self):
+        buffer = self.buffer
+        pos = self._scan_pos
+
+        # Skip whitespace between objects (some clients append a newline)
+        if self._depth == 0:
+            match = self._NON_WHITESPACE.search(buffer, pos)
+            if not match:
+                buffer.clear()
+                self._reset_scan()
+                return None
+            if match.start() > 0:
+                del buffer[:match.start()]
+                pos = 0
+            if buffer[0:1] != b'{':
+                raise FramingError("Expected a JSON object")
+
+        while True:
+            if self._in_string:
+                match = self._STRING_TOKENS.search(buffer, pos)
+                if not match:
+                    pos = len(buffer)
+                    break
+                if match.group() == b'\\':
+                    if match.end() >= len(buffer):
+                        # Escape split across recv() calls, resume at the backslash
+                        pos = match.start()
+                        break
+                    pos = match.end() + 1
+                    continue
+                self._in_string = False
+                pos = match.end()
+                continue
+
+            match = self._LEGACY_TOKENS.search(buffer, pos)
+            if not match:
+                pos = len(buffer)
+                break
+            token = match.group()
+            pos = match.end()
+            if token == b'"':
+                self._in_string = True
+            elif token == b'{':
+                self._depth += 1
+            else:
+                self._depth -= 1
+                if self._depth == 0:
+                    return self._take(pos)
+
+        self._scan_pos = pos
+        self._check_size(len(buffer))
+        return None
+
+def encode_frame(payload, framing):
+    """Encode a response payload (bytes) for the given framing"""
+    if framing == FRAMING_NDJSON:
+        return payload + b'\n'
+    if framing == FRAMING_LENGTH:
+        return struct.pack(">I", len(payload)) + payload
+    return payload
+
+class ClientConnection:
+    """Per-connection state: socket, negotiated framing and a send lock"""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, sock, address=None, transport="tcp"):
+        self.id = next(self._ids)
+        self.sock = sock
+        self.address = address
+        self.transport = transport
+        self.connected_at = time.time()
+        self.stats = {
+            "enqueued": 0, "executed": 0, "rejected_busy": 0, "execute_ms": 0.0, "bytes_sent": 0,
+            "compressed_replies": 0, "compress_bytes_in": 0, "compress_bytes_out": 0, "compress_ms": 0.0,
+        }
+        self.decoder = FrameDecoder()
+        self.framing = FRAMING_LEGACY
+        self.compression = COMPRESSION_NONE
+        self.compression_threshold = DEFAULT_COMPRESSION_THRESHOLD
+        self.compression_level = DEFAULT_COMPRESSION_LEVEL
+        self.send_lock = threading.Lock()
+        self.open = True
+        self.negotiated = False  # Set once the client has sent "hello"
+        # Queued commands whose reply has not been sent yet; "hello" waits for them
+        self.replies_owed = 0
+        self.replies_done = threading.Condition()
+
+    def set_framing(self, framing):
+        self.decoder.set_framing(framing)
+        self.framing = framing
+        self.negotiated = True
+
+    def set_compression(self, compression, threshold=DEFAULT_COMPRESSION_THRESHOLD, level=DEFAULT_COMPRESSION_LEVEL):
+        self.compression = compression
+        self.compression_threshold = threshold
+        self.compression_level = level
+
+    def reply_format(self):
+        """(framing, compression) in effect now; replies to a queued command use
+        the pair captured when it was decoded, even if a later "hello" changed it"""
+        return self.framing, self.compression
+
+    def encode(self, message, reply_format=None):
+        framing, compression = reply_format or self.reply_format()
+        payload = json.dumps(message).encode('utf-8')
+        if compression == COMPRESSION_ZLIB and len(payload) >= self.compression_threshold:
+            started = time.perf_counter()
+            compressed = zlib.compress(payload, self.compression_level)
+            self.stats["compress_ms"] += (time.perf_counter() - started) * 1000.0
+            # Incompressible replies (already-encoded images) go out as they are
+            if len(compressed) < len(payload):
+                self.stats["compressed_replies"] += 1
+                self.stats["compress_bytes_in"] += len(payload)
+                self.stats["compress_bytes_out"] += len(compressed)
+                header = {
+                    "compressed": COMPRESSION_ZLIB,
+                    "compressed_length": len(compressed),
+                    "length": len(payload),
+                }
+                return encode_frame(json.dumps(header).encode('utf-8'), framing) + compressed
+        return encode_frame(payload, framing)
+
+    def send(self, message, binary=None, reply_format=None):
+        """Serialize and send one message; returns False if the client is gone.
+
+        binary, if given, is written raw right after the message frame; the
+        message announces its size in "binary_length".
+        """
+        return self.send_encoded(self.encode(message, reply_format), binary)
+
+    def send_encoded(self, data, binary=None):
+        """Send a frame produced by encode(), optionally followed by raw bytes"""
+        with self.send_lock:
+            if not self.open:
+                return False
+            try:
+                self.sock.sendall(data)
+                if binary:
+                    self.sock.sendall(binary)
+                return True
+            except Exception:
+                print("Failed to send response - client disconnected")
+                self.open = False
+                return False
+
+    def owe_reply(self):
+        with self.replies_done:
+            self.replies_owed += 1
+
+    def reply_sent(self):
+        with self.replies_done:
+            self.replies_owed -= 1
+            if not self.replies_owed:
+                self.replies_done.notify_all()
+
+    def wait_for_replies(self, keep_waiting):
+        """Block until every queued command has been answered, the client is
+        gone or keep_waiting() turns false"""
+        with self.replies_done:
+            while self.replies_owed and self.open and keep_waiting():
+                self.replies_done.wait(0.1)
+
+    def close(self):
+        self.open = False
+        with suppress(Exception):
+            self.sock.close()
+        with self.replies_done:
+            self.replies_done.notify_all()
+
+_http_session = None
+_http_session_lock = threading.Lock()
+
+def get_http_session():
+    """Shared keep-alive session, sized so parallel downloads reuse connections"""
+    global _http_session
+    with _http_session_lock:
+        if _http_session is None:
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(
+                pool_connections=DOWNLOAD_WORKERS,
+                pool_maxsize=DOWNLOAD_WORKERS * 2,
+            )
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _http_session = session
+        return _http_session
+
+class TransferProgress:
+    """Byte and file counters for one job's downloads, shared across worker threads"""
+
+    def __init__(self, on_update=None):
+        self.lock = threading.Lock()
+        self.on_update = on_update
+        self.bytes_done = 0
+        self.bytes_total = 0
+        self.files_done = 0
+        self.files_total = 0
+        self.size_known = True
+
+    def start_file(self, size=None):
+        with self.lock:
+            self.files_total += 1
+            if size is None:
+                self.size_known = False
+            else:
+                self.bytes_total += size
+
+    def advance(self, count):
+        with self.lock:
+            self.bytes_done += count
+        self._notify()
+
+    def finish_file(self):
+        with self.lock:
+            self.files_done += 1
+        self._notify()
+
+    def _notify(self):
+        if self.on_update:
+            self.on_update(self)
+
+    def to_dict(self):
+        with self.lock:
+            total = self.bytes_total if self.size_known else None
+            return {
+                "bytes_done": self.bytes_done,
+                "bytes_total": total,
+                "files_done": self.files_done,
+                "files_total": self.files_total,
+                "percent": round(100.0 * self.bytes_done / total, 1) if total else None,
+            }
+
+def download_to_file(url, path, headers=REQ_HEADERS, timeout=60, hasher=None, progress=None):
+    """Stream url into path; returns status code, byte count and elapsed time"""
+    start = time.perf_counter()
+    written = 0
+    with get_http_session().get(url, headers=headers, stream=True, timeout=timeout) as response:
+        if response.status_code == 200:
+            if progress:
+                length = response.headers.get("Content-Length")
+                progress.start_file(int(length) if length and length.isdigit() else None)
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path, "wb") as f:
+                for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    f.write(chunk)
+                    if hasher:
+                        hasher.update(chunk)
+                    written += len(chunk)
+                    if progress:
+                        progress.advance(len(chunk))
+            if progress:
+                progress.finish_file()
+        status_code = response.status_code
+    return {
+        "status_code": status_code,
+        "bytes": written,
+        "ms": round((time.perf_counter() - start) * 1000.0, 1),
+    }
+
+def download_files(files, cache=None, max_workers=DOWNLOAD_WORKERS, progress=None):
+    """Download {key: (url, path[, cache_key])} concurrently.
+
+    Entries with a cache key go through cache. Returns {key: download_to_file() result}.
+    """
+    if not files:
+        return {}
+
+    def fetch(entry):
+        url, path = entry[0], entry[1]
+        cache_key = entry[2] if len(entry) > 2 else None
+        if cache is not None and cache_key is not None:
+            return cache.fetch(cache_key, url, path, progress=progress)
+        return download_to_file(url, path, progress=progress)
+
+    workers = min(max_workers, len(files))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="blendermcp-download") as executor:
+        futures = {key: executor.submit(fetch, entry) for key, entry in files.items()}
+        return {key: future.result() for key, future in futures.items()}
+
+def extract_zip(zip_path, dest_dir, max_entry_bytes=MAX_ARCHIVE_ENTRY_BYTES,
+                max_total_bytes=MAX_ARCHIVE_TOTAL_BYTES, max_entries=MAX_ARCHIVE_ENTRIES):
+    """Extract an archive entry by entry, streaming each member to disk.
+
+    Raises ValueError if an entry would land outside dest_dir or the archive
+    exceeds the entry count or size limits; sizes are checked both against the
+    headers and against the bytes actually decompressed.
+    """
+    abs_dest_dir = os.path.abspath(dest_dir)
+    total = 0
+    with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+        infos = zip_ref.infolist()
+        if len(infos) > max_entries:
+            raise ValueError(f"Archive has {len(infos)} entries, more than the limit of {max_entries}")
+
+        for file_info in infos:
+            # Check for path traversal before anything is written
+            file_path = file_info.filename
+            if ".." in file_path:
+                raise ValueError("Security issue: Zip contains files with directory traversal sequence")
+            # This handles both / and \ in zip entries
+            target_path = os.path.abspath(os.path.join(dest_dir, os.path.normpath(file_path)))
+            if target_path != abs_dest_dir and not target_path.startswith(abs_dest_dir + os.sep):
+                raise ValueError("Security issue: Zip contains files with path traversal attempt")
+            if file_info.file_size > max_entry_bytes:
+                raise ValueError(f"Archive entry {file_path} is larger than {max_entry_bytes} bytes")
+            if total + file_info.file_size > max_total_bytes:
+                raise ValueError(f"Archive expands to more than {max_total_bytes} bytes")
+
+            if file_info.is_dir():
+                os.makedirs(target_path, exist_ok=True)
+                continue
+
+            os.makedirs(os.path.dirname(target_path), exist_ok=True)
+            # Never write through an existing (possibly cache-linked) file
+            with suppress(FileNotFoundError):
+                os.unlink(target_path)
+            written = 0
+            with zip_ref.open(file_info) as source, open(target_path, "wb") as target:
+                for chunk in iter(lambda: source.read(DOWNLOAD_CHUNK_SIZE), b""):
+                    written += len(chunk)
+                    if written > max_entry_bytes or total + written > max_total_bytes:
+                        raise ValueError(f"Archive entry {file_path} decompresses past the size limit")
+                    target.write(chunk)
+            total += written
+    return total
+
+class AssetCache:
+    """Content-addressed on-disk cache for downloaded assets.
+
+    Entries are keyed by (provider, asset id, resolution, format, member) and
+    point at a blob named after the SHA-256 of its content, so identical files
+    are stored once. Writes are atomic (temp file + rename). A hit is re-hashed
+    only when the blob's size or mtime no longer match what was recorded when
+    it was stored, and the least recently used entries are evicted once the
+    total size exceeds max_bytes. Access times from hits reach the index file
+    in batches; stores, evictions and clear() write it at once.
+    """
+
+    INDEX_FILE = "index.json"
+    INDEX_SAVE_HITS = 64  # Hits between index writes
+    INDEX_SAVE_INTERVAL = 30.0  # Seconds after which a hit writes the index anyway
+
+    def __init__(self, root=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_CACHE_SIZE_MB * 1024 * 1024):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.blob_dir = os.path.join(root, "blobs")
+        self.tmp_dir = os.path.join(root, "tmp")
+        self.lock = threading.Lock()
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "corrupt": 0,
+            "evictions": 0,
+            "bytes_downloaded": 0,
+            "bytes_served": 0,
+        }
+        os.makedirs(self.blob_dir, exist_ok=True)
+        os.makedirs(self.tmp_dir, exist_ok=True)
+        self.entries = self._load_index()
+        self.unsaved_hits = 0
+        self.saved_at = time.monotonic()
+
+    @staticmethod
+    def make_key(provider, asset_id, resolution, file_format, member="main"):
+        return json.dumps([provider, asset_id, resolution, file_format, member])
+
+    def _index_path(self):
+        return os.path.join(self.root, self.INDEX_FILE)
+
+    def _load_index(self):
+        try:
+            with open(self._index_path(), "r", encoding="utf-8") as f:
+                entries = json.load(f)
+            return entries if isinstance(entries, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self):
+        tmp_path = os.path.join(self.tmp_dir, f"index-{uuid.uuid4().hex}.json")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f)
+        os.replace(tmp_path, self._index_path())
+        self.unsaved_hits = 0
+        self.saved_at = time.monotonic()
+
+    def flush(self):
+        """Write access times from hits that have not reached the index file yet"""
+        with self.lock:
+            if self.unsaved_hits:
+                self._save_index()
+
+    def _blob_path(self, sha256, ext):
+        return os.path.join(self.blob_dir, sha256[:2], sha256 + ext)
+
+    @staticmethod
+    def _hash_file(path):
+        hasher = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b""):
+                hasher.update(chunk)
+        return hasher.hexdigest()
+
+    @staticmethod
+    def _materialize(blob_path, dest_path):
+        """Hard-link the blob to dest_path, copying where links are not possible"""
+        os.makedirs(os.path.dirname(dest_path) or ".", exist_ok=True)
+        with suppress(FileNotFoundError):
+            os.unlink(dest_path)
+        try:
+            os.link(blob_path, dest_path)
+        except OSError:
+            shutil.copyfile(blob_path, dest_path)
+
+    def _verified_blob(self, key):
+        """Return the blob path for key if its content is intact, else drop the entry (lock held).
+
+        The blob is hashed again only when its size or mtime differ from the
+        ones recorded for it, e.g. after a hard-linked copy was edited in place.
+        """
+        entry = self.entries.get(key)
+        if not entry:
+            return None
+
+        blob_path = self._blob_path(entry["sha256"], entry.get("ext", ""))
+        try:
+            stat = os.stat(blob_path)
+            valid = stat.st_size == entry["size"] and stat.st_mtime_ns == entry.get("mtime_ns")
+            if not valid:
+                valid = self._hash_file(blob_path) == entry["sha256"]
+                if valid:
+                    entry["size"] = stat.st_size
+                    entry["mtime_ns"] = stat.st_mtime_ns
+        except OSError:
+            valid = False
+
+        if not valid:
+            self.stats["corrupt"] += 1
+            self.entries.pop(key, None)
+            self._save_index()
+            with suppress(OSError):
+                os.unlink(blob_path)
+            return None
+        entry["last_access"] = time.time()
+        return blob_path
+
+    def _record_hit(self, size):
+        """Count a hit and write the index once enough have piled up (lock held)"""
+        self.stats["hits"] += 1
+        self.stats["bytes_served"] += size
+        self.unsaved_hits += 1
+        if self.unsaved_hits >= self.INDEX_SAVE_HITS or time.monotonic() - self.saved_at >= self.INDEX_SAVE_INTERVAL:
+            self._save_index()
+
+    def lookup(self, key):
+        """Return the verified blob path for key, or None.
+
+        The path is only safe to read until the next store() may evict it;
+        use get() to place a copy somewhere.
+        """
+        with self.lock:
+            return self._verified_blob(key)
+
+    def contains(self, key):
+        with self.lock:
+            return key in self.entries
+
+    def get(self, key, dest_path, progress=None):
+        """Place a cached copy of key at dest_path; returns None on a miss"""
+        start = time.perf_counter()
+        # Eviction runs under the same lock, so the blob cannot go away
+        # between the check and the link
+        with self.lock:
+            blob_path = self._verified_blob(key)
+            if not blob_path:
+                return None
+            self._materialize(blob_path, dest_path)
+            size = self.entries[key]["size"]
+            sha256 = self.entries[key]["sha256"]
+            self._record_hit(size)
+        if progress:
+            progress.start_file(size)
+            progress.advance(size)
+            progress.finish_file()
+        return {
+            "status_code": 200,
+            "bytes": size,
+            "ms": round((time.perf_counter() - start) * 1000.0, 1),
+            "cache": "hit",
+            "sha256": sha256,
+        }
+
+    def fetch(self, key, url, dest_path, headers=REQ_HEADERS, timeout=60, progress=None):
+        """Serve dest_path from the cache, downloading into the cache on a miss.
+
+        Returns the same dict as download_to_file() plus a "cache" field and,
+        for a complete file, its "sha256".
+        """
+        cached = self.get(key, dest_path, progress=progress)
+        if cached:
+            return cached
+
+        hasher = hashlib.sha256()
+        tmp_path = os.path.join(self.tmp_dir, uuid.uuid4().hex)
+        try:
+            result = download_to_file(url, tmp_path, headers=headers, timeout=timeout, hasher=hasher, progress=progress)
+            if result["status_code"] == 200:
+                result["sha256"] = hasher.hexdigest()
+                self.store(key, tmp_path, result["sha256"], os.path.splitext(dest_path)[1], dest_path)
+        finally:
+            with suppress(OSError):
+                os.unlink(tmp_path)
+
+        with self.lock:
+            self.stats["misses"] += 1
+            self.stats["bytes_downloaded"] += result["bytes"]
+        result["cache"] = "miss"
+        return result
+
+    def store(self, key, tmp_path, sha256, ext="", dest_path=None):
+        """Atomically move a fully written temp file into the cache under key.
+
+        With dest_path, a copy is placed there before another store can evict it.
+        """
+        blob_path = self._blob_path(sha256, ext)
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+
+        with self.lock:
+            os.replace(tmp_path, blob_path)
+            stat = os.stat(blob_path)
+            # Keys already sharing this blob now see the replaced file's mtime
+            for entry in self.entries.values():
+                if (entry["sha256"], entry.get("ext", "")) == (sha256, ext):
+                    entry["mtime_ns"] = stat.st_mtime_ns
+            self.entries[key] = {
+                "sha256": sha256,
+                "ext": ext,
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "last_access": time.time(),
+            }
+            self._evict()
+            if dest_path:
+                self._materialize(blob_path, dest_path)
+            self._save_index()
+        return blob_path
+
+    def _evict(self):
+        """Drop least recently used entries until the cache fits (lock held)"""
+        blob_sizes = {}
+        for entry in self.entries.values():
+            blob_sizes[(entry["sha256"], entry.get("ext", ""))] = entry["size"]
+        total = sum(blob_sizes.values())
+        if total <= self.max_bytes:
+            return
+
+        for key, entry in sorted(self.entries.items(), key=lambda item: item[1]["last_access"]):
+            if total <= self.max_bytes or len(self.entries) <= 1:
+                break
+            del self.entries[key]
+            self.stats["evictions"] += 1
+            blob = (entry["sha256"], entry.get("ext", ""))
+            if not any((other["sha256"], other.get("ext", "")) == blob for other in self.entries.values()):
+                with suppress(OSError):
+                    os.unlink(self._blob_path(*blob))
+                total -= blob_sizes[blob]
+
+    def clear(self):
+        """Remove every entry and blob; returns the number of entries dropped"""
+        with self.lock:
+            removed = len(self.entries)
+            self.entries = {}
+            self._save_index()
+            with suppress(OSError):
+                shutil.rmtree(self.blob_dir)
+            os.makedirs(self.blob_dir, exist_ok=True)
+        return removed
+
+    def status(self):
+        with self.lock:
+            stats = dict(self.stats)
+            entry_count = len(self.entries)
+            total = sum({(e["sha256"], e.get("ext", "")): e["size"] for e in self.entries.values()}.values())
+        lookups = stats["hits"] + stats["misses"]
+        return {
+            "root": self.root,
+            "entries": entry_count,
+            "size_bytes": total,
+            "max_bytes": self.max_bytes,
+            "hit_ratio": round(stats["hits"] / lookups, 3) if lookups else 0.0,
+            **stats,
+        }
+
+class PolyHavenCatalog:
+    """Local copy of the Poly Haven asset listing with a token index for search.
+
+    The listing is persisted next to the asset cache and refreshed at most
+    once per ttl seconds with a conditional request (ETag/Last-Modified), so
+    repeated searches are answered from memory without network calls.
+    """
+
+    ASSET_TYPES = {"hdris": 0, "textures": 1, "models": 2}
+    _TOKEN_SPLIT = re.compile(r"[^0-9a-z]+")
+
+    def __init__(self, path, ttl=DEFAULT_CATALOG_TTL, api_url=None):
+        self.path = path
+        self.ttl = ttl
+        self.api_url = api_url or POLYHAVEN_API_URL
+        self.lock = threading.Lock()
+        self.assets = {}
+        self.etag = None
+        self.last_modified = None
+        self.fetched_at = 0.0
+        self.stats = {"refreshes": 0, "not_modified": 0, "refresh_errors": 0, "searches": 0}
+        self._tokens = {}  # token -> set of asset ids
+        self._sorted_tokens = []
+        self._load()
+
+    @classmethod
+    def _tokenize(cls, text):
+        return [token for token in cls._TOKEN_SPLIT.split(str(text).lower()) if token]
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if isinstance(data, dict) and isinstance(data.get("assets"), dict):
+            self._set_assets(data["assets"])
+            self.etag = data.get("etag")
+            self.last_modified = data.get("last_modified")
+            self.fetched_at = data.get("fetched_at", 0.0)
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "fetched_at": self.fetched_at,
+                "etag": self.etag,
+                "last_modified": self.last_modified,
+                "assets": self.assets,
+            }, f)
+        os.replace(tmp_path, self.path)
+
+    def _set_assets(self, assets):
+        tokens = {}
+        for asset_id, data in assets.items():
+            words = [asset_id, data.get("name", "")]
+            words.extend(data.get("tags") or [])
+            words.extend(data.get("categories") or [])
+            for word in words:
+                for token in self._tokenize(word):
+                    tokens.setdefault(token, set()).add(asset_id)
+        self.assets = assets
+        self._tokens = tokens
+        self._sorted_tokens = sorted(tokens)
+
+    def refresh(self, force=False):
+        """Re-fetch the listing if it is older than ttl; keeps stale data on failure"""
+        with self.lock:
+            if not force and self.assets and time.time() - self.fetched_at < self.ttl:
+                return False
+
+            headers = dict(REQ_HEADERS)
+            if self.assets and self.etag:
+                headers["If-None-Match"] = self.etag
+            if self.assets and self.last_modified:
+                headers["If-Modified-Since"] = self.last_modified
+
+            try:
+                response = get_http_session().get(f"{self.api_url}/assets", params={"type": "all"},
+                                                  headers=headers, timeout=30)
+            except requests.RequestException:
+                self.stats["refresh_errors"] += 1
+                if self.assets:
+                    return False
+                raise
+
+            if response.status_code == 304:
+                self.stats["not_modified"] += 1
+            elif response.status_code == 200:
+                self._set_assets(response.json())
+                self.etag = response.headers.get("ETag")
+                self.last_modified = response.headers.get("Last-Modified")
+                self.stats["refreshes"] += 1
+            else:
+                self.stats["refresh_errors"] += 1
+                if not self.assets:
+                    raise RuntimeError(f"API request failed with status code {response.status_code}")
+                return False
+
+            self.fetched_at = time.time()
+            self._save()
+            return True
+
+    def _match_token(self, token):
+        """Asset ids with any indexed token starting with token"""
+        matches = set()
+        start = bisect.bisect_left(self._sorted_tokens, token)
+        for indexed in self._sorted_tokens[start:]:
+            if not indexed.startswith(token):
+                break
+            matches |= self._tokens[indexed]
+        return matches
+
+    @staticmethod
+    def _as_list(value):
+        if not value:
+            return []
+        if isinstance(value, str):
+            return [item.strip() for item in value.split(",") if item.strip()]
+        return list(value)
+
+    def search(self, asset_type=None, categories=None, tags=None, query=None, offset=0, limit=20):
+        """Filter and page the catalog.
+
+        categories and tags (lists or comma separated strings) must all be
+        present on an asset; every query token must prefix-match a word of its
+        id, name, tags or categories. Results are ordered by download count.
+        """
+        self.refresh()
+        with self.lock:
+            self.stats["searches"] += 1
+            candidates = None
+            for token in self._tokenize(query or ""):
+                matches = self._match_token(token)
+                candidates = matches if candidates is None else candidates & matches
+            if candidates is None:
+                candidates = self.assets.keys()
+
+            type_code = self.ASSET_TYPES.get(asset_type) if asset_type and asset_type != "all" else None
+            wanted_categories = set(self._as_list(categories))
+            wanted_tags = set(self._as_list(tags))
+            results = []
+            for asset_id in candidates:
+                data = self.assets[asset_id]
+                if type_code is not None and data.get("type") != type_code:
+                    continue
+                if wanted_categories and not wanted_categories.issubset(data.get("categories") or ()):
+                    continue
+                if wanted_tags and not wanted_tags.issubset(data.get("tags") or ()):
+                    continue
+                results.append(asset_id)
+
+            results.sort(key=lambda asset_id: (-self.assets[asset_id].get("download_count", 0), asset_id))
+            offset = max(0, int(offset or 0))
+            page = results[offset:] if limit is None else results[offset:offset + max(0, int(limit))]
+            next_offset = offset + len(page)
+            return {
+                "assets": {asset_id: self.assets[asset_id] for asset_id in page},
+                "total_count": len(results),
+                "returned_count": len(page),
+                "offset": offset,
+                "next_offset": next_offset if next_offset < len(results) else None,
+            }
+
+    def status(self):
+        with self.lock:
+            return {
+                "path": self.path,
+                "asset_count": len(self.assets),
+                "fetched_at": self.fetched_at,
+                "age_seconds": round(time.time() - self.fetched_at, 1) if self.fetched_at else None,
+                "ttl_seconds": self.ttl,
+                "etag": self.etag,
+                **self.stats,
+            }
+
+class SceneChangeTracker:
+    """Revision counter for the scene, advanced by depsgraph updates.
+
+    Every object remembers the revision at which it was last added or
+    transformed, and removed objects leave a tombstone, so clients can ask
+    for just what changed since a revision they already hold.
+    """
+
+    def __init__(self, max_tombstones=MAX_SCENE_TOMBSTONES):
+        self.revision = 0
+        self.floor = 0  # Deltas from before this revision are no longer available
+        self.max_tombstones = max_tombstones
+        self.scene_name = None
+        self.objects = {}  # name -> revision of last change
+        self.removed = {}  # name -> revision of removal
+        self.stats = {"updates": 0, "rescans": 0}
+        self.update_count = 0  # Every depsgraph update, including shading and materials
+        self._handlers = None
+
+    def install(self):
+        """Hook the depsgraph; the handlers are persistent so they survive file loads"""
+        self.reset()
+        if self._handlers:
+            return
+
+        @bpy.app.handlers.persistent
+        def depsgraph_update_post(scene, depsgraph=None):
+            self.on_depsgraph_update(scene, depsgraph)
+
+        @bpy.app.handlers.persistent
+        def load_post(*args):
+            self.reset()
+
+        bpy.app.handlers.depsgraph_update_post.append(depsgraph_update_post)
+        bpy.app.handlers.load_post.append(load_post)
+        self._handlers = (depsgraph_update_post, load_post)
+
+    def uninstall(self):
+        if not self._handlers:
+            return
+        depsgraph_update_post, load_post = self._handlers
+        with suppress(ValueError):
+            bpy.app.handlers.depsgraph_update_post.remove(depsgraph_update_post)
+        with suppress(ValueError):
+            bpy.app.handlers.load_post.remove(load_post)
+        self._handlers = None
+
+    def reset(self, scene=None):
+        """Forget all history; the next request from an older revision gets a full listing"""
+        scene = scene or bpy.context.scene
+        self.revision += 1
+        self.floor = self.revision
+        self.scene_name = scene.name
+        self.objects = {obj.name: self.revision for obj in scene.objects}
+        self.removed = {}
+
+    def on_depsgraph_update(self, scene, depsgraph=None):
+        self.update_count += 1
+        if scene.name != self.scene_name:
+            self.reset(scene)
+            return
+
+        changed = []
+        rescan = len(scene.objects) != len(self.objects)
+        for update in (depsgraph.updates if depsgraph is not None else ()):
+            id_data = update.id
+            if isinstance(id_data, bpy.types.Object):
+                name = id_data.name
+                if name not in self.objects:
+                    rescan = True  # Added or renamed
+                elif update.is_updated_transform or update.is_updated_geometry:
+                    changed.append(name)
+            elif isinstance(id_data, (bpy.types.Collection, bpy.types.Scene)):
+                rescan = True  # Objects may have been linked or unlinked
+
+        if not changed and not rescan:
+            return
+
+        self.revision += 1
+        self.stats["updates"] += 1
+        for name in changed:
+            self.objects[name] = self.revision
+        if rescan:
+            self._rescan(scene)
+
+    def _rescan(self, scene):
+        self.stats["rescans"] += 1
+        current = set(scene.objects.keys())
+        for name in current.difference(self.objects):
+            self.objects[name] = self.revision
+            self.removed.pop(name, None)
+        for name in set(self.objects).difference(current):
+            del self.objects[name]
+            self.removed[name] = self.revision
+
+        # Oldest tombstones go first; deltas reaching back past them need a full listing
+        if len(self.removed) > self.max_tombstones:
+            ordered = sorted(self.removed.items(), key=lambda item: item[1])
+            for name, revision in ordered[:len(self.removed) - self.max_tombstones]:
+                del self.removed[name]
+                self.floor = max(self.floor, revision)
+
+class Histogram:
+    """Fixed-bucket histogram; observe() is one bisect and two additions"""
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # Last bucket is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+        if self.min is None or value < self.min:
+            self.min = value
+
+    def quantile(self, q):
+        """Estimate a quantile by interpolating inside its bucket, clamped to min/max"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if bucket_count and seen + bucket_count >= rank:
+                lower = max(self.bounds[index - 1] if index > 0 else 0.0, self.min)
+                upper = min(self.bounds[index] if index < len(self.bounds) else self.max, self.max)
+                return lower + (upper - lower) * max(0.0, rank - seen) / bucket_count
+            seen += bucket_count
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean": round(self.sum / self.count, 3) if self.count else 0.0,
+            "p50": round(self.quantile(0.50), 3),
+            "p95": round(self.quantile(0.95), 3),
+            "p99": round(self.quantile(0.99), 3),
+            "max": round(self.max, 3),
+        }
+
+class CommandMetrics:
+    """Per-command-type latency and size histograms for the main-thread queue"""
+
+    SERIES = {
+        "queue_wait_ms": LATENCY_BUCKETS_MS,
+        "execute_ms": LATENCY_BUCKETS_MS,
+        "serialize_ms": LATENCY_BUCKETS_MS,
+        "response_bytes": SIZE_BUCKETS_BYTES,
+    }
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started_at = time.time()
+        self.commands = {}
+
+    def _entry(self, command_type):
+        entry = self.commands.get(command_type)
+        if entry is None:
+            entry = {"errors": 0}
+            for series, bounds in self.SERIES.items():
+                entry[series] = Histogram(bounds)
+            self.commands[command_type] = entry
+        return entry
+
+    def record(self, command_type, queue_wait_ms, execute_ms, serialize_ms=None, response_bytes=None, error=False):
+        with self.lock:
+            entry = self._entry(command_type or "unknown")
+            entry["queue_wait_ms"].observe(queue_wait_ms)
+            entry["execute_ms"].observe(execute_ms)
+            if serialize_ms is not None:
+                entry["serialize_ms"].observe(serialize_ms)
+            if response_bytes is not None:
+                entry["response_bytes"].observe(response_bytes)
+            if error:
+                entry["errors"] += 1
+
+    def reset(self):
+        with self.lock:
+            self.commands = {}
+            self.started_at = time.time()
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                command_type: {
+                    "count": entry["execute_ms"].count,
+                    "errors": entry["errors"],
+                    **{series: entry[series].summary() for series in self.SERIES},
+                }
+                for command_type, entry in sorted(self.commands.items())
+            }
+
+    def prometheus(self, gauges):
+        """Render histograms and the given {name: value} gauges in Prometheus text format"""
+        lines = []
+        for name, value in gauges.items():
+            lines.append(f"# TYPE blendermcp_{name} gauge")
+            lines.append(f"blendermcp_{name} {value}")
+        with self.lock:
+            for series in self.SERIES:
+                metric = f"blendermcp_command_{series}"
+                lines.append(f"# TYPE {metric} histogram")
+                for command_type, entry in sorted(self.commands.items()):
+                    histogram = entry[series]
+                    cumulative = 0
+                    for bound, bucket_count in zip(list(histogram.bounds) + ["+Inf"], histogram.counts):
+                        cumulative += bucket_count
+                        lines.append(f'{metric}_bucket{{command="{command_type}",le="{bound}"}} {cumulative}')
+                    lines.append(f'{metric}_sum{{command="{command_type}"}} {histogram.sum}')
+                    lines.append(f'{metric}_count{{command="{command_type}"}} {histogram.count}')
+            lines.append("# TYPE blendermcp_command_errors_total counter")
+            for command_type, entry in sorted(self.commands.items()):
+                lines.append(f'blendermcp_command_errors_total{{command="{command_type}"}} {entry["errors"]}')
+        return "\n".join(lines) + "\n"
+
+class CodeOutput(io.TextIOBase):
+    """stdout replacement for execute_code.
+
+    Keeps at most max_chars of output (the beginning and the end, with a
+    truncation marker between) and, when emit is given, forwards text in
+    batches as it is written.
+    """
+
+    def __init__(self, max_chars=DEFAULT_MAX_OUTPUT_CHARS, emit=None):
+        self.max_chars = max_chars
+        self.emit = emit
+        self.head = []
+        self.head_chars = 0
+        self.tail = deque()
+        self.tail_chars = 0
+        self.total_chars = 0
+        self.pending = []
+        self.pending_chars = 0
+        self.last_flush = time.perf_counter()
+
+    def writable(self):
+        return True
+
+    def write(self, text):
+        if not text:
+            return 0
+        self.total_chars += len(text)
+        self._keep(text)
+        if self.emit:
+            self.pending.append(text)
+            self.pending_chars += len(text)
+            if (self.pending_chars >= STREAM_FLUSH_CHARS
+                    or time.perf_counter() - self.last_flush >= STREAM_FLUSH_INTERVAL):
+                self.flush()
+        return len(text)
+
+    def _keep(self, text):
+        head_room = self.max_chars // 2 - self.head_chars
+        if head_room > 0:
+            self.head.append(text[:head_room])
+            self.head_chars += len(self.head[-1])
+            text = text[head_room:]
+        if not text:
+            return
+        self.tail.append(text)
+        self.tail_chars += len(text)
+        tail_limit = self.max_chars - self.max_chars // 2
+        while self.tail and self.tail_chars - len(self.tail[0]) >= tail_limit:
+            self.tail_chars -= len(self.tail.popleft())
+
+    def flush(self):
+        if self.emit and self.pending:
+            text = "".join(self.pending)
+            self.pending = []
+            self.pending_chars = 0
+            # Bounded event frames, however much was printed at once
+            for start in range(0, len(text), STREAM_FLUSH_CHARS):
+                self.emit(text[start:start + STREAM_FLUSH_CHARS])
+        self.last_flush = time.perf_counter()
+
+    @property
+    def truncated(self):
+        return self.total_chars > self.max_chars
+
+    def getvalue(self):
+        head = "".join(self.head)
+        tail = "".join(self.tail)
+        if not self.truncated:
+            return head + tail
+        tail = tail[-(self.max_chars - len(head)):] if self.max_chars > len(head) else ""
+        dropped = self.total_chars - len(head) - len(tail)
+        return f"{head}\n... [{dropped} characters truncated] ...\n{tail}"
+
+class CodeSession:
+    """A named execute_code namespace that persists between calls"""
+
+    def __init__(self, name, max_bytes):
+        self.name = name
+        self.max_bytes = max_bytes
+        self.created_at = time.time()
+        self.last_used = self.created_at
+        self.calls = 0
+        self.size_bytes = 0
+        self.reset()
+
+    def reset(self):
+        self.namespace = {"bpy": bpy, "__name__": f"blendermcp_session_{self.name}"}
+        self.size_bytes = 0
+
+    def measure(self, limit=None):
+        """Approximate the memory held by the namespace.
+
+        Containers and instance attributes are followed all the way down,
+        counting every object once. Modules, functions and classes are not
+        counted. With limit, stops as soon as the total goes over it.
+        """
+        skip = (_types.ModuleType, _types.FunctionType, _types.BuiltinFunctionType, type)
+        pending = [value for key, value in self.namespace.items() if not key.startswith("__")]
+        seen = set()
+        total = 0
+        while pending and (limit is None or total <= limit):
+            value = pending.pop()
+            if id(value) in seen or isinstance(value, skip):
+                continue
+            seen.add(id(value))
+            total += sys.getsizeof(value)
+            if isinstance(value, dict):
+                pending.extend(value.keys())
+                pending.extend(value.values())
+            elif isinstance(value, (list, tuple, set, frozenset, deque)):
+                pending.extend(value)
+            elif isinstance(getattr(value, "__dict__", None), dict):
+                pending.append(value.__dict__)
+        self.size_bytes = total
+        return total
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "created_at": self.created_at,
+            "last_used": self.last_used,
+            "calls": self.calls,
+            "names": sorted(key for key in self.namespace if not key.startswith("__") and key not in ("bpy", "report_progress")),
+            "size_bytes": self.size_bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+class FairCommandQueue:
+    """Per-client command queues served round-robin within priority classes.
+
+    A command's "priority" picks its class; higher classes always go first,
+    and within a class each client with pending work gets one command per
+    turn. Not thread-safe: the server calls it with queue_lock held.
+    """
+
+    def __init__(self):
+        self.clients = {}  # connection -> {priority: deque of (command, enqueued_at, reply_format)}
+        self.turns = {priority: deque() for priority in COMMAND_PRIORITIES}
+        self.depth = 0
+
+    def __len__(self):
+        return self.depth
+
+    def client_depth(self, connection):
+        queues = self.clients.get(connection)
+        return sum(len(queue) for queue in queues.values()) if queues else 0
+
+    def push(self, connection, command, priority, enqueued_at, reply_format=None):
+        queues = self.clients.get(connection)
+        if queues is None:
+            queues = self.clients[connection] = {p: deque() for p in COMMAND_PRIORITIES}
+        queue = queues[priority]
+        if not queue:
+            self.turns[priority].append(connection)
+        queue.append((command, enqueued_at, reply_format))
+        self.depth += 1
+
+    def pop(self):
+        """Return (connection, command, enqueued_at, reply_format) for the next command, or None"""
+        for priority in COMMAND_PRIORITIES:
+            turns = self.turns[priority]
+            if not turns:
+                continue
+            connection = turns.popleft()
+            queues = self.clients[connection]
+            command, enqueued_at, reply_format = queues[priority].popleft()
+            if queues[priority]:
+                turns.append(connection)
+            elif not any(queues.values()):
+                del self.clients[connection]
+            self.depth -= 1
+            return connection, command, enqueued_at, reply_format
+        return None
+
+    def oldest_enqueued_at(self):
+        heads = [
+            queue[0][1]
+            for queues in self.clients.values()
+            for queue in queues.values()
+            if queue
+        ]
+        return min(heads) if heads else None
+
+    def clear(self):
+        self.clients.clear()
+        for turns in self.turns.values():
+            turns.clear()
+        self.depth = 0
+
+class BackgroundJob:
+    """A remote asset import whose download runs off the main thread"""
+
+    def __init__(self, kind, description=None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.description = description or {}
+        self.status = "queued"  # queued -> downloading -> importing -> completed | failed
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.result = None
+        self.error = None
+        self.lock = threading.Lock()
+        self.subscribers = []  # Connections that get job_progress and job_completed events
+        self.waiters = []  # (connection, request_id, reply_format) owed a plain response
+        self.progress = TransferProgress()
+
+    @property
+    def finished(self):
+        return self.status in ("completed", "failed")
+
+    def to_dict(self):
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "params": self.description,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "progress": self.progress.to_dict(),
+            "result": self.result,
+            "error": self.error,
+        }
+
+class RodinWatch:
+    """A submitted Hyper3D Rodin generation that the poller tracks until it ends"""
+
+    def __init__(self, mode, api_key, key, task_uuid=None, import_name=None):
+        self.id = key  # subscription_key (main site) or request_id (fal.ai)
+        self.mode = mode
+        self.api_key = api_key
+        self.task_uuid = task_uuid
+        self.import_name = import_name
+        self.status = "pending"  # pending -> running -> completed | failed
+        self.detail = None  # Last status payload from the API
+        self.created_at = time.time()
+        self.finished_at = None
+        self.last_polled_at = None
+        self.polls = 0
+        self.errors = 0
+        self.error = None
+        self.interval = RODIN_POLL_MIN_INTERVAL
+        self.next_poll = time.monotonic() + self.interval
+        self.subscribers = []  # Connections that get rodin_job_status and rodin_job_completed events
+        self.import_job_id = None
+
+    @property
+    def finished(self):
+        return self.status in ("completed", "failed")
+
+    def to_dict(self):
+        return {
+            "watch_id": self.id,
+            "mode": self.mode,
+            "task_uuid": self.task_uuid,
+            "status": self.status,
+            "detail": self.detail,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "last_polled_at": self.last_polled_at,
+            "polls": self.polls,
+            "next_poll_in": round(max(0.0, self.next_poll - time.monotonic()), 2) if not self.finished else None,
+            "error": self.error,
+            "import_name": self.import_name,
+            "import_job_id": self.import_job_id,
+        }
+
+class RodinJobPoller:
+    """One background thread that polls every tracked Rodin generation.
+
+    Each watch is polled on its own schedule: the interval starts at
+    RODIN_POLL_MIN_INTERVAL and grows by RODIN_POLL_BACKOFF up to
+    RODIN_POLL_MAX_INTERVAL, and doubles after a failed request. Status
+    changes are pushed to subscribers; on_finished(watch) runs on the poller
+    thread before the completion event goes out.
+    """
+
+    def __init__(self, on_finished=None):
+        self.on_finished = on_finished
+        self.watches = {}
+        self.condition = threading.Condition()
+        self.thread = None
+        self.running = False
+
+    def start(self):
+        with self.condition:
+            if self.running:
+                return
+            self.running = True
+            self.thread = threading.Thread(target=self._run, name="blendermcp-rodin-poller", daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+        if self.thread:
+            self.thread.join(timeout=1.0)
+            self.thread = None
+
+    def watch(self, mode, api_key, key, task_uuid=None, import_name=None, subscriber=None):
+        """Track a generation (again); returns the watch, which may already be finished"""
+        with self.condition:
+            watch = self.watches.get(key)
+            if watch is None:
+                watch = RodinWatch(mode, api_key, key, task_uuid, import_name)
+                self.watches[key] = watch
+                self._prune()
+            elif import_name and not watch.finished:
+                watch.import_name = import_name
+            if subscriber is not None and not watch.finished and subscriber not in watch.subscribers:
+                watch.subscribers.append(subscriber)
+            self.condition.notify_all()
+        if not watch.finished:
+            self.start()
+        return watch
+
+    def unwatch(self, key):
+        with self.condition:
+            return self.watches.pop(key, None)
+
+    def get(self, key):
+        with self.condition:
+            return self.watches.get(key)
+
+    def list(self):
+        with self.condition:
+            return sorted(self.watches.values(), key=lambda watch: watch.created_at)
+
+    def _prune(self):
+        finished = [watch for watch in self.watches.values() if watch.finished]
+        excess = len(finished) - MAX_FINISHED_RODIN_WATCHES
+        if excess > 0:
+            finished.sort(key=lambda watch: watch.finished_at)
+            for watch in finished[:excess]:
+                del self.watches[watch.id]
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while True:
+                    if not self.running:
+                        return
+                    now = time.monotonic()
+                    pending = [watch for watch in self.watches.values() if not watch.finished]
+                    due = [watch for watch in pending if watch.next_poll <= now]
+                    if due:
+                        break
+                    timeout = min(watch.next_poll for watch in pending) - now if pending else None
+                    self.condition.wait(timeout)
+            for watch in due:
+                self._poll(watch)
+
+    def _poll(self, watch):
+        try:
+            status, detail = self._fetch_status(watch)
+        except requests.HTTPError as e:
+            code = e.response.status_code if e.response is not None else None
+            # Anything but rate limiting or a server error will not go away by retrying
+            if code is not None and code < 500 and code != 429:
+                self._finish(watch, "failed", f"Status request failed with status code {code}")
+                return
+            self._poll_failed(watch, str(e))
+            return
+        except Exception as e:
+            self._poll_failed(watch, str(e))
+            return
+
+        watch.polls += 1
+        watch.errors = 0
+        watch.error = None
+        watch.last_polled_at = time.time()
+        changed = detail != watch.detail or status != watch.status
+        watch.detail = detail
+
+        if status in ("completed", "failed"):
+            self._finish(watch, status, "Generation failed" if status == "failed" else None)
+            return
+        if time.time() - watch.created_at > RODIN_POLL_TIMEOUT:
+            self._finish(watch, "failed", f"Generation did not finish within {RODIN_POLL_TIMEOUT} seconds")
+            return
+
+        watch.status = status
+        watch.interval = min(watch.interval * RODIN_POLL_BACKOFF, RODIN_POLL_MAX_INTERVAL)
+        watch.next_poll = time.monotonic() + watch.interval
+        if changed:
+            self._notify(watch, {"event": "rodin_job_status", "rodin_job": watch.to_dict()})
+
+    def _poll_failed(self, watch, error):
+        watch.errors += 1
+        watch.error = error
+        if watch.errors >= RODIN_POLL_MAX_ERRORS:
+            self._finish(watch, "failed", f"Giving up after {watch.errors} failed status requests: {error}")
+            return
+        watch.interval = min(watch.interval * 2, RODIN_POLL_ERROR_INTERVAL)
+        watch.next_poll = time.monotonic() + watch.interval
+
+    @staticmethod
+    def _fetch_status(watch):
+        """Poll the API once; returns (status, detail) with status in RodinWatch terms"""
+        if watch.mode == "MAIN_SITE":
+            statuses = request_rodin_status_main_site(watch.api_key, watch.id)["status_list"]
+            if any(status == "Failed" for status in statuses):
+                return "failed", statuses
+            if statuses and all(status == "Done" for status in statuses):
+                return "completed", statuses
+            return ("running" if any(status == "Generating" for status in statuses) else "pending"), statuses
+
+        data = request_rodin_status_fal_ai(watch.api_key, watch.id)
+        state = data.get("status")
+        if state == "COMPLETED":
+            return "completed", data
+        if state == "IN_PROGRESS":
+            return "running", data
+        if state in FAL_AI_FAILED_STATES:
+            return "failed", data
+        return "pending", data
+
+    def _finish(self, watch, status, error=None):
+        watch.status = status
+        watch.error = error
+        watch.finished_at = time.time()
+        if self.on_finished:
+            try:
+                self.on_finished(watch)
+            except Exception as e:
+                traceback.print_exc()
+                watch.error = watch.error or f"Auto-import failed to start: {e}"
+        self._notify(watch, {"event": "rodin_job_completed", "rodin_job": watch.to_dict()})
+        with self.condition:
+            watch.subscribers = []
+
+    def _notify(self, watch, event):
+        with self.condition:
+            subscribers = [connection for connection in watch.subscribers if connection.open]
+            watch.subscribers = subscribers
+        for connection in subscribers:
+            connection.send(event)
+
+def request_rodin_status_main_site(api_key, subscription_key):
+    """Ask the main site for the status of every job of a task"""
+    response = get_http_session().post(
+        f"{RODIN_API_URL}/status",
+        headers={
+            "Authorization": f"Bearer {api_key}",
+        },
+        json={
+            "subscription_key": subscription_key,
+        },
+        timeout=RODIN_POLL_REQUEST_TIMEOUT,
+    )
+    response.raise_for_status()
+    data = response.json()
+    return {
+        "status_list": [i["status"] for i in data["jobs"]]
+    }
+
+def request_rodin_status_fal_ai(api_key, request_id):
+    """Ask fal.ai for the queue status of a request"""
+    response = get_http_session().get(
+        f"{FAL_AI_RODIN_URL}/requests/{request_id}/status",
+        headers={
+            "Authorization": f"KEY {api_key}",
+        },
+        timeout=RODIN_POLL_REQUEST_TIMEOUT,
+    )
+    response.raise_for_status()
+    return response.json()
+
+def pack_arrays(arrays):
+    """Lay out (description, numpy array) pairs back to back as little endian bytes.
+
+    Each array starts on a BINARY_ALIGNMENT boundary so clients can view it
+    without copying; its offset and byte_length are written into description.
+    """
+    payload = bytearray()
+    for description, array in arrays:
+        payload.extend(b"\0" * (-len(payload) % BINARY_ALIGNMENT))
+        description["offset"] = len(payload)
+        description["byte_length"] = array.nbytes
+        payload.extend(array.astype(array.dtype.newbyteorder("<"), copy=False).tobytes())
+    return payload
+
+def texture_color_spaces(map_type):
+    """Color spaces a Poly Haven texture map is loaded in, in order of preference"""
+    return ('sRGB',) if map_type.lower() in ['color', 'diffuse', 'albedo'] else ('Non-Color',)
+
+def image_content_hash(image):
+    """SHA-256 of an image's packed bytes, else of its file; None if neither is readable"""
+    packed = image.packed_file
+    if packed is not None:
+        return hashlib.sha256(packed.data).hexdigest()
+    if image.source != 'FILE' or not image.filepath:
+        return None
+    path = bpy.path.abspath(image.filepath)
+    if not os.path.isfile(path):
+        return None
+    return AssetCache._hash_file(path)
+
+def encode_png(pixels):
+    """Encode an (height, width, 4) uint8 RGBA array, top row first, as PNG bytes"""
+    height, width = pixels.shape[:2]
+    # Filter type 0 (None) in front of every scanline
+    raw = np.zeros((height, width * 4 + 1), dtype=np.uint8)
+    raw[:, 1:] = pixels.reshape(height, width * 4)
+
+    def chunk(tag, data):
+        body = tag + data
+        return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body) & 0xffffffff)
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)
+    return b"".join([
+        b"\x89PNG\r\n\x1a\n",
+        chunk(b"IHDR", header),
+        chunk(b"IDAT", zlib.compress(raw.tobytes(), PNG_COMPRESS_LEVEL)),
+        chunk(b"IEND", b""),
+    ])
+
+class BinaryResult:
+    """Returned by a handler whose reply carries a raw byte payload after the JSON"""
+
+    def __init__(self, result, payload):
+        self.result = result
+        self.payload = payload
+
+class DeferredResult:
+    """Returned by a handler whose reply is sent later, when its job finishes"""
+
+    def __init__(self, job):
+        self.job = job
+
 class BlenderMCPServer:
-    def __init__(self, host='localhost', port=9876):
+    def __init__(self, host='localhost', port=9876, queue_size=DEFAULT_QUEUE_SIZE,
+                 tick_budget_ms=DEFAULT_TICK_BUDGET_MS, cache_dir=DEFAULT_CACHE_DIR,
+                 cache_size_mb=DEFAULT_CACHE_SIZE_MB, unix_socket_path=None):
         self.host = host
         self.port = port
         self.running = False
         self.socket = None
         self.server_thread = None
 
+        # Optional Unix domain socket listener, served by the same dispatcher
+        self.unix_socket_path = unix_socket_path
+        self.unix_socket = None
+        self.unix_server_thread = None
+
+        # Every command goes through one bounded queue that a single timer
+        # drains on the main thread, at most tick_budget_ms per tick; clients
+        # are served round-robin so one flood cannot starve the others
+        self.queue_size = queue_size
+        self.client_queue_limit = max(1, int(queue_size * CLIENT_QUEUE_SHARE))
+        self.tick_budget_ms = tick_budget_ms
+        self.command_queue = FairCommandQueue()
+        self.connections = set()
+        self.queue_lock = threading.Lock()
+        self.queue_stats = {
+            "enqueued": 0,
+            "executed": 0,
+            "rejected_busy": 0,
+            "max_depth": 0,
+            "total_wait_ms": 0.0,
+            "max_wait_ms": 0.0,
+            "last_wait_ms": 0.0,
+            "ticks": 0,
+            "max_tick_ms": 0.0,
+        }
+
+        # Downloaded asset files are kept across sessions, keyed by provider and asset
+        self.asset_cache = AssetCache(cache_dir or DEFAULT_CACHE_DIR, cache_size_mb * 1024 * 1024)
+        self.polyhaven_catalog = PolyHavenCatalog(os.path.join(self.asset_cache.root, "polyhaven-catalog.json"))
+
+        # Scene revision counter behind get_scene_changes
+        self.scene_tracker = SceneChangeTracker()
+        self.viewport_cache = OrderedDict()
+        self.viewport_cache_stats = {"hits": 0, "misses": 0}
+
+        # (content hash, color space) -> name of the bpy.data.images entry holding it
+        self.image_index = {}
+        self.image_index_stats = {"loaded": 0, "reused": 0}
+
+        # Per-command latency and size histograms for get_metrics
+        self.metrics = CommandMetrics()
+
+        # execute_code: compiled blocks by source hash, and persistent namespaces
+        self.code_cache = OrderedDict()
+        self.code_cache_stats = {"hits": 0, "misses": 0}
+        self.code_sessions = OrderedDict()
+        self._drain_timer_registered = False
+
+        # Internal callbacks (e.g. the import step of a download job) that
+        # must run on the main thread; drained before client commands
+        self.main_thread_tasks = deque()
+
+        # Download jobs; the pool is created when the server starts
+        self.job_executor = None
+        self.jobs = {}
+        self.jobs_lock = threading.Lock()
+
+        # Rodin generations polled off the main thread; the thread starts with the first watch
+        self.rodin_poller = RodinJobPoller(on_finished=self._on_rodin_job_finished)
+
+        # Connection of the command currently executing on the main thread
+        self._current_connection = None
+        self._current_request_id = None
+        self._in_batch = False
+
     def start(self):
         if self.running:
             print("Server is already running")
@@ -52,21 +1853,94 @@ class BlenderMCPServer:
             self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
             self.socket.bind((self.host, self.port))
-            self.socket.listen(1)
+            self.socket.listen(LISTEN_BACKLOG)
 
             # Start server thread
-            self.server_thread = threading.Thread(target=self._server_loop)
+            self.server_thread = threading.Thread(target=self._server_loop, args=(self.socket, "tcp"))
             self.server_thread.daemon = True
             self.server_thread.start()
 
+            if self.unix_socket_path:
+                self._start_unix_listener()
+
+            self.job_executor = ThreadPoolExecutor(
+                max_workers=JOB_WORKERS,
+                thread_name_prefix="blendermcp-jobs",
+            )
+
+            # Single persistent timer that drains the command queue
+            if not bpy.app.timers.is_registered(self._drain_command_queue):
+                bpy.app.timers.register(self._drain_command_queue, first_interval=0.0, persistent=True)
+            self._drain_timer_registered = True
+
+            self.scene_tracker.install()
+
             print(f"BlenderMCP server started on {self.host}:{self.port}")
         except Exception as e:
             print(f"Failed to start server: {str(e)}")
             self.stop()
 
+    def _start_unix_listener(self):
+        """Listen on unix_socket_path as well; failures leave TCP running"""
+        path = self.unix_socket_path
+        if not UNIX_SOCKETS_SUPPORTED:
+            print("Unix domain sockets are not available on this platform, serving TCP only")
+            return
+        try:
+            if os.path.exists(path):
+                if not stat.S_ISSOCK(os.stat(path).st_mode):
+                    raise RuntimeError(f"{path} exists and is not a socket")
+                # A socket file nobody answers on is left over from a crash
+                probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                try:
+                    probe.connect(path)
+                except OSError:
+                    os.unlink(path)
+                else:
+                    raise RuntimeError(f"Another server is listening on {path}")
+                finally:
+                    probe.close()
+
+            listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            # Create the socket file owner-only so no other user can connect
+            # before the chmod; the umask is process-wide, so restore it at once
+            old_umask = os.umask(0o177)
+            try:
+                listener.bind(path)
+            finally:
+                os.umask(old_umask)
+            os.chmod(path, 0o600)  # Only the user running Blender may send code
+            listener.listen(LISTEN_BACKLOG)
+            self.unix_socket = listener
+        except Exception as e:
+            print(f"Failed to listen on {path}: {str(e)}")
+            return
+
+        self.unix_server_thread = threading.Thread(target=self._server_loop, args=(listener, "unix"))
+        self.unix_server_thread.daemon = True
+        self.unix_server_thread.start()
+        print(f"BlenderMCP server listening on {path}")
+
     def stop(self):
         self.running = False
 
+        # Stop draining and drop whatever is still queued
+        if self._drain_timer_registered:
+            with suppress(Exception):
+                if bpy.app.timers.is_registered(self._drain_command_queue):
+                    bpy.app.timers.unregister(self._drain_command_queue)
+            self._drain_timer_registered = False
+        with self.queue_lock:
+            self.command_queue.clear()
+        self.main_thread_tasks.clear()
+        self.scene_tracker.uninstall()
+        self.rodin_poller.stop()
+
+        if self.job_executor:
+            self.job_executor.shutdown(wait=False, cancel_futures=True)
+            self.job_executor = None
+        self.asset_cache.flush()
+
         # Close socket
         if self.socket:
             try:
@@ -74,6 +1948,12 @@ class BlenderMCPServer:
             except:
                 pass
             self.socket = None
+        if self.unix_socket:
+            with suppress(Exception):
+                self.unix_socket.close()
+            with suppress(OSError):
+                os.unlink(self.unix_socket_path)
+            self.unix_socket = None
 
         # Wait for thread to finish
         if self.server_thread:
@@ -83,25 +1963,32 @@ class BlenderMCPServer:
             except:
                 pass
             self.server_thread = None
+        if self.unix_server_thread:
+            with suppress(Exception):
+                if self.unix_server_thread.is_alive():
+                    self.unix_server_thread.join(timeout=1.0)
+            self.unix_server_thread = None
 
         print("BlenderMCP server stopped")
 
-    def _server_loop(self):
-        """Main server loop in a separate thread"""
-        print("Server thread started")
-        self.socket.settimeout(1.0)  # Timeout to allow for stopping
+    def _server_loop(self, listener, transport="tcp"):
+        """Accept loop for one listening socket, in a separate thread"""
+        print(f"Server thread started ({transport})")
+        listener.settimeout(1.0)  # Timeout to allow for stopping
 
         while self.running:
             try:
                 # Accept new connection
                 try:
-                    client, address = self.socket.accept()
-                    print(f"Connected to client: {address}")
+                    client, address = listener.accept()
+                    if transport == "unix":
+                        address = None  # Unix peers have no useful address
+                    print(f"Connected to client: {address or transport}")
 
                     # Handle client in a separate thread
                     client_thread = threading.Thread(
                         target=self._handle_client,
-                        args=(client,)
+                        args=(client, address, transport)
                     )
                     client_thread.daemon = True
                     client_thread.start()
@@ -119,66 +2006,394 @@ class BlenderMCPServer:
 
         print("Server thread stopped")
 
-    def _handle_client(self, client):
+    def _handle_client(self, client, address=None, transport="tcp"):
         """Handle connected client"""
         print("Client handler started")
         client.settimeout(None)  # No timeout
-        buffer = b''
+        connection = ClientConnection(client, address, transport)
+        with self.queue_lock:
+            self.connections.add(connection)
 
         try:
             while self.running:
                 # Receive data
                 try:
-                    data = client.recv(8192)
+                    data = client.recv(65536)
                     if not data:
                         print("Client disconnected")
                         break
 
-                    buffer += data
-                    try:
-                        # Try to parse command
-                        command = json.loads(buffer.decode('utf-8'))
-                        buffer = b''
-
-                        # Execute command in Blender's main thread
-                        def execute_wrapper():
-                            try:
-                                response = self.execute_command(command)
-                                response_json = json.dumps(response)
-                                try:
-                                    client.sendall(response_json.encode('utf-8'))
-                                except:
-                                    print("Failed to send response - client disconnected")
-                            except Exception as e:
-                                print(f"Error executing command: {str(e)}")
-                                traceback.print_exc()
-                                try:
-                                    error_response = {
-                                        "status": "error",
-                                        "message": str(e)
-                                    }
-                                    client.sendall(json.dumps(error_response).encode('utf-8'))
-                                except:
-                                    pass
-                            return None
-
-                        # Schedule execution in main thread
-                        bpy.app.timers.register(execute_wrapper, first_interval=0.0)
-                    except json.JSONDecodeError:
-                        # Incomplete data, wait for more
-                        pass
+                    connection.decoder.feed(data)
+
+                    # Drain every complete frame; one packet may carry several commands
+                    while True:
+                        payload = connection.decoder.next_frame()
+                        if payload is None:
+                            break
+                        self._dispatch_payload(connection, payload)
+                except FramingError as e:
+                    print(f"Protocol error: {str(e)}")
+                    connection.send({"status": "error", "message": f"Protocol error: {str(e)}"})
+                    break
                 except Exception as e:
                     print(f"Error receiving data: {str(e)}")
                     break
         except Exception as e:
             print(f"Error in client handler: {str(e)}")
         finally:
-            try:
-                client.close()
-            except:
-                pass
+            connection.close()
+            with self.queue_lock:
+                self.connections.discard(connection)
             print("Client handler stopped")
 
+    def _dispatch_payload(self, connection, payload):
+        """Decode one framed payload and schedule it on Blender's main thread"""
+        try:
+            command = json.loads(payload.decode('utf-8'))
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            connection.send({"status": "error", "message": f"Invalid JSON: {str(e)}"})
+            return
+
+        if not isinstance(command, dict):
+            connection.send({"status": "error", "message": "Command must be a JSON object"})
+            return
+
+        request_id = command.get("id")
+
+        # The handshake changes how the following bytes are framed, so it is
+        # answered here on the socket thread, which reads nothing more until
+        # then. It is a barrier: the replies to commands sent before it go out
+        # first, so the client can switch framing as soon as it reads this one.
+        if command.get("type") == "hello":
+            response = self._handle_hello(connection, command.get("params", {}))
+            if request_id is not None:
+                response["id"] = request_id
+            connection.wait_for_replies(lambda: self.running)
+            # Reply in the old framing so the client can parse it before switching
+            connection.send(response)
+            if response.get("status") == "success":
+                result = response["result"]
+                connection.set_framing(result["framing"])
+                connection.set_compression(
+                    result["compression"], result["compression_threshold"], result["compression_level"]
+                )
+            return
+
+        # Status queries must answer even when the queue is saturated
+        if command.get("type") == "get_server_status":
+            response = {"status": "success", "result": self.get_server_status()}
+            if request_id is not None:
+                response["id"] = request_id
+            connection.send(response)
+            return
+
+        priority = command.get("priority", DEFAULT_COMMAND_PRIORITY)
+        if priority not in COMMAND_PRIORITIES:
+            response = {
+                "status": "error",
+                "message": f"Unknown priority: {priority}. Must be one of: {', '.join(COMMAND_PRIORITIES)}",
+            }
+            if request_id is not None:
+                response["id"] = request_id
+            connection.send(response)
+            return
+
+        # Queue for execution in Blender's main thread; a "hello" pipelined
+        # behind this command must not change how its reply is framed
+        busy_message = self._enqueue_command(connection, command, priority, connection.reply_format())
+        if busy_message:
+            response = {"status": "busy", "message": busy_message}
+            if request_id is not None:
+                response["id"] = request_id
+            connection.send(response)
+
+    def _enqueue_command(self, connection, command, priority=DEFAULT_COMMAND_PRIORITY, reply_format=None):
+        """Queue a command for the main thread; returns a busy message when it cannot"""
+        with self.queue_lock:
+            busy_message = None
+            if len(self.command_queue) >= self.queue_size:
+                busy_message = f"Command queue is full ({self.queue_size} pending), retry later"
+            elif self.command_queue.client_depth(connection) >= self.client_queue_limit:
+                busy_message = f"This client already has {self.client_queue_limit} commands pending, retry later"
+            if busy_message:
+                self.queue_stats["rejected_busy"] += 1
+                connection.stats["rejected_busy"] += 1
+                return busy_message
+
+            self.command_queue.push(connection, command, priority, time.perf_counter(), reply_format)
+            connection.owe_reply()
+            self.queue_stats["enqueued"] += 1
+            connection.stats["enqueued"] += 1
+            depth = len(self.command_queue)
+            if depth > self.queue_stats["max_depth"]:
+                self.queue_stats["max_depth"] = depth
+        return None
+
+    def _schedule_main_thread(self, callback):
+        """Run callback() on the main thread at the next drain tick"""
+        self.main_thread_tasks.append(callback)
+
+    def _drain_command_queue(self):
+        """Persistent timer: run queued commands until the tick budget is spent"""
+        if not self.command_queue and not self.main_thread_tasks:
+            return QUEUE_IDLE_INTERVAL
+
+        tick_start = time.perf_counter()
+        deadline = tick_start + self.tick_budget_ms / 1000.0
+
+        while self.main_thread_tasks:
+            callback = self.main_thread_tasks.popleft()
+            try:
+                callback()
+            except Exception as e:
+                print(f"Error in main-thread task: {str(e)}")
+                traceback.print_exc()
+            if time.perf_counter() >= deadline:
+                break
+
+        # Always run at least one command so a slow handler cannot stall the queue
+        while True:
+            with self.queue_lock:
+                entry = self.command_queue.pop()
+            if entry is None:
+                break
+            connection, command, enqueued_at, reply_format = entry
+
+            started = time.perf_counter()
+            wait_ms = (started - enqueued_at) * 1000.0
+            with self.queue_lock:
+                stats = self.queue_stats
+                stats["total_wait_ms"] += wait_ms
+                stats["last_wait_ms"] = wait_ms
+                if wait_ms > stats["max_wait_ms"]:
+                    stats["max_wait_ms"] = wait_ms
+
+            self._current_connection = connection
+            self._current_request_id = command.get("id")
+            try:
+                response = self.execute_command(command)
+            except Exception as e:
+                print(f"Error executing command: {str(e)}")
+                traceback.print_exc()
+                response = {"status": "error", "message": str(e)}
+            finally:
+                self._current_connection = None
+                self._current_request_id = None
+
+            executed = time.perf_counter()
+            request_id = command.get("id")
+            serialize_ms = response_bytes = None
+            if isinstance(response, DeferredResult):
+                # The reply goes out when the job finishes
+                self._add_job_waiter(response.job, connection, request_id, reply_format)
+            else:
+                binary = None
+                if isinstance(response, BinaryResult):
+                    binary = response.payload
+                    response = {"status": "success", "result": response.result, "binary_length": len(binary)}
+                if request_id is not None:
+                    response["id"] = request_id
+                data = connection.encode(response, reply_format)
+                serialize_ms = (time.perf_counter() - executed) * 1000.0
+                response_bytes = len(data) + (len(binary) if binary else 0)
+                connection.send_encoded(data, binary)
+                connection.reply_sent()
+
+            execute_ms = (executed - started) * 1000.0
+            connection.stats["executed"] += 1
+            connection.stats["execute_ms"] += execute_ms
+            if response_bytes:
+                connection.stats["bytes_sent"] += response_bytes
+            # Client-chosen strings must not grow the metrics table without bound
+            command_type = command.get("type")
+            if not isinstance(command_type, str) or command_type not in self._command_handlers():
+                command_type = "unknown"
+            self.metrics.record(
+                command_type,
+                wait_ms,
+                execute_ms,
+                serialize_ms,
+                response_bytes,
+                error=isinstance(response, dict) and response.get("status") == "error",
+            )
+
+            with self.queue_lock:
+                self.queue_stats["executed"] += 1
+
+            if time.perf_counter() >= deadline:
+                break
+
+        tick_ms = (time.perf_counter() - tick_start) * 1000.0
+        with self.queue_lock:
+            self.queue_stats["ticks"] += 1
+            if tick_ms > self.queue_stats["max_tick_ms"]:
+                self.queue_stats["max_tick_ms"] = tick_ms
+            pending = len(self.command_queue) + len(self.main_thread_tasks)
+
+        # Yield to the UI, then come straight back if work is left
+        return 0.0 if pending else QUEUE_IDLE_INTERVAL
+
+    def get_server_status(self):
+        """Report queue depth, wait times and scheduling settings"""
+        now = time.perf_counter()
+        with self.queue_lock:
+            stats = dict(self.queue_stats)
+            depth = len(self.command_queue)
+            oldest = self.command_queue.oldest_enqueued_at()
+            oldest_wait_ms = (now - oldest) * 1000.0 if oldest is not None else 0.0
+            clients = len(self.connections)
+
+        executed = stats["executed"]
+        return {
+            "running": self.running,
+            "protocol_version": PROTOCOL_VERSION,
+            "listeners": {
+                "tcp": f"{self.host}:{self.port}",
+                "unix": self.unix_socket_path if self.unix_socket else None,
+            },
+            "queue": {
+                "depth": depth,
+                "max_size": self.queue_size,
+                "client_limit": self.client_queue_limit,
+                "clients": clients,
+                "max_depth_seen": stats["max_depth"],
+                "oldest_wait_ms": round(oldest_wait_ms, 3),
+                "enqueued": stats["enqueued"],
+                "executed": executed,
+                "rejected_busy": stats["rejected_busy"],
+                "avg_wait_ms": round(stats["total_wait_ms"] / executed, 3) if executed else 0.0,
+                "max_wait_ms": round(stats["max_wait_ms"], 3),
+                "last_wait_ms": round(stats["last_wait_ms"], 3),
+            },
+            "tick": {
+                "budget_ms": self.tick_budget_ms,
+                "ticks": stats["ticks"],
+                "max_tick_ms": round(stats["max_tick_ms"], 3),
+            },
+        }
+
+    def get_metrics(self, format="json", reset=False):
+        """Per-command queue wait, execution, serialization and size percentiles.
+
+        format "prometheus" returns the same data in Prometheus text format.
+        """
+        now = time.time()
+        with self.queue_lock:
+            queued = len(self.command_queue)
+            clients = [
+                {
+                    "client_id": connection.id,
+                    "transport": connection.transport,
+                    "address": f"{connection.address[0]}:{connection.address[1]}" if connection.address else None,
+                    "connected_seconds": round(now - connection.connected_at, 1),
+                    "queued": self.command_queue.client_depth(connection),
+                    **connection.stats,
+                    "execute_ms": round(connection.stats["execute_ms"], 3),
+                    "compress_ms": round(connection.stats["compress_ms"], 3),
+                    "compression": connection.compression,
+                    "compression_ratio": round(
+                        connection.stats["compress_bytes_in"] / connection.stats["compress_bytes_out"], 3
+                    ) if connection.stats["compress_bytes_out"] else None,
+                    "commands_per_second": round(
+                        connection.stats["executed"] / max(now - connection.connected_at, 1e-3), 3
+                    ),
+                }
+                for connection in sorted(self.connections, key=lambda connection: connection.id)
+            ]
+        with self.jobs_lock:
+            jobs_running = sum(1 for job in self.jobs.values() if not job.finished)
+        in_flight = {
+            "queued": queued,
+            "main_thread_tasks": len(self.main_thread_tasks),
+            "jobs_running": jobs_running,
+        }
+        bytes_in = sum(client["compress_bytes_in"] for client in clients)
+        bytes_out = sum(client["compress_bytes_out"] for client in clients)
+        compression = {
+            "replies": sum(client["compressed_replies"] for client in clients),
+            "bytes_in": bytes_in,
+            "bytes_out": bytes_out,
+            "ratio": round(bytes_in / bytes_out, 3) if bytes_out else None,
+            "compress_ms": round(sum(client["compress_ms"] for client in clients), 3),
+        }
+
+        if format == "prometheus":
+            gauges = {f"in_flight_{name}": value for name, value in in_flight.items()}
+            gauges["compression_ratio"] = compression["ratio"] or 0
+            text = self.metrics.prometheus(gauges)
+            lines = []
+            for series in ("executed", "rejected_busy", "bytes_sent", "compress_bytes_in", "compress_bytes_out"):
+                lines.append(f"# TYPE blendermcp_client_{series}_total counter")
+                lines.extend(f'blendermcp_client_{series}_total{{client="{client["client_id"]}"}} {client[series]}' for client in clients)
+            result = {
+                "content_type": "text/plain; version=0.0.4",
+                "text": text + "\n".join(lines) + "\n",
+            }
+        elif format == "json":
+            result = {
+                "uptime_seconds": round(time.time() - self.metrics.started_at, 1),
+                "in_flight": in_flight,
+                "commands": self.metrics.snapshot(),
+                "compression": compression,
+                "clients": clients,
+            }
+        else:
+            raise ValueError(f"Unknown metrics format: {format}. Must be one of: json, prometheus")
+
+        if reset:
+            self.metrics.reset()
+        return result
+
+    def get_asset_cache_status(self):
+        """Report size, hit ratio and location of the on-disk asset cache"""
+        return self.asset_cache.status()
+
+    def clear_asset_cache(self):
+        """Delete every cached asset file"""
+        removed = self.asset_cache.clear()
+        return {"cleared": True, "removed_entries": removed, **self.asset_cache.status()}
+
+    def _handle_hello(self, connection, params):
+        """Negotiate per-connection protocol options.
+
+        compression may be a single name or a list in order of preference;
+        the first supported one wins and "none" is always acceptable.
+        """
+        framing = params.get("framing", FRAMING_LEGACY)
+        if framing not in SUPPORTED_FRAMINGS:
+            return {
+                "status": "error",
+                "message": f"Unsupported framing: {framing}. Must be one of: {', '.join(SUPPORTED_FRAMINGS)}"
+            }
+
+        offered = params.get("compression", COMPRESSION_NONE)
+        if isinstance(offered, str):
+            offered = [offered]
+        compression = next((name for name in offered if name in SUPPORTED_COMPRESSIONS), COMPRESSION_NONE)
+        try:
+            threshold = int(params.get("compression_threshold", DEFAULT_COMPRESSION_THRESHOLD))
+            level = int(params.get("compression_level", DEFAULT_COMPRESSION_LEVEL))
+        except (TypeError, ValueError):
+            return {"status": "error", "message": "compression_threshold and compression_level must be integers"}
+        if threshold < 0 or not 1 <= level <= 9:
+            return {
+                "status": "error",
+                "message": "compression_threshold must be >= 0 and compression_level between 1 and 9",
+            }
+
+        return {
+            "status": "success",
+            "result": {
+                "protocol_version": PROTOCOL_VERSION,
+                "framing": framing,
+                "supported_framings": list(SUPPORTED_FRAMINGS),
+                "compression": compression,
+                "compression_threshold": threshold,
+                "compression_level": level,
+                "supported_compressions": list(SUPPORTED_COMPRESSIONS),
+            }
+        }
+
     def execute_command(self, command):
         """Execute a command in the main Blender thread"""
         try:
@@ -198,15 +2413,49 @@ class BlenderMCPServer:
         if cmd_type == "get_polyhaven_status":
             return {"status": "success", "result": self.get_polyhaven_status()}
 
+        handler = self._command_handlers().get(cmd_type)
+        if handler:
+            try:
+                print(f"Executing handler for {cmd_type}")
+                result = handler(**params)
+                print(f"Handler execution complete")
+                if isinstance(result, (DeferredResult, BinaryResult)):
+                    return result
+                return {"status": "success", "result": result}
+            except Exception as e:
+                print(f"Error in handler: {str(e)}")
+                traceback.print_exc()
+                return {"status": "error", "message": str(e)}
+        else:
+            return {"status": "error", "message": f"Unknown command type: {cmd_type}"}
+
+    def _command_handlers(self):
+        """Command type -> handler, for the integrations enabled in the scene"""
         # Base handlers that are always available
         handlers = {
             "get_scene_info": self.get_scene_info,
+            "get_scene_changes": self.get_scene_changes,
             "get_object_info": self.get_object_info,
+            "get_mesh_buffers": self.get_mesh_buffers,
+            "query_objects": self.query_objects,
             "get_viewport_screenshot": self.get_viewport_screenshot,
             "execute_code": self.execute_code,
+            "create_code_session": self.create_code_session,
+            "reset_code_session": self.reset_code_session,
+            "drop_code_session": self.drop_code_session,
+            "list_code_sessions": self.list_code_sessions,
             "get_polyhaven_status": self.get_polyhaven_status,
             "get_hyper3d_status": self.get_hyper3d_status,
             "get_sketchfab_status": self.get_sketchfab_status,
+            "get_server_status": self.get_server_status,
+            "get_metrics": self.get_metrics,
+            "batch": self.execute_batch,
+            "get_job_status": self.get_job_status,
+            "list_jobs": self.list_jobs,
+            "subscribe_job": self.subscribe_job,
+            "get_asset_cache_status": self.get_asset_cache_status,
+            "clear_asset_cache": self.clear_asset_cache,
+            "merge_duplicate_images": self.merge_duplicate_images,
         }
 
         # Add Polyhaven handlers only if enabled
@@ -224,6 +2473,9 @@ class BlenderMCPServer:
             polyhaven_handlers = {
                 "create_rodin_job": self.create_rodin_job,
                 "poll_rodin_job_status": self.poll_rodin_job_status,
+                "watch_rodin_job": self.watch_rodin_job,
+                "list_rodin_jobs": self.list_rodin_jobs,
+                "unwatch_rodin_job": self.unwatch_rodin_job,
                 "import_generated_asset": self.import_generated_asset,
             }
             handlers.update(polyhaven_handlers)
@@ -236,21 +2488,219 @@ class BlenderMCPServer:
             }
             handlers.update(sketchfab_handlers)
 
-        handler = handlers.get(cmd_type)
-        if handler:
+        return handlers
+
+
+
+    def execute_batch(self, commands, stop_on_error=True):
+        """Run an ordered list of {type, params} commands in one main-thread slice"""
+        if not isinstance(commands, list):
+            raise ValueError("'commands' must be a list of {type, params} objects")
+
+        results = []
+        self._in_batch = True
+        try:
+            self._run_batch_entries(commands, stop_on_error, results)
+        finally:
+            self._in_batch = False
+        failed = sum(1 for response in results if response.get("status") != "success")
+
+        return {
+            "results": results,
+            "total": len(commands),
+            "executed": len(results),
+            "failed": failed,
+            "stopped_early": len(results) < len(commands),
+        }
+
+    def _run_batch_entries(self, commands, stop_on_error, results):
+        for index, entry in enumerate(commands):
+            if not isinstance(entry, dict):
+                response = {"status": "error", "message": f"Batch entry {index} is not an object"}
+            elif entry.get("type") == "batch":
+                response = {"status": "error", "message": "Nested batch commands are not supported"}
+            else:
+                response = self.execute_command(entry)
+                if isinstance(response, BinaryResult):
+                    response = {"status": "error", "message": f"{entry.get('type')} returns binary data and cannot be batched"}
+                if entry.get("id") is not None:
+                    response["id"] = entry["id"]
+
+            results.append(response)
+            if response.get("status") != "success" and stop_on_error:
+                break
+
+    #region Background jobs
+    def _wants_deferred_reply(self, wait):
+        """Decide whether a job handler should hold its reply until the job ends.
+
+        Clients that never sent "hello" predate job ids, so by default they get
+        the final result as before - just without blocking Blender meanwhile.
+        """
+        if self._in_batch:
+            return False
+        if wait is not None:
+            return bool(wait)
+        connection = self._current_connection
+        return connection is not None and not connection.negotiated
+
+    def _start_job(self, kind, description, fetch, finish, wait=None, subscribe=False, subscribers=None,
+                   raw_result=False):
+        """Run fetch(progress) on the job pool, then finish(prepared) on the main thread.
+
+        fetch() does the network and disk work, reporting bytes through the
+        job's TransferProgress, and returns whatever finish() needs; returning
+        a dict with an "error" key ends the job early, unless raw_result is set
+        because the result is an API body passed through as it is. subscribers
+        adds connections explicitly, for jobs started outside a client command.
+        """
+        if not self.job_executor:
+            raise RuntimeError("Server is not running")
+
+        job = BackgroundJob(kind, description)
+        if subscribe and self._current_connection is not None:
+            job.subscribers.append(self._current_connection)
+        if subscribers:
+            job.subscribers.extend(subscribers)
+        with self.jobs_lock:
+            self.jobs[job.id] = job
+            self._prune_jobs()
+        job.progress.on_update = self._progress_notifier(job)
+
+        def run():
+            job.started_at = time.time()
+            job.status = "downloading"
             try:
-                print(f"Executing handler for {cmd_type}")
-                result = handler(**params)
-                print(f"Handler execution complete")
-                return {"status": "success", "result": result}
+                prepared = fetch(job.progress)
             except Exception as e:
-                print(f"Error in handler: {str(e)}")
                 traceback.print_exc()
-                return {"status": "error", "message": str(e)}
-        else:
-            return {"status": "error", "message": f"Unknown command type: {cmd_type}"}
+                self._finish_job(job, error=str(e))
+                return
+            if isinstance(prepared, dict) and "error" in prepared and not raw_result:
+                self._finish_job(job, result=prepared, error=prepared["error"])
+                return
+            job.status = "importing"
+            self._schedule_main_thread(lambda: self._run_job_finish(job, finish, prepared, raw_result))
+
+        self.job_executor.submit(run)
+
+        if self._wants_deferred_reply(wait):
+            return DeferredResult(job)
+        return {"job_id": job.id, "status": job.status, "kind": kind}
+
+    def _progress_notifier(self, job):
+        """Push throttled job_progress events to the job's subscribers"""
+        last_sent = [0.0]
+
+        def notify(progress):
+            now = time.perf_counter()
+            if now - last_sent[0] < PROGRESS_EVENT_INTERVAL:
+                return
+            last_sent[0] = now
+            with job.lock:
+                subscribers = list(job.subscribers)
+            if subscribers:
+                event = {"event": "job_progress", "job_id": job.id, "status": job.status, "progress": progress.to_dict()}
+                for connection in subscribers:
+                    connection.send(event)
 
+        return notify
 
+    def _run_job_finish(self, job, finish, prepared, raw_result=False):
+        try:
+            result = finish(prepared)
+        except Exception as e:
+            traceback.print_exc()
+            self._finish_job(job, error=str(e))
+            return
+        error = result.get("error") if isinstance(result, dict) and not raw_result else None
+        self._finish_job(job, result=result, error=error)
+
+    def _finish_job(self, job, result=None, error=None):
+        with job.lock:
+            job.result = result if result is not None else {"error": error}
+            job.error = error
+            job.status = "failed" if error else "completed"
+            job.finished_at = time.time()
+            waiters, job.waiters = job.waiters, []
+            subscribers = list(job.subscribers)
+
+        for connection, request_id, reply_format in waiters:
+            self._send_job_reply(job, connection, request_id, reply_format)
+        event = {"event": "job_completed", "job": job.to_dict()}
+        for connection in subscribers:
+            connection.send(event)
+
+    def _add_job_waiter(self, job, connection, request_id, reply_format=None):
+        with job.lock:
+            if not job.finished:
+                job.waiters.append((connection, request_id, reply_format))
+                return
+        self._send_job_reply(job, connection, request_id, reply_format)
+
+    def _send_job_reply(self, job, connection, request_id, reply_format=None):
+        if job.status == "failed" and connection.negotiated:
+            # Same shape as a synchronous handler that raised
+            response = {"status": "error", "message": job.error}
+        else:
+            # Clients that never sent "hello" get the handler's own error dict,
+            # as they did when these handlers ran synchronously
+            response = {"status": "success", "result": job.result}
+        if request_id is not None:
+            response["id"] = request_id
+        connection.send(response, reply_format=reply_format)
+        connection.reply_sent()
+
+    def _prune_jobs(self):
+        finished = [job for job in self.jobs.values() if job.finished]
+        excess = len(finished) - MAX_FINISHED_JOBS
+        if excess > 0:
+            finished.sort(key=lambda job: job.finished_at)
+            for job in finished[:excess]:
+                del self.jobs[job.id]
+
+    def get_job_status(self, job_id):
+        """Get the status, and once finished the result, of a background job"""
+        with self.jobs_lock:
+            job = self.jobs.get(job_id)
+        if not job:
+            raise ValueError(f"Job not found: {job_id}")
+        return job.to_dict()
+
+    def list_jobs(self, status=None):
+        """List known background jobs, optionally filtered by status"""
+        with self.jobs_lock:
+            jobs = list(self.jobs.values())
+        jobs.sort(key=lambda job: job.created_at)
+        return {
+            "jobs": [
+                {
+                    "job_id": job.id,
+                    "kind": job.kind,
+                    "status": job.status,
+                    "created_at": job.created_at,
+                    "percent": job.progress.to_dict()["percent"],
+                }
+                for job in jobs if status is None or job.status == status
+            ]
+        }
+
+    def subscribe_job(self, job_id):
+        """Push a job_completed event to this connection when the job finishes"""
+        with self.jobs_lock:
+            job = self.jobs.get(job_id)
+        if not job:
+            raise ValueError(f"Job not found: {job_id}")
+        connection = self._current_connection
+        if connection is None:
+            raise ValueError("subscribe_job needs a client connection")
+        with job.lock:
+            if not job.finished:
+                job.subscribers.append(connection)
+                return {"subscribed": True, "job_id": job.id, "status": job.status}
+        connection.send({"event": "job_completed", "job": job.to_dict()})
+        return {"subscribed": False, "job_id": job.id, "status": job.status}
+    #endregion
 
     def get_scene_info(self):
         """Get information about the current Blender scene"""
@@ -259,6 +2709,7 @@ class BlenderMCPServer:
             # Simplify the scene info to reduce data size
             scene_info = {
                 "name": bpy.context.scene.name,
+                "revision": self.scene_tracker.revision,
                 "object_count": len(bpy.context.scene.objects),
                 "objects": [],
                 "materials_count": len(bpy.data.materials),
@@ -286,6 +2737,65 @@ class BlenderMCPServer:
             traceback.print_exc()
             return {"error": str(e)}
 
+    def get_scene_changes(self, since_revision=0, cursor=None, limit=DEFAULT_SCENE_PAGE_SIZE):
+        """List objects added or transformed, and names removed, since a revision.
+
+        since_revision 0 (or one the tracker no longer covers) returns every
+        object. Large results are paged by name: pass back next_cursor until it
+        is None, then poll again with the returned revision.
+        """
+        tracker = self.scene_tracker
+        if cursor:
+            revision_text, after = str(cursor).split(":", 1)
+            revision = int(revision_text)
+        else:
+            revision, after = tracker.revision, None
+
+        since_revision = int(since_revision or 0)
+        full = since_revision <= 0 or since_revision < tracker.floor or since_revision > tracker.revision
+        if full:
+            names = sorted(tracker.objects)
+        else:
+            names = sorted(name for name, changed in tracker.objects.items() if changed > since_revision)
+
+        start = bisect.bisect_right(names, after) if after is not None else 0
+        limit = max(1, int(limit))
+        page = names[start:start + limit]
+
+        objects = []
+        scene_objects = bpy.context.scene.objects
+        for name in page:
+            obj = scene_objects.get(name)
+            if obj is not None:
+                objects.append(self._describe_object(obj, tracker.objects.get(name, revision)))
+
+        removed = []
+        if not full and after is None:
+            removed = sorted(name for name, gone in tracker.removed.items() if gone > since_revision)
+
+        more = start + limit < len(names)
+        return {
+            "revision": revision,
+            "since_revision": since_revision,
+            "full": full,
+            "total_count": len(names),
+            "objects": objects,
+            "removed": removed,
+            "next_cursor": f"{revision}:{page[-1]}" if more else None,
+        }
+
+    @staticmethod
+    def _describe_object(obj, revision):
+        return {
+            "name": obj.name,
+            "type": obj.type,
+            "parent": obj.parent.name if obj.parent else None,
+            "location": list(obj.location),
+            "rotation": list(obj.rotation_euler),
+            "scale": list(obj.scale),
+            "revision": revision,
+        }
+
     @staticmethod
     def _get_aabb(obj):
         """ Returns the world-space axis-aligned bounding box (AABB) of an object. """
@@ -345,21 +2855,257 @@ class BlenderMCPServer:
 
         return obj_info
 
-    def get_viewport_screenshot(self, max_size=800, filepath=None, format="png"):
+    def query_objects(self, types=None, name_prefix=None, collection=None, fields=None, binary=False,
+                      cursor=None, limit=None):
+        """Return columns of per-object data for every matching scene object.
+
+        Filters: types (list or single type), name_prefix and collection
+        (objects in it or its children). Transforms and world bounding boxes
+        come from foreach_get over bpy.data.objects and are computed with
+        numpy for all objects at once. With binary set, the numeric columns
+        are sent as a raw payload described like get_mesh_buffers. Rows are
+        ordered by name; with a limit they are paged like get_scene_changes,
+        passing back next_cursor until it is None.
+        """
+        fields = list(fields or DEFAULT_QUERY_OBJECT_FIELDS)
+        unknown = set(fields).difference(QUERY_OBJECT_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+        if isinstance(types, str):
+            types = [types]
+        wanted_types = set(types) if types else None
+
+        if collection:
+            source = bpy.data.collections.get(collection)
+            if source is None:
+                raise ValueError(f"Collection not found: {collection}")
+            scope = set(source.all_objects.keys())
+        else:
+            scope = set(bpy.context.scene.objects.keys())
+
+        all_objects = bpy.data.objects
+        matches = []
+        for index, obj in enumerate(all_objects):
+            if obj.name not in scope:
+                continue
+            if wanted_types and obj.type not in wanted_types:
+                continue
+            if name_prefix and not obj.name.startswith(name_prefix):
+                continue
+            matches.append((obj.name, index, obj))
+        matches.sort(key=lambda match: match[0])
+
+        start = bisect.bisect_right([match[0] for match in matches], str(cursor)) if cursor else 0
+        end = len(matches) if limit is None else start + max(1, int(limit))
+        page = matches[start:end]
+        indices = np.array([index for _, index, _ in page], dtype=np.int64)
+        selected = [obj for _, _, obj in page]
+        total = len(all_objects)
+
+        def read(prop, width):
+            values = np.empty(total * width, dtype=np.float32)
+            all_objects.foreach_get(prop, values)
+            return values.reshape(total, width)[indices]
+
+        columns = {
+            "name": [obj.name for obj in selected],
+            "type": [obj.type for obj in selected],
+        }
+        numeric = {}
+        if "location" in fields:
+            numeric["location"] = read("location", 3)
+        if "rotation" in fields:
+            numeric["rotation"] = read("rotation_euler", 3)
+        if "scale" in fields:
+            numeric["scale"] = read("scale", 3)
+
+        matrices = None
+        if "matrix_world" in fields or "world_aabb" in fields:
+            # foreach_get yields matrices column by column
+            matrices = read("matrix_world", 16).reshape(-1, 4, 4).transpose(0, 2, 1)
+        if "matrix_world" in fields:
+            numeric["matrix_world"] = matrices
+        if "world_aabb" in fields:
+            corners = read("bound_box", 24).reshape(-1, 8, 3)
+            world = corners @ matrices[:, :3, :3].transpose(0, 2, 1) + matrices[:, None, :3, 3]
+            aabb = np.stack((world.min(axis=1), world.max(axis=1)), axis=1)
+            boundless = np.array([obj.type in BOUNDLESS_OBJECT_TYPES for obj in selected], dtype=bool)
+            aabb[boundless] = np.nan
+            numeric["world_aabb"] = aabb
+
+        if "parent" in fields:
+            columns["parent"] = [obj.parent.name if obj.parent else None for obj in selected]
+        if "collections" in fields:
+            columns["collections"] = [[c.name for c in obj.users_collection] for obj in selected]
+        if "vertex_count" in fields or "polygon_count" in fields:
+            # Linked duplicates share one mesh; count each data-block once
+            counts = {}
+            mesh_counts = []
+            for obj in selected:
+                if obj.type != 'MESH' or not obj.data:
+                    mesh_counts.append(None)
+                    continue
+                key = obj.data.as_pointer()
+                if key not in counts:
+                    counts[key] = (len(obj.data.vertices), len(obj.data.polygons))
+                mesh_counts.append(counts[key])
+            if "vertex_count" in fields:
+                columns["vertex_count"] = [c[0] if c else None for c in mesh_counts]
+            if "polygon_count" in fields:
+                columns["polygon_count"] = [c[1] if c else None for c in mesh_counts]
+        if "materials" in fields:
+            columns["materials"] = [
+                [slot.material.name for slot in obj.material_slots if slot.material] for obj in selected
+            ]
+
+        result = {
+            "count": len(selected),
+            "total_count": len(matches),
+            "next_cursor": selected[-1].name if end < len(matches) else None,
+            "fields": ["name", "type"] + fields,
+            "columns": columns,
+        }
+        if binary:
+            arrays = []
+            result["buffers"] = {}
+            for field, array in numeric.items():
+                result["buffers"][field] = {"dtype": array.dtype.name, "shape": list(array.shape)}
+                arrays.append((result["buffers"][field], array))
+            result["byte_order"] = "little"
+            return BinaryResult(result, pack_arrays(arrays))
+
+        for field, array in numeric.items():
+            if field == "world_aabb":
+                columns[field] = [
+                    None if np.isnan(box[0][0]) else box.tolist() for box in array
+                ]
+            else:
+                columns[field] = array.tolist()
+        return result
+
+    def get_mesh_buffers(self, names, attributes=None, evaluated=False, world_space=False):
+        """Read mesh arrays for one or more objects with foreach_get.
+
+        The JSON result describes every array (dtype, shape, offset and
+        byte_length into the payload, little endian) and the arrays follow the
+        reply as one binary payload of binary_length bytes. attributes picks
+        from positions, normals, loops (vertex index per loop), polygons
+        (loop_start, loop_total), uvs (active layer, per loop) and triangles.
+        """
+        if isinstance(names, str):
+            names = [names]
+        attributes = list(attributes or MESH_BUFFER_ATTRIBUTES)
+        unknown = set(attributes).difference(MESH_BUFFER_ATTRIBUTES + ("triangles",))
+        if unknown:
+            raise ValueError(f"Unknown mesh attributes: {', '.join(sorted(unknown))}")
+
+        depsgraph = bpy.context.evaluated_depsgraph_get() if evaluated else None
+        arrays = []
+        objects = []
+        for name in names:
+            obj = bpy.data.objects.get(name)
+            if not obj:
+                raise ValueError(f"Object not found: {name}")
+            if obj.type != 'MESH':
+                raise ValueError(f"Object is not a mesh: {name}")
+
+            source = obj.evaluated_get(depsgraph) if evaluated else obj
+            mesh = source.to_mesh() if evaluated else obj.data
+            try:
+                matrix = np.array(obj.matrix_world, dtype=np.float32) if world_space else None
+                buffers = self._read_mesh_buffers(mesh, attributes, matrix)
+                entry = {
+                    "name": obj.name,
+                    "vertex_count": len(mesh.vertices),
+                    "loop_count": len(mesh.loops),
+                    "polygon_count": len(mesh.polygons),
+                    "buffers": {},
+                }
+            finally:
+                if evaluated:
+                    source.to_mesh_clear()
+
+            for attribute, array in buffers.items():
+                entry["buffers"][attribute] = {"dtype": array.dtype.name, "shape": list(array.shape)}
+                arrays.append((entry["buffers"][attribute], array))
+            objects.append(entry)
+
+        return BinaryResult({"byte_order": "little", "objects": objects}, pack_arrays(arrays))
+
+    @staticmethod
+    def _read_mesh_buffers(mesh, attributes, matrix=None):
+        buffers = {}
+        vertex_count = len(mesh.vertices)
+        loop_count = len(mesh.loops)
+
+        if "positions" in attributes:
+            positions = np.empty(vertex_count * 3, dtype=np.float32)
+            mesh.vertices.foreach_get("co", positions)
+            positions = positions.reshape(vertex_count, 3)
+            if matrix is not None:
+                positions = positions @ matrix[:3, :3].T + matrix[:3, 3]
+            buffers["positions"] = positions
+
+        if "normals" in attributes:
+            normals = np.empty(vertex_count * 3, dtype=np.float32)
+            if hasattr(mesh, "vertex_normals"):
+                mesh.vertex_normals.foreach_get("vector", normals)
+            else:
+                mesh.vertices.foreach_get("normal", normals)
+            normals = normals.reshape(vertex_count, 3)
+            if matrix is not None:
+                normals = normals @ np.linalg.inv(matrix[:3, :3]).astype(np.float32)
+                lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+                normals = normals / np.where(lengths > 0, lengths, 1)
+            buffers["normals"] = normals
+
+        if "loops" in attributes:
+            loops = np.empty(loop_count, dtype=np.int32)
+            mesh.loops.foreach_get("vertex_index", loops)
+            buffers["loops"] = loops
+
+        if "polygons" in attributes:
+            polygon_count = len(mesh.polygons)
+            loop_start = np.empty(polygon_count, dtype=np.int32)
+            loop_total = np.empty(polygon_count, dtype=np.int32)
+            mesh.polygons.foreach_get("loop_start", loop_start)
+            mesh.polygons.foreach_get("loop_total", loop_total)
+            buffers["polygons"] = np.stack((loop_start, loop_total), axis=1)
+
+        if "uvs" in attributes and mesh.uv_layers.active:
+            uvs = np.empty(loop_count * 2, dtype=np.float32)
+            mesh.uv_layers.active.data.foreach_get("uv", uvs)
+            buffers["uvs"] = uvs.reshape(loop_count, 2)
+
+        if "triangles" in attributes:
+            mesh.calc_loop_triangles()
+            triangles = np.empty(len(mesh.loop_triangles) * 3, dtype=np.int32)
+            mesh.loop_triangles.foreach_get("vertices", triangles)
+            buffers["triangles"] = triangles.reshape(-1, 3)
+
+        return buffers
+
+    def get_viewport_screenshot(self, max_size=800, filepath=None, format="png", binary=False, use_cache=True):
         """
-        Capture a screenshot of the current 3D viewport and save it to the specified path.
+        Capture a screenshot of the current 3D viewport.
 
         Parameters:
         - max_size: Maximum size in pixels for the largest dimension of the image
-        - filepath: Path where to save the screenshot file
-        - format: Image format (png, jpg, etc.)
+        - filepath: Path where to save the screenshot file; without one the view
+          is rendered offscreen and returned inline as a PNG
+        - format: Image format (png, jpg, etc.) when saving to filepath
+        - binary: Send the inline PNG as a raw payload instead of base64
+        - use_cache: Reuse an earlier inline capture of the same scene state and view
 
         Returns success/error status
         """
-        try:
-            if not filepath:
-                return {"error": "No filepath provided"}
+        if not filepath:
+            try:
+                return self._capture_viewport_inline(max_size, binary, use_cache)
+            except Exception as e:
+                return {"error": str(e)}
 
+        try:
             # Find the active 3D viewport
             area = None
             for a in bpy.context.screen.areas:
@@ -389,405 +3135,890 @@ class BlenderMCPServer:
                 img.save()
                 width, height = new_width, new_height
 
-            # Cleanup Blender image data
-            bpy.data.images.remove(img)
+            # Cleanup Blender image data
+            bpy.data.images.remove(img)
+
+            return {
+                "success": True,
+                "width": width,
+                "height": height,
+                "filepath": filepath
+            }
+
+        except Exception as e:
+            return {"error": str(e)}
+
+    @staticmethod
+    def _find_view3d():
+        """Return (area, space, region) of the first 3D viewport in any window"""
+        for window in bpy.context.window_manager.windows:
+            for area in window.screen.areas:
+                if area.type != 'VIEW_3D':
+                    continue
+                region = next((r for r in area.regions if r.type == 'WINDOW'), None)
+                if region is not None:
+                    return area, area.spaces.active, region
+        return None, None, None
+
+    def _capture_viewport_inline(self, max_size, binary, use_cache):
+        """Render the 3D view offscreen and PNG-encode it in memory.
+
+        Where the offscreen render is unavailable (no GPU context in this
+        timer callback, or a background Blender) the area is captured with
+        screenshot_area instead; such captures are not cached.
+        """
+        area, space, region = self._find_view3d()
+        if not area:
+            return {"error": "No 3D viewport found"}
+
+        scale = min(1.0, max_size / max(region.width, region.height))
+        width = max(1, int(region.width * scale))
+        height = max(1, int(region.height * scale))
+        region_3d = space.region_3d
+        view_matrix = region_3d.view_matrix.copy()
+        projection_matrix = region_3d.window_matrix.copy()
+
+        scene = bpy.context.scene
+        key = (
+            scene.name,
+            self.scene_tracker.update_count,
+            tuple(value for row in view_matrix for value in row),
+            tuple(value for row in projection_matrix for value in row),
+            space.shading.type,
+            width,
+            height,
+        )
+        png = self.viewport_cache.get(key) if use_cache else None
+        cached = png is not None
+        method = "offscreen"
+        if cached:
+            self.viewport_cache.move_to_end(key)
+            self.viewport_cache_stats["hits"] += 1
+        else:
+            self.viewport_cache_stats["misses"] += 1
+            try:
+                png = self._render_view3d_png(scene, space, region, view_matrix, projection_matrix, width, height)
+            except Exception as e:
+                print(f"Offscreen viewport render failed ({e}); falling back to screenshot_area")
+                png, width, height = self._screenshot_area_png(area, max_size)
+                method = "screenshot_area"
+            if use_cache and method == "offscreen":
+                self.viewport_cache[key] = png
+                while len(self.viewport_cache) > VIEWPORT_CACHE_SIZE:
+                    self.viewport_cache.popitem(last=False)
+
+        result = {
+            "success": True,
+            "width": width,
+            "height": height,
+            "format": "png",
+            "mime_type": "image/png",
+            "cached": cached,
+            "method": method,
+        }
+        if binary:
+            return BinaryResult(result, png)
+        result["image_base64"] = base64.b64encode(png).decode("ascii")
+        return result
+
+    @staticmethod
+    def _render_view3d_png(scene, space, region, view_matrix, projection_matrix, width, height):
+        import gpu
+
+        offscreen = gpu.types.GPUOffScreen(width, height)
+        try:
+            offscreen.draw_view3d(
+                scene,
+                bpy.context.view_layer,
+                space,
+                region,
+                view_matrix,
+                projection_matrix,
+                do_color_management=True,
+            )
+            with offscreen.bind():
+                framebuffer = gpu.state.active_framebuffer_get()
+                buffer = framebuffer.read_color(0, 0, width, height, 4, 0, 'UBYTE')
+        finally:
+            offscreen.free()
+
+        buffer.dimensions = width * height * 4
+        pixels = np.frombuffer(buffer, dtype=np.uint8).reshape(height, width, 4)
+        # OpenGL rows start at the bottom
+        return encode_png(pixels[::-1])
+
+    @staticmethod
+    def _screenshot_area_png(area, max_size):
+        """Capture area through a temporary PNG file; returns (png, width, height)"""
+        fd, path = tempfile.mkstemp(prefix="blendermcp_viewport_", suffix=".png")
+        os.close(fd)
+        try:
+            with bpy.context.temp_override(area=area):
+                bpy.ops.screen.screenshot_area(filepath=path)
+            with open(path, "rb") as f:
+                png = f.read()
+            if png[:8] != b"\x89PNG\r\n\x1a\n":
+                raise RuntimeError("screenshot_area did not write a PNG")
+            width, height = struct.unpack(">II", png[16:24])  # From the IHDR chunk
+            if max(width, height) > max_size:
+                scale = max_size / max(width, height)
+                width, height = max(1, int(width * scale)), max(1, int(height * scale))
+                img = bpy.data.images.load(path)
+                try:
+                    img.scale(width, height)
+                    img.file_format = 'PNG'
+                    img.save()
+                finally:
+                    bpy.data.images.remove(img)
+                with open(path, "rb") as f:
+                    png = f.read()
+            return png, width, height
+        finally:
+            with suppress(OSError):
+                os.unlink(path)
+
+    def execute_code(self, code=None, session=None, call=None, args=None, kwargs=None,
+                     stream=False, max_output=DEFAULT_MAX_OUTPUT_CHARS):
+        """Execute arbitrary Blender Python code.
+
+        Compiled code is cached by source hash. With session, code runs in that
+        named namespace, so definitions persist between calls; call names a
+        function there to invoke with args/kwargs, its return value is sent back.
+
+        The code can call report_progress(fraction, message=None). With stream
+        set, stdout and progress are pushed to the client as "stdout" and
+        "progress" events while the code runs. The reply keeps at most
+        max_output characters of output.
+        """
+        # This is powerful but potentially dangerous - use with caution
+        if code is None and call is None:
+            raise ValueError("Provide code, call, or both")
+        if isinstance(max_output, bool) or not isinstance(max_output, int) or max_output < 1:
+            raise ValueError("max_output must be a positive integer")
+
+        code_session = None
+        if session is not None:
+            code_session = self.code_sessions.get(session)
+            if code_session is None:
+                raise ValueError(f"Code session not found: {session}. Create it with create_code_session")
+
+        connection = self._current_connection if stream else None
+        request_id = self._current_request_id
+
+        def send_event(event):
+            if connection is not None:
+                event["request_id"] = request_id
+                connection.send(event)
+
+        emit_stdout = (lambda text: send_event({"event": "stdout", "data": text})) if connection else None
+        output = CodeOutput(max_output, emit_stdout)
+        progress = {"fraction": None, "message": None, "sent_at": 0.0}
+
+        def report_progress(fraction, message=None):
+            progress["fraction"] = max(0.0, min(1.0, float(fraction)))
+            progress["message"] = message
+            now = time.perf_counter()
+            if progress["fraction"] >= 1.0 or now - progress["sent_at"] >= PROGRESS_MIN_INTERVAL:
+                progress["sent_at"] = now
+                # Keep stdout and progress in the order they happened
+                output.flush()
+                send_event({"event": "progress", "fraction": progress["fraction"], "message": message})
+
+        try:
+            # Use the session namespace, or a fresh one for one-off code
+            namespace = code_session.namespace if code_session else {"bpy": bpy}
+            namespace["report_progress"] = report_progress
+            compiled = self._compile_cached(code) if code is not None else None
+
+            # Capture stdout during execution, and return it as result
+            return_value = None
+            with redirect_stdout(output):
+                if compiled is not None:
+                    exec(compiled, namespace)
+                if call is not None:
+                    function = namespace.get(call)
+                    if not callable(function):
+                        raise ValueError(f"No callable named {call} in the namespace")
+                    return_value = function(*(args or []), **(kwargs or {}))
+
+            response = {"executed": True, "result": output.getvalue()}
+        except Exception as e:
+            raise Exception(f"Code execution error: {str(e)}")
+        finally:
+            output.flush()
+
+        if output.truncated:
+            response["truncated"] = True
+            response["output_chars"] = output.total_chars
+        if progress["fraction"] is not None:
+            response["progress"] = {"fraction": progress["fraction"], "message": progress["message"]}
+
+        if call is not None:
+            try:
+                json.dumps(return_value)
+                response["return_value"] = return_value
+            except (TypeError, ValueError):
+                response["return_value"] = repr(return_value)
+
+        if code_session:
+            code_session.calls += 1
+            code_session.last_used = time.time()
+            if code_session.measure(code_session.max_bytes) > code_session.max_bytes:
+                self.code_sessions.pop(code_session.name, None)
+                response["session_dropped"] = (
+                    f"Session {code_session.name} holds over {code_session.max_bytes} bytes, its limit"
+                )
+        return response
+
+    def _compile_cached(self, code):
+        key = hashlib.sha256(code.encode("utf-8")).hexdigest()
+        compiled = self.code_cache.get(key)
+        if compiled is not None:
+            self.code_cache.move_to_end(key)
+            self.code_cache_stats["hits"] += 1
+            return compiled
+
+        self.code_cache_stats["misses"] += 1
+        compiled = compile(code, f"<execute_code {key[:12]}>", "exec")
+        self.code_cache[key] = compiled
+        while len(self.code_cache) > CODE_CACHE_SIZE:
+            self.code_cache.popitem(last=False)
+        return compiled
+
+    def create_code_session(self, name, max_memory_mb=DEFAULT_SESSION_MEMORY_MB, code=None):
+        """Create a persistent execute_code namespace, optionally running setup code in it"""
+        if name in self.code_sessions:
+            raise ValueError(f"Code session already exists: {name}")
+        if len(self.code_sessions) >= MAX_CODE_SESSIONS:
+            raise ValueError(
+                f"Too many code sessions (limit {MAX_CODE_SESSIONS}); drop one with drop_code_session first"
+            )
+        code_session = CodeSession(name, int(max_memory_mb * 1024 * 1024))
+        self.code_sessions[name] = code_session
+        setup = None
+        if code is not None:
+            try:
+                setup = self.execute_code(code=code, session=name)
+            except Exception:
+                self.code_sessions.pop(name, None)
+                raise
+        result = code_session.to_dict()
+        if setup is not None:
+            result["setup"] = setup
+        return result
+
+    def reset_code_session(self, name):
+        """Clear everything defined in a session but keep the session"""
+        code_session = self.code_sessions.get(name)
+        if code_session is None:
+            raise ValueError(f"Code session not found: {name}")
+        code_session.reset()
+        return code_session.to_dict()
+
+    def drop_code_session(self, name):
+        """Delete a session and its namespace"""
+        if self.code_sessions.pop(name, None) is None:
+            raise ValueError(f"Code session not found: {name}")
+        return {"dropped": True, "name": name}
+
+    def list_code_sessions(self):
+        """List sessions and the compiled-code cache counters"""
+        return {
+            "sessions": [code_session.to_dict() for code_session in self.code_sessions.values()],
+            "max_sessions": MAX_CODE_SESSIONS,
+            "code_cache": {"entries": len(self.code_cache), "max_entries": CODE_CACHE_SIZE, **self.code_cache_stats},
+        }
+
+
+
+    def get_polyhaven_categories(self, asset_type):
+        """Get categories for a specific asset type from Polyhaven"""
+        try:
+            if asset_type not in ["hdris", "textures", "models", "all"]:
+                return {"error": f"Invalid asset type: {asset_type}. Must be one of: hdris, textures, models, all"}
+
+            response = requests.get(f"{POLYHAVEN_API_URL}/categories/{asset_type}", headers=REQ_HEADERS)
+            if response.status_code == 200:
+                return {"categories": response.json()}
+            else:
+                return {"error": f"API request failed with status code {response.status_code}"}
+        except Exception as e:
+            return {"error": str(e)}
+
+    def search_polyhaven_assets(self, asset_type=None, categories=None, tags=None, query=None,
+                                offset=0, limit=20, refresh=False):
+        """Search the local Poly Haven catalog with filters, text search and paging"""
+        try:
+            if asset_type and asset_type != "all" and asset_type not in ["hdris", "textures", "models"]:
+                return {"error": f"Invalid asset type: {asset_type}. Must be one of: hdris, textures, models, all"}
+
+            if refresh:
+                self.polyhaven_catalog.refresh(force=True)
+            return self.polyhaven_catalog.search(
+                asset_type=asset_type,
+                categories=categories,
+                tags=tags,
+                query=query,
+                offset=offset,
+                limit=limit,
+            )
+        except Exception as e:
+            return {"error": str(e)}
+
+    def download_polyhaven_asset(self, asset_id, asset_type, resolution="1k", file_format=None,
+                                 wait=None, subscribe=False):
+        """Download a Poly Haven asset on the job pool, then import it on the main thread.
+
+        Returns a job id right away unless wait is set (or the client never sent
+        "hello"), in which case the reply is the import result.
+        """
+        if asset_type not in ["hdris", "textures", "models"]:
+            return {"error": f"Unsupported asset type: {asset_type}"}
+
+        if not file_format:
+            file_format = {"hdris": "hdr", "textures": "jpg", "models": "gltf"}[asset_type]
+
+        finish = {
+            "hdris": self._import_polyhaven_hdri,
+            "textures": self._import_polyhaven_textures,
+            "models": self._import_polyhaven_model,
+        }[asset_type]
+
+        return self._start_job(
+            "download_polyhaven_asset",
+            {"asset_id": asset_id, "asset_type": asset_type, "resolution": resolution, "file_format": file_format},
+            lambda progress: self._fetch_polyhaven_asset(self.asset_cache, asset_id, asset_type, resolution, file_format, progress),
+            finish,
+            wait=wait,
+            subscribe=subscribe,
+        )
+
+    @staticmethod
+    def _fetch_polyhaven_asset(cache, asset_id, asset_type, resolution, file_format, progress=None):
+        """Worker thread: download every file the asset needs into a temp directory"""
+        fetch_start = time.perf_counter()
+        session = get_http_session()
+
+        # First get the files information
+        files_response = session.get(f"{POLYHAVEN_API_URL}/files/{asset_id}", headers=REQ_HEADERS)
+        if files_response.status_code != 200:
+            return {"error": f"Failed to get asset files: {files_response.status_code}"}
+
+        files_data = files_response.json()
+        timings = {"files_info_ms": round((time.perf_counter() - fetch_start) * 1000.0, 1)}
+        prepared = {"asset_id": asset_id, "file_format": file_format, "timings": timings}
+
+        if asset_type == "hdris":
+            if not ("hdri" in files_data and resolution in files_data["hdri"] and file_format in files_data["hdri"][resolution]):
+                return {"error": f"Requested resolution or format not available for this HDRI"}
+
+            file_url = files_data["hdri"][resolution][file_format]["url"]
+
+            # For HDRIs, we need to save to a temporary file first
+            # since Blender can't properly load HDR data directly from memory
+            with tempfile.NamedTemporaryFile(suffix=f".{file_format}", delete=False) as tmp_file:
+                tmp_path = tmp_file.name
+            cache_key = AssetCache.make_key("polyhaven", asset_id, resolution, file_format, "hdri")
+            download = cache.fetch(cache_key, file_url, tmp_path, progress=progress)
+            if download["status_code"] != 200:
+                with suppress(Exception):
+                    os.unlink(tmp_path)
+                return {"error": f"Failed to download HDRI: {download['status_code']}"}
+
+            timings["downloads"] = {"hdri": download}
+            timings["download_ms"] = download["ms"]
+            prepared["path"] = tmp_path
+            prepared["sha256"] = download.get("sha256")
+            return prepared
+
+        if asset_type == "textures":
+            temp_dir = tempfile.mkdtemp()
+            files = {}
+            for map_type in files_data:
+                if map_type not in ["blend", "gltf"]:  # Skip non-texture files
+                    if resolution in files_data[map_type] and file_format in files_data[map_type][resolution]:
+                        file_url = files_data[map_type][resolution][file_format]["url"]
+                        files[map_type] = (
+                            file_url,
+                            os.path.join(temp_dir, f"{asset_id}_{map_type}.{file_format}"),
+                            AssetCache.make_key("polyhaven", asset_id, resolution, file_format, map_type),
+                        )
+
+            try:
+                # All maps at once: the set costs roughly the slowest map, not the sum
+                download_start = time.perf_counter()
+                downloads = download_files(files, cache=cache, progress=progress)
+                timings["download_ms"] = round((time.perf_counter() - download_start) * 1000.0, 1)
+            except Exception:
+                with suppress(Exception):
+                    shutil.rmtree(temp_dir)
+                raise
+
+            timings["downloads"] = downloads
+            map_paths = {
+                map_type: files[map_type][1]
+                for map_type, download in downloads.items() if download["status_code"] == 200
+            }
+            if not map_paths:
+                with suppress(Exception):
+                    shutil.rmtree(temp_dir)
+                return {"error": f"No texture maps found for the requested resolution and format"}
+
+            prepared.update({
+                "temp_dir": temp_dir,
+                "map_paths": map_paths,
+                "map_hashes": {map_type: downloads[map_type].get("sha256") for map_type in map_paths},
+            })
+            return prepared
+
+        # models
+        if not (file_format in files_data and resolution in files_data[file_format]):
+            return {"error": f"Requested format or resolution not available for this model"}
+
+        file_info = files_data[file_format][resolution][file_format]
+        file_url = file_info["url"]
+
+        # Create a temporary directory to store the model and its dependencies
+        temp_dir = tempfile.mkdtemp()
+        main_file_name = file_url.split("/")[-1]
+        main_file_path = os.path.join(temp_dir, main_file_name)
+
+        # The main file and every included file are fetched together
+        files = {
+            main_file_name: (
+                file_url,
+                main_file_path,
+                AssetCache.make_key("polyhaven", asset_id, resolution, file_format, "main"),
+            )
+        }
+        for include_path, include_info in (file_info.get("include") or {}).items():
+            files[include_path] = (
+                include_info["url"],
+                os.path.join(temp_dir, include_path),
+                AssetCache.make_key("polyhaven", asset_id, resolution, file_format, include_path),
+            )
+
+        try:
+            download_start = time.perf_counter()
+            downloads = download_files(files, cache=cache, progress=progress)
+            timings["download_ms"] = round((time.perf_counter() - download_start) * 1000.0, 1)
+        except Exception:
+            with suppress(Exception):
+                shutil.rmtree(temp_dir)
+            raise
+
+        timings["downloads"] = downloads
+        if downloads[main_file_name]["status_code"] != 200:
+            with suppress(Exception):
+                shutil.rmtree(temp_dir)
+            return {"error": f"Failed to download model: {downloads[main_file_name]['status_code']}"}
+
+        for include_path, download in downloads.items():
+            if download["status_code"] != 200:
+                print(f"Failed to download included file: {include_path}")
+
+        prepared.update({"temp_dir": temp_dir, "main_file_path": main_file_path})
+        return prepared
+
+    @staticmethod
+    def _finish_timings(prepared, import_start):
+        """Download timings from the worker plus the main-thread import time"""
+        timings = dict(prepared.get("timings", {}))
+        timings["import_ms"] = round((time.perf_counter() - import_start) * 1000.0, 1)
+        return timings
+
+    def _import_polyhaven_hdri(self, prepared):
+        """Main thread: set up the world with a downloaded HDRI"""
+        asset_id = prepared["asset_id"]
+        file_format = prepared["file_format"]
+        import_start = time.perf_counter()
+        try:
+            # Create a new world if none exists
+            if not bpy.data.worlds:
+                bpy.data.worlds.new("World")
+
+            world = bpy.data.worlds[0]
+            world.use_nodes = True
+            node_tree = world.node_tree
+
+            # Clear existing nodes
+            for node in node_tree.nodes:
+                node_tree.nodes.remove(node)
+
+            # Create nodes
+            tex_coord = node_tree.nodes.new(type='ShaderNodeTexCoord')
+            tex_coord.location = (-800, 0)
+
+            mapping = node_tree.nodes.new(type='ShaderNodeMapping')
+            mapping.location = (-600, 0)
+
+            # Load the image from the temporary file, or reuse an identical one.
+            # Use a color space that exists in all Blender versions
+            if file_format.lower() == 'exr':
+                color_spaces = ('Linear', 'Non-Color')
+            else:  # hdr
+                color_spaces = ('Linear', 'Linear Rec.709', 'Non-Color')
+            env_tex = node_tree.nodes.new(type='ShaderNodeTexEnvironment')
+            env_tex.location = (-400, 0)
+            env_tex.image, reused = self._load_image_deduplicated(
+                prepared["path"], prepared.get("sha256"), color_spaces
+            )
+            if reused:
+                with suppress(OSError):
+                    os.unlink(prepared["path"])
+
+            background = node_tree.nodes.new(type='ShaderNodeBackground')
+            background.location = (-200, 0)
+
+            output = node_tree.nodes.new(type='ShaderNodeOutputWorld')
+            output.location = (0, 0)
+
+            # Connect nodes
+            node_tree.links.new(tex_coord.outputs['Generated'], mapping.inputs['Vector'])
+            node_tree.links.new(mapping.outputs['Vector'], env_tex.inputs['Vector'])
+            node_tree.links.new(env_tex.outputs['Color'], background.inputs['Color'])
+            node_tree.links.new(background.outputs['Background'], output.inputs['Surface'])
+
+            # Set as active world
+            bpy.context.scene.world = world
+
+            return {
+                "success": True,
+                "message": f"HDRI {asset_id} imported successfully",
+                "image_name": env_tex.image.name,
+                "image_reused": reused,
+                "timings": self._finish_timings(prepared, import_start),
+            }
+        except Exception as e:
+            return {"error": f"Failed to set up HDRI in Blender: {str(e)}"}
+
+    def _import_polyhaven_textures(self, prepared):
+        """Main thread: load downloaded texture maps and build a material from them"""
+        asset_id = prepared["asset_id"]
+        file_format = prepared["file_format"]
+        import_start = time.perf_counter()
+        downloaded_maps = {}
+        reused_maps = []
+
+        try:
+            for map_type, map_path in prepared["map_paths"].items():
+                # Load image from temporary file (or reuse an identical one) and
+                # pack it into the .blend file; color space depends on map type
+                image, reused = self._load_image_deduplicated(
+                    map_path,
+                    prepared.get("map_hashes", {}).get(map_type),
+                    texture_color_spaces(map_type),
+                    name=f"{asset_id}_{map_type}.{file_format}",
+                    pack=True,
+                )
+                if reused:
+                    reused_maps.append(map_type)
+
+                downloaded_maps[map_type] = image
+
+            # Create a new material with the downloaded textures
+            mat = bpy.data.materials.new(name=asset_id)
+            mat[TEXTURE_ASSET_PROPERTY] = asset_id
+            mat[TEXTURE_MAPS_PROPERTY] = json.dumps({
+                map_type: image.get(IMAGE_HASH_PROPERTY) for map_type, image in downloaded_maps.items()
+            })
+            mat.use_nodes = True
+            nodes = mat.node_tree.nodes
+            links = mat.node_tree.links
+
+            # Clear default nodes
+            for node in nodes:
+                nodes.remove(node)
+
+            # Create output node
+            output = nodes.new(type='ShaderNodeOutputMaterial')
+            output.location = (300, 0)
+
+            # Create principled BSDF node
+            principled = nodes.new(type='ShaderNodeBsdfPrincipled')
+            principled.location = (0, 0)
+            links.new(principled.outputs[0], output.inputs[0])
+
+            # Add texture nodes based on available maps
+            tex_coord = nodes.new(type='ShaderNodeTexCoord')
+            tex_coord.location = (-800, 0)
+
+            mapping = nodes.new(type='ShaderNodeMapping')
+            mapping.location = (-600, 0)
+            mapping.vector_type = 'TEXTURE'  # Changed from default 'POINT' to 'TEXTURE'
+            links.new(tex_coord.outputs['UV'], mapping.inputs['Vector'])
+
+            # Position offset for texture nodes
+            x_pos = -400
+            y_pos = 300
+
+            # Connect different texture maps
+            for map_type, image in downloaded_maps.items():
+                tex_node = nodes.new(type='ShaderNodeTexImage')
+                tex_node.location = (x_pos, y_pos)
+                # Already in the map's color space; a reused image is shared
+                # with other materials, so it is never switched here
+                tex_node.image = image
+
+                links.new(mapping.outputs['Vector'], tex_node.inputs['Vector'])
+
+                # Connect to appropriate input on Principled BSDF
+                if map_type.lower() in ['color', 'diffuse', 'albedo']:
+                    links.new(tex_node.outputs['Color'], principled.inputs['Base Color'])
+                elif map_type.lower() in ['roughness', 'rough']:
+                    links.new(tex_node.outputs['Color'], principled.inputs['Roughness'])
+                elif map_type.lower() in ['metallic', 'metalness', 'metal']:
+                    links.new(tex_node.outputs['Color'], principled.inputs['Metallic'])
+                elif map_type.lower() in ['normal', 'nor']:
+                    # Add normal map node
+                    normal_map = nodes.new(type='ShaderNodeNormalMap')
+                    normal_map.location = (x_pos + 200, y_pos)
+                    links.new(tex_node.outputs['Color'], normal_map.inputs['Color'])
+                    links.new(normal_map.outputs['Normal'], principled.inputs['Normal'])
+                elif map_type in ['displacement', 'disp', 'height']:
+                    # Add displacement node
+                    disp_node = nodes.new(type='ShaderNodeDisplacement')
+                    disp_node.location = (x_pos + 200, y_pos - 200)
+                    links.new(tex_node.outputs['Color'], disp_node.inputs['Height'])
+                    links.new(disp_node.outputs['Displacement'], output.inputs['Displacement'])
+
+                y_pos -= 250
 
             return {
                 "success": True,
-                "width": width,
-                "height": height,
-                "filepath": filepath
+                "message": f"Texture {asset_id} imported as material",
+                "material": mat.name,
+                "maps": list(downloaded_maps.keys()),
+                "reused_maps": reused_maps,
+                "timings": self._finish_timings(prepared, import_start),
             }
 
         except Exception as e:
-            return {"error": str(e)}
-
-    def execute_code(self, code):
-        """Execute arbitrary Blender Python code"""
-        # This is powerful but potentially dangerous - use with caution
-        try:
-            # Create a local namespace for execution
-            namespace = {"bpy": bpy}
-
-            # Capture stdout during execution, and return it as result
-            capture_buffer = io.StringIO()
-            with redirect_stdout(capture_buffer):
-                exec(code, namespace)
-
-            captured_output = capture_buffer.getvalue()
-            return {"executed": True, "result": captured_output}
-        except Exception as e:
-            raise Exception(f"Code execution error: {str(e)}")
-
+            return {"error": f"Failed to process textures: {str(e)}"}
+        finally:
+            # Images are packed, so the downloaded files are no longer needed
+            with suppress(Exception):
+                shutil.rmtree(prepared["temp_dir"])
 
+    def _import_polyhaven_model(self, prepared):
+        """Main thread: import a downloaded model and its included files"""
+        asset_id = prepared["asset_id"]
+        file_format = prepared["file_format"]
+        main_file_path = prepared["main_file_path"]
+        import_start = time.perf_counter()
 
-    def get_polyhaven_categories(self, asset_type):
-        """Get categories for a specific asset type from Polyhaven"""
         try:
-            if asset_type not in ["hdris", "textures", "models", "all"]:
-                return {"error": f"Invalid asset type: {asset_type}. Must be one of: hdris, textures, models, all"}
-
-            response = requests.get(f"https://api.polyhaven.com/categories/{asset_type}", headers=REQ_HEADERS)
-            if response.status_code == 200:
-                return {"categories": response.json()}
+            # Import the model into Blender
+            if file_format == "gltf" or file_format == "glb":
+                bpy.ops.import_scene.gltf(filepath=main_file_path)
+            elif file_format == "fbx":
+                bpy.ops.import_scene.fbx(filepath=main_file_path)
+            elif file_format == "obj":
+                bpy.ops.import_scene.obj(filepath=main_file_path)
+            elif file_format == "blend":
+                # For blend files, we need to append or link
+                with bpy.data.libraries.load(main_file_path, link=False) as (data_from, data_to):
+                    data_to.objects = data_from.objects
+
+                # Link the objects to the scene
+                for obj in data_to.objects:
+                    if obj is not None:
+                        bpy.context.collection.objects.link(obj)
             else:
-                return {"error": f"API request failed with status code {response.status_code}"}
-        except Exception as e:
-            return {"error": str(e)}
-
-    def search_polyhaven_assets(self, asset_type=None, categories=None):
-        """Search for assets from Polyhaven with optional filtering"""
-        try:
-            url = "https://api.polyhaven.com/assets"
-            params = {}
-
-            if asset_type and asset_type != "all":
-                if asset_type not in ["hdris", "textures", "models"]:
-                    return {"error": f"Invalid asset type: {asset_type}. Must be one of: hdris, textures, models, all"}
-                params["type"] = asset_type
-
-            if categories:
-                params["categories"] = categories
+                return {"error": f"Unsupported model format: {file_format}"}
 
-            response = requests.get(url, params=params, headers=REQ_HEADERS)
-            if response.status_code == 200:
-                # Limit the response size to avoid overwhelming Blender
-                assets = response.json()
-                # Return only the first 20 assets to keep response size manageable
-                limited_assets = {}
-                for i, (key, value) in enumerate(assets.items()):
-                    if i >= 20:  # Limit to 20 assets
-                        break
-                    limited_assets[key] = value
+            # Get the names of imported objects
+            imported_objects = [obj.name for obj in bpy.context.selected_objects]
 
-                return {"assets": limited_assets, "total_count": len(assets), "returned_count": len(limited_assets)}
-            else:
-                return {"error": f"API request failed with status code {response.status_code}"}
+            return {
+                "success": True,
+                "message": f"Model {asset_id} imported successfully",
+                "imported_objects": imported_objects,
+                "timings": self._finish_timings(prepared, import_start),
+            }
         except Exception as e:
-            return {"error": str(e)}
-
-    def download_polyhaven_asset(self, asset_id, asset_type, resolution="1k", file_format=None):
-        try:
-            # First get the files information
-            files_response = requests.get(f"https://api.polyhaven.com/files/{asset_id}", headers=REQ_HEADERS)
-            if files_response.status_code != 200:
-                return {"error": f"Failed to get asset files: {files_response.status_code}"}
-
-            files_data = files_response.json()
-
-            # Handle different asset types
-            if asset_type == "hdris":
-                # For HDRIs, download the .hdr or .exr file
-                if not file_format:
-                    file_format = "hdr"  # Default format for HDRIs
-
-                if "hdri" in files_data and resolution in files_data["hdri"] and file_format in files_data["hdri"][resolution]:
-                    file_info = files_data["hdri"][resolution][file_format]
-                    file_url = file_info["url"]
-
-                    # For HDRIs, we need to save to a temporary file first
-                    # since Blender can't properly load HDR data directly from memory
-                    with tempfile.NamedTemporaryFile(suffix=f".{file_format}", delete=False) as tmp_file:
-                        # Download the file
-                        response = requests.get(file_url, headers=REQ_HEADERS)
-                        if response.status_code != 200:
-                            return {"error": f"Failed to download HDRI: {response.status_code}"}
-
-                        tmp_file.write(response.content)
-                        tmp_path = tmp_file.name
-
-                    try:
-                        # Create a new world if none exists
-                        if not bpy.data.worlds:
-                            bpy.data.worlds.new("World")
-
-                        world = bpy.data.worlds[0]
-                        world.use_nodes = True
-                        node_tree = world.node_tree
-
-                        # Clear existing nodes
-                        for node in node_tree.nodes:
-                            node_tree.nodes.remove(node)
-
-                        # Create nodes
-                        tex_coord = node_tree.nodes.new(type='ShaderNodeTexCoord')
-                        tex_coord.location = (-800, 0)
-
-                        mapping = node_tree.nodes.new(type='ShaderNodeMapping')
-                        mapping.location = (-600, 0)
-
-                        # Load the image from the temporary file
-                        env_tex = node_tree.nodes.new(type='ShaderNodeTexEnvironment')
-                        env_tex.location = (-400, 0)
-                        env_tex.image = bpy.data.images.load(tmp_path)
-
-                        # Use a color space that exists in all Blender versions
-                        if file_format.lower() == 'exr':
-                            # Try to use Linear color space for EXR files
-                            try:
-                                env_tex.image.colorspace_settings.name = 'Linear'
-                            except:
-                                # Fallback to Non-Color if Linear isn't available
-                                env_tex.image.colorspace_settings.name = 'Non-Color'
-                        else:  # hdr
-                            # For HDR files, try these options in order
-                            for color_space in ['Linear', 'Linear Rec.709', 'Non-Color']:
-                                try:
-                                    env_tex.image.colorspace_settings.name = color_space
-                                    break  # Stop if we successfully set a color space
-                                except:
-                                    continue
-
-                        background = node_tree.nodes.new(type='ShaderNodeBackground')
-                        background.location = (-200, 0)
-
-                        output = node_tree.nodes.new(type='ShaderNodeOutputWorld')
-                        output.location = (0, 0)
-
-                        # Connect nodes
-                        node_tree.links.new(tex_coord.outputs['Generated'], mapping.inputs['Vector'])
-                        node_tree.links.new(mapping.outputs['Vector'], env_tex.inputs['Vector'])
-                        node_tree.links.new(env_tex.outputs['Color'], background.inputs['Color'])
-                        node_tree.links.new(background.outputs['Background'], output.inputs['Surface'])
-
-                        # Set as active world
-                        bpy.context.scene.world = world
-
-                        # Clean up temporary file
-                        try:
-                            tempfile._cleanup()  # This will clean up all temporary files
-                        except:
-                            pass
-
-                        return {
-                            "success": True,
-                            "message": f"HDRI {asset_id} imported successfully",
-                            "image_name": env_tex.image.name
-                        }
-                    except Exception as e:
-                        return {"error": f"Failed to set up HDRI in Blender: {str(e)}"}
-                else:
-                    return {"error": f"Requested resolution or format not available for this HDRI"}
-
-            elif asset_type == "textures":
-                if not file_format:
-                    file_format = "jpg"  # Default format for textures
-
-                downloaded_maps = {}
+            return {"error": f"Failed to import model: {str(e)}"}
+        finally:
+            # Clean up temporary directory
+            with suppress(Exception):
+                shutil.rmtree(prepared["temp_dir"])
 
-                try:
-                    for map_type in files_data:
-                        if map_type not in ["blend", "gltf"]:  # Skip non-texture files
-                            if resolution in files_data[map_type] and file_format in files_data[map_type][resolution]:
-                                file_info = files_data[map_type][resolution][file_format]
-                                file_url = file_info["url"]
-
-                                # Use NamedTemporaryFile like we do for HDRIs
-                                with tempfile.NamedTemporaryFile(suffix=f".{file_format}", delete=False) as tmp_file:
-                                    # Download the file
-                                    response = requests.get(file_url, headers=REQ_HEADERS)
-                                    if response.status_code == 200:
-                                        tmp_file.write(response.content)
-                                        tmp_path = tmp_file.name
-
-                                        # Load image from temporary file
-                                        image = bpy.data.images.load(tmp_path)
-                                        image.name = f"{asset_id}_{map_type}.{file_format}"
-
-                                        # Pack the image into .blend file
-                                        image.pack()
-
-                                        # Set color space based on map type
-                                        if map_type in ['color', 'diffuse', 'albedo']:
-                                            try:
-                                                image.colorspace_settings.name = 'sRGB'
-                                            except:
-                                                pass
-                                        else:
-                                            try:
-                                                image.colorspace_settings.name = 'Non-Color'
-                                            except:
-                                                pass
-
-                                        downloaded_maps[map_type] = image
-
-                                        # Clean up temporary file
-                                        try:
-                                            os.unlink(tmp_path)
-                                        except:
-                                            pass
-
-                    if not downloaded_maps:
-                        return {"error": f"No texture maps found for the requested resolution and format"}
-
-                    # Create a new material with the downloaded textures
-                    mat = bpy.data.materials.new(name=asset_id)
-                    mat.use_nodes = True
-                    nodes = mat.node_tree.nodes
-                    links = mat.node_tree.links
-
-                    # Clear default nodes
-                    for node in nodes:
-                        nodes.remove(node)
-
-                    # Create output node
-                    output = nodes.new(type='ShaderNodeOutputMaterial')
-                    output.location = (300, 0)
-
-                    # Create principled BSDF node
-                    principled = nodes.new(type='ShaderNodeBsdfPrincipled')
-                    principled.location = (0, 0)
-                    links.new(principled.outputs[0], output.inputs[0])
-
-                    # Add texture nodes based on available maps
-                    tex_coord = nodes.new(type='ShaderNodeTexCoord')
-                    tex_coord.location = (-800, 0)
-
-                    mapping = nodes.new(type='ShaderNodeMapping')
-                    mapping.location = (-600, 0)
-                    mapping.vector_type = 'TEXTURE'  # Changed from default 'POINT' to 'TEXTURE'
-                    links.new(tex_coord.outputs['UV'], mapping.inputs['Vector'])
-
-                    # Position offset for texture nodes
-                    x_pos = -400
-                    y_pos = 300
-
-                    # Connect different texture maps
-                    for map_type, image in downloaded_maps.items():
-                        tex_node = nodes.new(type='ShaderNodeTexImage')
-                        tex_node.location = (x_pos, y_pos)
-                        tex_node.image = image
-
-                        # Set color space based on map type
-                        if map_type.lower() in ['color', 'diffuse', 'albedo']:
-                            try:
-                                tex_node.image.colorspace_settings.name = 'sRGB'
-                            except:
-                                pass  # Use default if sRGB not available
-                        else:
-                            try:
-                                tex_node.image.colorspace_settings.name = 'Non-Color'
-                            except:
-                                pass  # Use default if Non-Color not available
-
-                        links.new(mapping.outputs['Vector'], tex_node.inputs['Vector'])
-
-                        # Connect to appropriate input on Principled BSDF
-                        if map_type.lower() in ['color', 'diffuse', 'albedo']:
-                            links.new(tex_node.outputs['Color'], principled.inputs['Base Color'])
-                        elif map_type.lower() in ['roughness', 'rough']:
-                            links.new(tex_node.outputs['Color'], principled.inputs['Roughness'])
-                        elif map_type.lower() in ['metallic', 'metalness', 'metal']:
-                            links.new(tex_node.outputs['Color'], principled.inputs['Metallic'])
-                        elif map_type.lower() in ['normal', 'nor']:
-                            # Add normal map node
-                            normal_map = nodes.new(type='ShaderNodeNormalMap')
-                            normal_map.location = (x_pos + 200, y_pos)
-                            links.new(tex_node.outputs['Color'], normal_map.inputs['Color'])
-                            links.new(normal_map.outputs['Normal'], principled.inputs['Normal'])
-                        elif map_type in ['displacement', 'disp', 'height']:
-                            # Add displacement node
-                            disp_node = nodes.new(type='ShaderNodeDisplacement')
-                            disp_node.location = (x_pos + 200, y_pos - 200)
-                            links.new(tex_node.outputs['Color'], disp_node.inputs['Height'])
-                            links.new(disp_node.outputs['Displacement'], output.inputs['Displacement'])
-
-                        y_pos -= 250
+    def _load_image_deduplicated(self, path, sha256=None, color_spaces=(), name=None, pack=False):
+        """Main thread: reuse an image with the same content and color space, or load path.
 
-                    return {
-                        "success": True,
-                        "message": f"Texture {asset_id} imported as material",
-                        "material": mat.name,
-                        "maps": list(downloaded_maps.keys())
-                    }
+        color_spaces are tried in order on a new image; an existing one matches
+        if it uses any of them. New images are tagged with their content hash
+        so the match survives saving and reopening the file. Returns (image, reused).
+        """
+        sha256 = sha256 or AssetCache._hash_file(path)
+        image = self._find_image_by_hash(sha256, color_spaces)
+        if image is not None:
+            self.image_index_stats["reused"] += 1
+            if pack and not image.packed_file:
+                image.pack()
+            return image, True
+
+        image = bpy.data.images.load(path)
+        if name:
+            image.name = name
+        for color_space in color_spaces:
+            try:
+                image.colorspace_settings.name = color_space
+                break
+            except Exception:
+                continue
+        if pack:
+            image.pack()
+        image[IMAGE_HASH_PROPERTY] = sha256
+        self.image_index[(sha256, image.colorspace_settings.name)] = image.name
+        self.image_index_stats["loaded"] += 1
+        return image, False
+
+    def _find_image_by_hash(self, sha256, color_spaces=()):
+        """Look an image up by content hash, rescanning bpy.data.images if the index is stale"""
+        for color_space in color_spaces:
+            image = bpy.data.images.get(self.image_index.get((sha256, color_space), ""))
+            if image is not None and image.get(IMAGE_HASH_PROPERTY) == sha256 \
+                    and image.colorspace_settings.name == color_space:
+                return image
+
+        # Renamed images, or ones tagged in an earlier session
+        for image in bpy.data.images:
+            if image.get(IMAGE_HASH_PROPERTY) != sha256:
+                continue
+            color_space = image.colorspace_settings.name
+            if color_spaces and color_space not in color_spaces:
+                continue
+            self.image_index[(sha256, color_space)] = image.name
+            return image
+        return None
+
+    def merge_duplicate_images(self, dry_run=False):
+        """Report images with identical content and color space, and merge each group.
+
+        The kept image is a packed one if any, then one this addon imported,
+        then the one with most users. Users of the others are remapped to it
+        and the others removed. Every hashed image is tagged so later imports
+        reuse it. dry_run only reports.
+        """
+        groups = {}
+        skipped = []
+        scanned = 0
+        for image in bpy.data.images:
+            if image.source != 'FILE' or image.is_dirty:
+                continue
+            scanned += 1
+            try:
+                sha256 = image_content_hash(image)
+            except OSError:
+                sha256 = None
+            if sha256 is None:
+                skipped.append(image.name)
+                continue
+            groups.setdefault((sha256, image.colorspace_settings.name), []).append(image)
+
+        report = []
+        removed = 0
+        packed_bytes_saved = 0
+        for (sha256, color_space), images in groups.items():
+            images.sort(key=lambda image: (
+                image.packed_file is None,
+                image.get(IMAGE_HASH_PROPERTY) != sha256,  # Our own imports keep their names
+                -image.users,
+                image.name,
+            ))
+            keep, duplicates = images[0], images[1:]
+            if duplicates:
+                saved = sum(image.packed_file.size for image in duplicates if image.packed_file)
+                packed_bytes_saved += saved
+                report.append({
+                    "sha256": sha256,
+                    "color_space": color_space,
+                    "keep": keep.name,
+                    "duplicates": [image.name for image in duplicates],
+                    "packed_bytes": saved,
+                })
+            if dry_run:
+                continue
+
+            for duplicate in duplicates:
+                duplicate.user_remap(keep)
+                bpy.data.images.remove(duplicate)
+                removed += 1
+            keep[IMAGE_HASH_PROPERTY] = sha256
+            self.image_index[(sha256, color_space)] = keep.name
 
-                except Exception as e:
-                    return {"error": f"Failed to process textures: {str(e)}"}
-
-            elif asset_type == "models":
-                # For models, prefer glTF format if available
-                if not file_format:
-                    file_format = "gltf"  # Default format for models
-
-                if file_format in files_data and resolution in files_data[file_format]:
-                    file_info = files_data[file_format][resolution][file_format]
-                    file_url = file_info["url"]
-
-                    # Create a temporary directory to store the model and its dependencies
-                    temp_dir = tempfile.mkdtemp()
-                    main_file_path = ""
-
-                    try:
-                        # Download the main model file
-                        main_file_name = file_url.split("/")[-1]
-                        main_file_path = os.path.join(temp_dir, main_file_name)
-
-                        response = requests.get(file_url, headers=REQ_HEADERS)
-                        if response.status_code != 200:
-                            return {"error": f"Failed to download model: {response.status_code}"}
-
-                        with open(main_file_path, "wb") as f:
-                            f.write(response.content)
-
-                        # Check for included files and download them
-                        if "include" in file_info and file_info["include"]:
-                            for include_path, include_info in file_info["include"].items():
-                                # Get the URL for the included file - this is the fix
-                                include_url = include_info["url"]
-
-                                # Create the directory structure for the included file
-                                include_file_path = os.path.join(temp_dir, include_path)
-                                os.makedirs(os.path.dirname(include_file_path), exist_ok=True)
-
-                                # Download the included file
-                                include_response = requests.get(include_url, headers=REQ_HEADERS)
-                                if include_response.status_code == 200:
-                                    with open(include_file_path, "wb") as f:
-                                        f.write(include_response.content)
-                                else:
-                                    print(f"Failed to download included file: {include_path}")
-
-                        # Import the model into Blender
-                        if file_format == "gltf" or file_format == "glb":
-                            bpy.ops.import_scene.gltf(filepath=main_file_path)
-                        elif file_format == "fbx":
-                            bpy.ops.import_scene.fbx(filepath=main_file_path)
-                        elif file_format == "obj":
-                            bpy.ops.import_scene.obj(filepath=main_file_path)
-                        elif file_format == "blend":
-                            # For blend files, we need to append or link
-                            with bpy.data.libraries.load(main_file_path, link=False) as (data_from, data_to):
-                                data_to.objects = data_from.objects
-
-                            # Link the objects to the scene
-                            for obj in data_to.objects:
-                                if obj is not None:
-                                    bpy.context.collection.objects.link(obj)
-                        else:
-                            return {"error": f"Unsupported model format: {file_format}"}
-
-                        # Get the names of imported objects
-                        imported_objects = [obj.name for obj in bpy.context.selected_objects]
-
-                        return {
-                            "success": True,
-                            "message": f"Model {asset_id} imported successfully",
-                            "imported_objects": imported_objects
-                        }
-                    except Exception as e:
-                        return {"error": f"Failed to import model: {str(e)}"}
-                    finally:
-                        # Clean up temporary directory
-                        with suppress(Exception):
-                            shutil.rmtree(temp_dir)
-                else:
-                    return {"error": f"Requested format or resolution not available for this model"}
+        return {
+            "dry_run": dry_run,
+            "images_scanned": scanned,
+            "duplicate_groups": len(report),
+            "groups": report,
+            "removed_images": removed,
+            "packed_bytes_saved": packed_bytes_saved,
+            "unhashed_images": skipped,
+            "import_reuse": dict(self.image_index_stats),
+        }
 
-            else:
-                return {"error": f"Unsupported asset type: {asset_type}"}
+    def _texture_images(self, asset_id):
+        """Main thread: {map type: image} for a downloaded Poly Haven texture.
 
-        except Exception as e:
-            return {"error": f"Failed to download asset: {str(e)}"}
+        Maps are found by the content hashes its material recorded, since a
+        reused image keeps the name of the asset that loaded it first. Textures
+        imported without that record fall back to the "<asset_id>_<map>" names.
+        """
+        for material in bpy.data.materials:
+            if material.get(TEXTURE_ASSET_PROPERTY) != asset_id:
+                continue
+            try:
+                map_hashes = json.loads(material.get(TEXTURE_MAPS_PROPERTY) or "{}")
+            except ValueError:
+                continue
+            images = {}
+            for map_type, sha256 in map_hashes.items():
+                image = sha256 and (self._find_image_by_hash(sha256, texture_color_spaces(map_type))
+                                    or self._find_image_by_hash(sha256))
+                if image:
+                    images[map_type] = self._image_in_color_space(image, texture_color_spaces(map_type))
+            if images:
+                return images
+
+        candidates = {}
+        for image in bpy.data.images:
+            if image.name.startswith(asset_id + "_"):
+                # Extract the map type from the image name
+                candidates.setdefault(image.name.split('_')[-1].split('.')[0], []).append(image)
+        images = {}
+        for map_type, found in candidates.items():
+            # Prefer a copy made in the right color space by an earlier call
+            color_spaces = texture_color_spaces(map_type)
+            image = next((image for image in found if image.colorspace_settings.name in color_spaces), found[0])
+            images[map_type] = self._image_in_color_space(image, color_spaces)
+        return images
+
+    def _image_in_color_space(self, image, color_spaces):
+        """Main thread: image if it uses one of color_spaces, else a copy that does.
+
+        An image with the right content but another color space may be used by
+        other materials, so it is copied rather than switched in place.
+        """
+        if image.colorspace_settings.name in color_spaces:
+            return image
+        sha256 = image.get(IMAGE_HASH_PROPERTY)
+        existing = self._find_image_by_hash(sha256, color_spaces) if sha256 else None
+        if existing is not None:
+            return existing
+
+        copy = image.copy()
+        for color_space in color_spaces:
+            try:
+                copy.colorspace_settings.name = color_space
+                break
+            except Exception:
+                continue
+        if sha256:
+            copy[IMAGE_HASH_PROPERTY] = sha256
+            self.image_index[(sha256, copy.colorspace_settings.name)] = copy.name
+        return copy
 
     def set_texture(self, object_name, texture_id):
         """Apply a previously downloaded Polyhaven texture to an object by creating a new material"""
@@ -803,38 +4034,23 @@ class BlenderMCPServer:
 
             # Find all images related to this texture and ensure they're properly loaded
             texture_images = {}
-            for img in bpy.data.images:
-                if img.name.startswith(texture_id + "_"):
-                    # Extract the map type from the image name
-                    map_type = img.name.split('_')[-1].split('.')[0]
-
-                    # Force a reload of the image
-                    img.reload()
-
-                    # Ensure proper color space
-                    if map_type.lower() in ['color', 'diffuse', 'albedo']:
-                        try:
-                            img.colorspace_settings.name = 'sRGB'
-                        except:
-                            pass
-                    else:
-                        try:
-                            img.colorspace_settings.name = 'Non-Color'
-                        except:
-                            pass
+            for map_type, img in self._texture_images(texture_id).items():
+                # Images may be shared with other materials: they are neither
+                # reloaded nor switched to another color space here, and
+                # _texture_images only returns ones in the map's color space
 
-                    # Ensure the image is packed
-                    if not img.packed_file:
-                        img.pack()
+                # Ensure the image is packed
+                if not img.packed_file:
+                    img.pack()
 
-                    texture_images[map_type] = img
-                    print(f"Loaded texture map: {map_type} - {img.name}")
+                texture_images[map_type] = img
+                print(f"Loaded texture map: {map_type} - {img.name}")
 
-                    # Debug info
-                    print(f"Image size: {img.size[0]}x{img.size[1]}")
-                    print(f"Color space: {img.colorspace_settings.name}")
-                    print(f"File format: {img.file_format}")
-                    print(f"Is packed: {bool(img.packed_file)}")
+                # Debug info
+                print(f"Image size: {img.size[0]}x{img.size[1]}")
+                print(f"Color space: {img.colorspace_settings.name}")
+                print(f"File format: {img.file_format}")
+                print(f"Is packed: {bool(img.packed_file)}")
 
             if not texture_images:
                 return {"error": f"No texture images found for: {texture_id}. Please download the texture first."}
@@ -885,18 +4101,6 @@ class BlenderMCPServer:
                 tex_node.location = (x_pos, y_pos)
                 tex_node.image = image
 
-                # Set color space based on map type
-                if map_type.lower() in ['color', 'diffuse', 'albedo']:
-                    try:
-                        tex_node.image.colorspace_settings.name = 'sRGB'
-                    except:
-                        pass  # Use default if sRGB not available
-                else:
-                    try:
-                        tex_node.image.colorspace_settings.name = 'Non-Color'
-                    except:
-                        pass  # Use default if Non-Color not available
-
                 links.new(mapping.outputs['Vector'], tex_node.inputs['Vector'])
 
                 # Connect to appropriate input on Principled BSDF
@@ -1137,15 +4341,119 @@ class BlenderMCPServer:
                             3. Restart the connection to Claude"""
             }
 
-    def create_rodin_job(self, *args, **kwargs):
+    def create_rodin_job(self, *args, watch=False, subscribe=False, import_name=None, **kwargs):
+        """Submit a generation; watch, subscribe or import_name also track it server-side.
+
+        A tracked job is polled by the addon itself, subscribe pushes its
+        status changes and completion to this connection, and import_name
+        imports the GLB under that name as soon as it is done.
+        """
         match bpy.context.scene.blendermcp_hyper3d_mode:
             case "MAIN_SITE":
-                return self.create_rodin_job_main_site(*args, **kwargs)
+                data = self.create_rodin_job_main_site(*args, **kwargs)
             case "FAL_AI":
-                return self.create_rodin_job_fal_ai(*args, **kwargs)
+                data = self.create_rodin_job_fal_ai(*args, **kwargs)
             case _:
                 return f"Error: Unknown Hyper3D Rodin mode!"
 
+        if not (watch or subscribe or import_name) or not isinstance(data, dict) or data.get("error"):
+            return data
+        try:
+            if bpy.context.scene.blendermcp_hyper3d_mode == "MAIN_SITE":
+                tracked = self.watch_rodin_job(
+                    subscription_key=data["jobs"]["subscription_key"],
+                    task_uuid=data["uuid"],
+                    import_name=import_name,
+                    subscribe=subscribe,
+                )
+            else:
+                tracked = self.watch_rodin_job(
+                    request_id=data["request_id"],
+                    import_name=import_name,
+                    subscribe=subscribe,
+                )
+        except (KeyError, TypeError, ValueError) as e:
+            return {**data, "watch_error": f"Could not track the job: {e}"}
+        return {**data, "watch": tracked}
+
+    def watch_rodin_job(self, subscription_key=None, task_uuid=None, request_id=None,
+                        import_name=None, subscribe=True):
+        """Have the addon poll a submitted generation instead of the client.
+
+        Main site jobs need subscription_key (and task_uuid to auto-import),
+        fal.ai jobs need request_id. With subscribe the connection receives
+        rodin_job_status events on changes and one rodin_job_completed event;
+        with import_name the GLB is imported as a background job when done.
+        """
+        mode = bpy.context.scene.blendermcp_hyper3d_mode
+        if mode == "MAIN_SITE":
+            if not subscription_key:
+                raise ValueError("Main site jobs are watched by subscription_key")
+            if import_name and not task_uuid:
+                raise ValueError("Importing a main site job needs its task_uuid")
+            key = subscription_key
+        elif mode == "FAL_AI":
+            if not request_id:
+                raise ValueError("fal.ai jobs are watched by request_id")
+            key = request_id
+        else:
+            raise ValueError(f"Unknown Hyper3D Rodin mode: {mode}")
+
+        connection = self._current_connection if subscribe else None
+        watch = self.rodin_poller.watch(
+            mode,
+            bpy.context.scene.blendermcp_hyper3d_api_key,
+            key,
+            task_uuid=task_uuid,
+            import_name=import_name,
+            subscriber=connection,
+        )
+        if watch.finished and connection is not None:
+            connection.send({"event": "rodin_job_completed", "rodin_job": watch.to_dict()})
+        return watch.to_dict()
+
+    def list_rodin_jobs(self, status=None):
+        """List generations the addon is polling or has finished polling"""
+        return {
+            "rodin_jobs": [
+                watch.to_dict()
+                for watch in self.rodin_poller.list()
+                if status is None or watch.status == status
+            ]
+        }
+
+    def unwatch_rodin_job(self, watch_id):
+        """Stop polling a generation; the job itself keeps running at Rodin"""
+        watch = self.rodin_poller.unwatch(watch_id)
+        if not watch:
+            raise ValueError(f"Rodin job not watched: {watch_id}")
+        return {"unwatched": True, **watch.to_dict()}
+
+    def _on_rodin_job_finished(self, watch):
+        """Poller thread: start the auto-import of a finished generation"""
+        if watch.status != "completed" or not watch.import_name:
+            return
+        name = watch.import_name
+        if watch.mode == "MAIN_SITE":
+            description = {"mode": "MAIN_SITE", "task_uuid": watch.task_uuid, "name": name}
+            fetch = lambda progress: self._fetch_generated_asset_main_site(
+                self.asset_cache, watch.api_key, watch.task_uuid, progress
+            )
+        else:
+            description = {"mode": "FAL_AI", "request_id": watch.id, "name": name}
+            fetch = lambda progress: self._fetch_generated_asset_fal_ai(
+                self.asset_cache, watch.api_key, watch.id, progress
+            )
+        started = self._start_job(
+            "import_generated_asset",
+            description,
+            fetch,
+            lambda prepared: self._import_generated_glb(prepared["path"], name),
+            wait=False,
+            subscribers=list(watch.subscribers),
+        )
+        watch.import_job_id = started["job_id"]
+
     def create_rodin_job_main_site(
             self,
             text_prompt: str=None,
@@ -1166,7 +4474,7 @@ class BlenderMCPServer:
             if bbox_condition:
                 files.append(("bbox_condition", (None, json.dumps(bbox_condition))))
             response = requests.post(
-                "https://hyperhuman.deemos.com/api/v2/rodin",
+                f"{RODIN_API_URL}/rodin",
                 headers={
                     "Authorization": f"Bearer {bpy.context.scene.blendermcp_hyper3d_api_key}",
                 },
@@ -1194,7 +4502,7 @@ class BlenderMCPServer:
             if bbox_condition:
                 req_data["bbox_condition"] = bbox_condition
             response = requests.post(
-                "https://queue.fal.run/fal-ai/hyper3d/rodin",
+                f"{FAL_AI_RODIN_URL}/rodin",
                 headers={
                     "Authorization": f"Key {bpy.context.scene.blendermcp_hyper3d_api_key}",
                     "Content-Type": "application/json",
@@ -1216,31 +4524,48 @@ class BlenderMCPServer:
                 return f"Error: Unknown Hyper3D Rodin mode!"
 
     def poll_rodin_job_status_main_site(self, subscription_key: str):
-        """Call the job status API to get the job status"""
-        response = requests.post(
-            "https://hyperhuman.deemos.com/api/v2/status",
-            headers={
-                "Authorization": f"Bearer {bpy.context.scene.blendermcp_hyper3d_api_key}",
-            },
-            json={
-                "subscription_key": subscription_key,
-            },
+        """Call the job status API to get the job status, or answer from the poller"""
+        watch = self.rodin_poller.get(subscription_key)
+        if watch and watch.detail is not None:
+            return {"status_list": watch.detail, "polled_at": watch.last_polled_at}
+        api_key = bpy.context.scene.blendermcp_hyper3d_api_key
+        return self._request_rodin_status(
+            {"mode": "MAIN_SITE", "subscription_key": subscription_key},
+            lambda: request_rodin_status_main_site(api_key, subscription_key),
         )
-        data = response.json()
-        return {
-            "status_list": [i["status"] for i in data["jobs"]]
-        }
 
     def poll_rodin_job_status_fal_ai(self, request_id: str):
-        """Call the job status API to get the job status"""
-        response = requests.get(
-            f"https://queue.fal.run/fal-ai/hyper3d/requests/{request_id}/status",
-            headers={
-                "Authorization": f"KEY {bpy.context.scene.blendermcp_hyper3d_api_key}",
-            },
+        """Call the job status API to get the job status, or answer from the poller"""
+        watch = self.rodin_poller.get(request_id)
+        if watch and watch.detail is not None:
+            return {**watch.detail, "polled_at": watch.last_polled_at}
+        api_key = bpy.context.scene.blendermcp_hyper3d_api_key
+        return self._request_rodin_status(
+            {"mode": "FAL_AI", "request_id": request_id},
+            lambda: request_rodin_status_fal_ai(api_key, request_id),
+        )
+
+    def _request_rodin_status(self, description, request):
+        """Run a one-off status request on the job pool and reply when it returns.
+
+        The API's JSON error body is passed through as the result, as it was
+        before the poller needed failed requests to raise, even when it has an
+        "error" key. Only a request without a JSON answer fails the job.
+        """
+        def fetch(progress):
+            try:
+                return request()
+            except requests.HTTPError as e:
+                try:
+                    return e.response.json()
+                except ValueError:
+                    raise RuntimeError(f"Status request failed with status code {e.response.status_code}") from None
+
+        if self._in_batch:
+            return fetch(None)
+        return self._start_job(
+            "poll_rodin_job_status", description, fetch, lambda status: status, wait=True, raw_result=True
         )
-        data = response.json()
-        return data
 
     @staticmethod
     def _clean_imported_glb(filepath, mesh_name=None):
@@ -1318,110 +4643,109 @@ class BlenderMCPServer:
             case _:
                 return f"Error: Unknown Hyper3D Rodin mode!"
 
-    def import_generated_asset_main_site(self, task_uuid: str, name: str):
-        """Fetch the generated asset, import into blender"""
+    def import_generated_asset_main_site(self, task_uuid: str, name: str, wait=None, subscribe=False):
+        """Fetch the generated asset on the job pool, import into blender on the main thread"""
+        api_key = bpy.context.scene.blendermcp_hyper3d_api_key
+        return self._start_job(
+            "import_generated_asset",
+            {"mode": "MAIN_SITE", "task_uuid": task_uuid, "name": name},
+            lambda progress: self._fetch_generated_asset_main_site(self.asset_cache, api_key, task_uuid, progress),
+            lambda prepared: self._import_generated_glb(prepared["path"], name),
+            wait=wait,
+            subscribe=subscribe,
+        )
+
+    @staticmethod
+    def _fetch_generated_asset_main_site(cache, api_key, task_uuid, progress=None):
+        """Worker thread: download the generated GLB of a main site task"""
+        cache_key = AssetCache.make_key("hyper3d", task_uuid, "default", "glb")
+        cached = BlenderMCPServer._cached_generated_glb(cache, cache_key, task_uuid, progress)
+        if cached:
+            return cached
+
         response = requests.post(
-            "https://hyperhuman.deemos.com/api/v2/download",
+            f"{RODIN_API_URL}/download",
             headers={
-                "Authorization": f"Bearer {bpy.context.scene.blendermcp_hyper3d_api_key}",
+                "Authorization": f"Bearer {api_key}",
             },
             json={
                 'task_uuid': task_uuid
             }
         )
         data_ = response.json()
-        temp_file = None
         for i in data_["list"]:
             if i["name"].endswith(".glb"):
-                temp_file = tempfile.NamedTemporaryFile(
-                    delete=False,
-                    prefix=task_uuid,
-                    suffix=".glb",
-                )
-
-                try:
-                    # Download the content
-                    response = requests.get(i["url"], stream=True)
-                    response.raise_for_status()  # Raise an exception for HTTP errors
-
-                    # Write the content to the temporary file
-                    for chunk in response.iter_content(chunk_size=8192):
-                        temp_file.write(chunk)
-
-                    # Close the file
-                    temp_file.close()
-
-                except Exception as e:
-                    # Clean up the file if there's an error
-                    temp_file.close()
-                    os.unlink(temp_file.name)
-                    return {"succeed": False, "error": str(e)}
-
-                break
-        else:
-            return {"succeed": False, "error": "Generation failed. Please first make sure that all jobs of the task are done and then try again later."}
-
-        try:
-            obj = self._clean_imported_glb(
-                filepath=temp_file.name,
-                mesh_name=name
-            )
-            result = {
-                "name": obj.name,
-                "type": obj.type,
-                "location": [obj.location.x, obj.location.y, obj.location.z],
-                "rotation": [obj.rotation_euler.x, obj.rotation_euler.y, obj.rotation_euler.z],
-                "scale": [obj.scale.x, obj.scale.y, obj.scale.z],
-            }
-
-            if obj.type == "MESH":
-                bounding_box = self._get_aabb(obj)
-                result["world_bounding_box"] = bounding_box
+                return BlenderMCPServer._download_generated_glb(cache, cache_key, i["url"], task_uuid, progress)
+        return {"succeed": False, "error": "Generation failed. Please first make sure that all jobs of the task are done and then try again later."}
+
+    def import_generated_asset_fal_ai(self, request_id: str, name: str, wait=None, subscribe=False):
+        """Fetch the generated asset on the job pool, import into blender on the main thread"""
+        api_key = bpy.context.scene.blendermcp_hyper3d_api_key
+        return self._start_job(
+            "import_generated_asset",
+            {"mode": "FAL_AI", "request_id": request_id, "name": name},
+            lambda progress: self._fetch_generated_asset_fal_ai(self.asset_cache, api_key, request_id, progress),
+            lambda prepared: self._import_generated_glb(prepared["path"], name),
+            wait=wait,
+            subscribe=subscribe,
+        )
 
-            return {
-                "succeed": True, **result
-            }
-        except Exception as e:
-            return {"succeed": False, "error": str(e)}
+    @staticmethod
+    def _fetch_generated_asset_fal_ai(cache, api_key, request_id, progress=None):
+        """Worker thread: download the generated GLB of a fal.ai request"""
+        cache_key = AssetCache.make_key("hyper3d", request_id, "default", "glb")
+        cached = BlenderMCPServer._cached_generated_glb(cache, cache_key, request_id, progress)
+        if cached:
+            return cached
 
-    def import_generated_asset_fal_ai(self, request_id: str, name: str):
-        """Fetch the generated asset, import into blender"""
         response = requests.get(
-            f"https://queue.fal.run/fal-ai/hyper3d/requests/{request_id}",
+            f"{FAL_AI_RODIN_URL}/requests/{request_id}",
             headers={
-                "Authorization": f"Key {bpy.context.scene.blendermcp_hyper3d_api_key}",
+                "Authorization": f"Key {api_key}",
             }
         )
         data_ = response.json()
-        temp_file = None
-
-        temp_file = tempfile.NamedTemporaryFile(
-            delete=False,
-            prefix=request_id,
-            suffix=".glb",
-        )
+        return BlenderMCPServer._download_generated_glb(cache, cache_key, data_["model_mesh"]["url"], request_id, progress)
 
-        try:
-            # Download the content
-            response = requests.get(data_["model_mesh"]["url"], stream=True)
-            response.raise_for_status()  # Raise an exception for HTTP errors
+    @staticmethod
+    def _generated_glb_path(prefix):
+        with tempfile.NamedTemporaryFile(delete=False, prefix=prefix, suffix=".glb") as temp_file:
+            return temp_file.name
 
-            # Write the content to the temporary file
-            for chunk in response.iter_content(chunk_size=8192):
-                temp_file.write(chunk)
+    @staticmethod
+    def _cached_generated_glb(cache, cache_key, prefix, progress=None):
+        """Serve a previously downloaded generation result without calling the API"""
+        if not cache.contains(cache_key):
+            return None
+        path = BlenderMCPServer._generated_glb_path(prefix)
+        if cache.get(cache_key, path, progress=progress):
+            return {"path": path, "cache": "hit"}
+        with suppress(OSError):
+            os.unlink(path)
+        return None
 
-            # Close the file
-            temp_file.close()
+    @staticmethod
+    def _download_generated_glb(cache, cache_key, url, prefix, progress=None):
+        path = BlenderMCPServer._generated_glb_path(prefix)
 
+        try:
+            # Download the content into the cache and link it to the temporary file
+            download = cache.fetch(cache_key, url, path, headers=None, progress=progress)
+            if download["status_code"] != 200:
+                raise requests.HTTPError(f"Download failed with status code {download['status_code']}")
         except Exception as e:
             # Clean up the file if there's an error
-            temp_file.close()
-            os.unlink(temp_file.name)
+            with suppress(OSError):
+                os.unlink(path)
             return {"succeed": False, "error": str(e)}
 
+        return {"path": path, "cache": "miss"}
+
+    def _import_generated_glb(self, filepath, name):
+        """Main thread: import a downloaded Rodin GLB and describe the result"""
         try:
             obj = self._clean_imported_glb(
-                filepath=temp_file.name,
+                filepath=filepath,
                 mesh_name=name
             )
             result = {
@@ -1457,7 +4781,7 @@ class BlenderMCPServer:
                 }
 
                 response = requests.get(
-                    "https://api.sketchfab.com/v3/me",
+                    f"{SKETCHFAB_API_URL}/me",
                     headers=headers,
                     timeout=30  # Add timeout of 30 seconds
                 )
@@ -1534,7 +4858,7 @@ class BlenderMCPServer:
 
             # Use the search endpoint as specified in the API documentation
             response = requests.get(
-                "https://api.sketchfab.com/v3/search",
+                f"{SKETCHFAB_API_URL}/search",
                 headers=headers,
                 params=params,
                 timeout=30  # Add timeout of 30 seconds
@@ -1568,125 +4892,139 @@ class BlenderMCPServer:
             traceback.print_exc()
             return {"error": str(e)}
 
-    def download_sketchfab_model(self, uid):
-        """Download a model from Sketchfab by its UID"""
-        try:
-            api_key = bpy.context.scene.blendermcp_sketchfab_api_key
-            if not api_key:
-                return {"error": "Sketchfab API key is not configured"}
-
-            # Use proper authorization header for API key auth
-            headers = {
-                "Authorization": f"Token {api_key}"
-            }
-
-            # Request download URL using the exact endpoint from the documentation
-            download_endpoint = f"https://api.sketchfab.com/v3/models/{uid}/download"
-
-            response = requests.get(
-                download_endpoint,
-                headers=headers,
-                timeout=30  # Add timeout of 30 seconds
-            )
-
-            if response.status_code == 401:
-                return {"error": "Authentication failed (401). Check your API key."}
+    def download_sketchfab_model(self, uid, wait=None, subscribe=False):
+        """Download a model from Sketchfab by its UID on the job pool, then import it"""
+        api_key = bpy.context.scene.blendermcp_sketchfab_api_key
+        if not api_key:
+            return {"error": "Sketchfab API key is not configured"}
+
+        return self._start_job(
+            "download_sketchfab_model",
+            {"uid": uid},
+            lambda progress: self._fetch_sketchfab_model(self.asset_cache, api_key, uid, progress),
+            self._import_sketchfab_model,
+            wait=wait,
+            subscribe=subscribe,
+        )
 
-            if response.status_code != 200:
-                return {"error": f"Download request failed with status code {response.status_code}"}
+    @staticmethod
+    def _fetch_sketchfab_model(cache, api_key, uid, progress=None):
+        """Worker thread: download and unpack a Sketchfab glTF archive"""
+        temp_dir = tempfile.mkdtemp()
+        zip_file_path = os.path.join(temp_dir, f"{uid}.zip")
+        cache_key = AssetCache.make_key("sketchfab", uid, "original", "gltf", "archive")
+        try:
+            # A cached archive skips both the API call and the download
+            if not cache.get(cache_key, zip_file_path, progress=progress):
+                error = BlenderMCPServer._download_sketchfab_archive(cache, cache_key, api_key, uid, zip_file_path, progress)
+                if error:
+                    with suppress(Exception):
+                        shutil.rmtree(temp_dir)
+                    return error
 
-            data = response.json()
+            return BlenderMCPServer._extract_sketchfab_archive(zip_file_path, temp_dir)
 
-            # Safety check for None data
-            if data is None:
-                return {"error": "Received empty response from Sketchfab API for download request"}
+        except requests.exceptions.Timeout:
+            with suppress(Exception):
+                shutil.rmtree(temp_dir)
+            return {"error": "Request timed out. Check your internet connection and try again with a simpler model."}
+        except json.JSONDecodeError as e:
+            with suppress(Exception):
+                shutil.rmtree(temp_dir)
+            return {"error": f"Invalid JSON response from Sketchfab API: {str(e)}"}
+        except Exception as e:
+            traceback.print_exc()
+            with suppress(Exception):
+                shutil.rmtree(temp_dir)
+            return {"error": f"Failed to download model: {str(e)}"}
 
-            # Extract download URL with safety checks
-            gltf_data = data.get("gltf")
-            if not gltf_data:
-                return {"error": "No gltf download URL available for this model. Response: " + str(data)}
+    @staticmethod
+    def _download_sketchfab_archive(cache, cache_key, api_key, uid, zip_file_path, progress=None):
+        """Resolve the archive URL and download it into the cache; returns an error dict or None"""
+        # Use proper authorization header for API key auth
+        headers = {
+            "Authorization": f"Token {api_key}"
+        }
 
-            download_url = gltf_data.get("url")
-            if not download_url:
-                return {"error": "No download URL available for this model. Make sure the model is downloadable and you have access."}
+        # Request download URL using the exact endpoint from the documentation
+        download_endpoint = f"{SKETCHFAB_API_URL}/models/{uid}/download"
 
-            # Download the model (already has timeout)
-            model_response = requests.get(download_url, timeout=60)  # 60 second timeout
+        response = requests.get(
+            download_endpoint,
+            headers=headers,
+            timeout=30  # Add timeout of 30 seconds
+        )
 
-            if model_response.status_code != 200:
-                return {"error": f"Model download failed with status code {model_response.status_code}"}
+        if response.status_code == 401:
+            return {"error": "Authentication failed (401). Check your API key."}
 
-            # Save to temporary file
-            temp_dir = tempfile.mkdtemp()
-            zip_file_path = os.path.join(temp_dir, f"{uid}.zip")
+        if response.status_code != 200:
+            return {"error": f"Download request failed with status code {response.status_code}"}
 
-            with open(zip_file_path, "wb") as f:
-                f.write(model_response.content)
+        data = response.json()
 
-            # Extract the zip file with enhanced security
-            with zipfile.ZipFile(zip_file_path, 'r') as zip_ref:
-                # More secure zip slip prevention
-                for file_info in zip_ref.infolist():
-                    # Get the path of the file
-                    file_path = file_info.filename
+        # Safety check for None data
+        if data is None:
+            return {"error": "Received empty response from Sketchfab API for download request"}
 
-                    # Convert directory separators to the current OS style
-                    # This handles both / and \ in zip entries
-                    target_path = os.path.join(temp_dir, os.path.normpath(file_path))
+        # Extract download URL with safety checks
+        gltf_data = data.get("gltf")
+        if not gltf_data:
+            return {"error": "No gltf download URL available for this model. Response: " + str(data)}
 
-                    # Get absolute paths for comparison
-                    abs_temp_dir = os.path.abspath(temp_dir)
-                    abs_target_path = os.path.abspath(target_path)
+        download_url = gltf_data.get("url")
+        if not download_url:
+            return {"error": "No download URL available for this model. Make sure the model is downloadable and you have access."}
 
-                    # Ensure the normalized path doesn't escape the target directory
-                    if not abs_target_path.startswith(abs_temp_dir):
-                        with suppress(Exception):
-                            shutil.rmtree(temp_dir)
-                        return {"error": "Security issue: Zip contains files with path traversal attempt"}
+        # Stream the archive straight to disk (already has timeout)
+        model_response = cache.fetch(cache_key, download_url, zip_file_path, headers=None, timeout=60, progress=progress)  # 60 second timeout
 
-                    # Additional explicit check for directory traversal
-                    if ".." in file_path:
-                        with suppress(Exception):
-                            shutil.rmtree(temp_dir)
-                        return {"error": "Security issue: Zip contains files with directory traversal sequence"}
+        if model_response["status_code"] != 200:
+            return {"error": f"Model download failed with status code {model_response['status_code']}"}
+        return None
 
-                # If all files passed security checks, extract them
-                zip_ref.extractall(temp_dir)
+    @staticmethod
+    def _extract_sketchfab_archive(zip_file_path, temp_dir):
+        """Unpack a downloaded archive and locate its main glTF file"""
+        # Extract entry by entry with path and size checks
+        try:
+            extract_zip(zip_file_path, temp_dir)
+        except (ValueError, zipfile.BadZipFile) as e:
+            with suppress(Exception):
+                shutil.rmtree(temp_dir)
+            return {"error": str(e)}
 
-            # Find the main glTF file
-            gltf_files = [f for f in os.listdir(temp_dir) if f.endswith('.gltf') or f.endswith('.glb')]
+        # Find the main glTF file
+        gltf_files = [f for f in os.listdir(temp_dir) if f.endswith('.gltf') or f.endswith('.glb')]
 
-            if not gltf_files:
-                with suppress(Exception):
-                    shutil.rmtree(temp_dir)
-                return {"error": "No glTF file found in the downloaded model"}
+        if not gltf_files:
+            with suppress(Exception):
+                shutil.rmtree(temp_dir)
+            return {"error": "No glTF file found in the downloaded model"}
 
-            main_file = os.path.join(temp_dir, gltf_files[0])
+        return {"temp_dir": temp_dir, "main_file": os.path.join(temp_dir, gltf_files[0])}
 
+    def _import_sketchfab_model(self, prepared):
+        """Main thread: import an unpacked Sketchfab model"""
+        try:
             # Import the model
-            bpy.ops.import_scene.gltf(filepath=main_file)
+            bpy.ops.import_scene.gltf(filepath=prepared["main_file"])
 
             # Get the names of imported objects
             imported_objects = [obj.name for obj in bpy.context.selected_objects]
 
-            # Clean up temporary files
-            with suppress(Exception):
-                shutil.rmtree(temp_dir)
-
             return {
                 "success": True,
                 "message": "Model imported successfully",
                 "imported_objects": imported_objects
             }
-
-        except requests.exceptions.Timeout:
-            return {"error": "Request timed out. Check your internet connection and try again with a simpler model."}
-        except json.JSONDecodeError as e:
-            return {"error": f"Invalid JSON response from Sketchfab API: {str(e)}"}
         except Exception as e:
-            import traceback
             traceback.print_exc()
-            return {"error": f"Failed to download model: {str(e)}"}
+            return {"error": f"Failed to import model: {str(e)}"}
+        finally:
+            # Clean up temporary files
+            with suppress(Exception):
+                shutil.rmtree(prepared["temp_dir"])
     #endregion
 
 # Blender UI Panel
@@ -1702,6 +5040,14 @@ class BLENDERMCP_PT_Panel(bpy.types.Panel):
         scene = context.scene
 
         layout.prop(scene, "blendermcp_port")
+        if UNIX_SOCKETS_SUPPORTED:
+            layout.prop(scene, "blendermcp_use_unix_socket")
+            if scene.blendermcp_use_unix_socket:
+                layout.prop(scene, "blendermcp_unix_socket_path")
+        layout.prop(scene, "blendermcp_queue_size")
+        layout.prop(scene, "blendermcp_tick_budget_ms")
+        layout.prop(scene, "blendermcp_cache_dir")
+        layout.prop(scene, "blendermcp_cache_size_mb")
         layout.prop(scene, "blendermcp_use_polyhaven", text="Use assets from Poly Haven")
 
         layout.prop(scene, "blendermcp_use_hyper3d", text="Use Hyper3D Rodin 3D model generation")
@@ -1719,6 +5065,9 @@ class BLENDERMCP_PT_Panel(bpy.types.Panel):
         else:
             layout.operator("blendermcp.stop_server", text="Disconnect from MCP server")
             layout.label(text=f"Running on port {scene.blendermcp_port}")
+            server = getattr(bpy.types, "blendermcp_server", None)
+            if server and server.unix_socket:
+                layout.label(text=f"Socket: {server.unix_socket_path}")
 
 # Operator to set Hyper3D API Key
 class BLENDERMCP_OT_SetFreeTrialHyper3DAPIKey(bpy.types.Operator):
@@ -1742,7 +5091,16 @@ class BLENDERMCP_OT_StartServer(bpy.types.Operator):
 
         # Create a new server instance
         if not hasattr(bpy.types, "blendermcp_server") or not bpy.types.blendermcp_server:
-            bpy.types.blendermcp_server = BlenderMCPServer(port=scene.blendermcp_port)
+            bpy.types.blendermcp_server = BlenderMCPServer(
+                port=scene.blendermcp_port,
+                queue_size=scene.blendermcp_queue_size,
+                tick_budget_ms=scene.blendermcp_tick_budget_ms,
+                cache_dir=bpy.path.abspath(scene.blendermcp_cache_dir) if scene.blendermcp_cache_dir else DEFAULT_CACHE_DIR,
+                cache_size_mb=scene.blendermcp_cache_size_mb,
+                unix_socket_path=(
+                    bpy.path.abspath(scene.blendermcp_unix_socket_path) or DEFAULT_UNIX_SOCKET_PATH
+                ) if UNIX_SOCKETS_SUPPORTED and scene.blendermcp_use_unix_socket else None,
+            )
 
         # Start the server
         bpy.types.blendermcp_server.start()
@@ -1778,6 +5136,50 @@ def register():
         max=65535
     )
 
+    bpy.types.Scene.blendermcp_use_unix_socket = bpy.props.BoolProperty(
+        name="Unix Socket",
+        description="Also listen on a Unix domain socket; local clients prefer it over TCP",
+        default=False
+    )
+
+    bpy.types.Scene.blendermcp_unix_socket_path = bpy.props.StringProperty(
+        name="Socket Path",
+        description=f"Path of the Unix domain socket (empty uses {DEFAULT_UNIX_SOCKET_PATH})",
+        subtype="FILE_PATH",
+        default=""
+    )
+
+    bpy.types.Scene.blendermcp_queue_size = IntProperty(
+        name="Queue Size",
+        description="Maximum number of pending commands before clients get a busy reply",
+        default=DEFAULT_QUEUE_SIZE,
+        min=1,
+        max=100000
+    )
+
+    bpy.types.Scene.blendermcp_tick_budget_ms = IntProperty(
+        name="Tick Budget (ms)",
+        description="Milliseconds of command execution per main-thread tick before yielding to the UI",
+        default=DEFAULT_TICK_BUDGET_MS,
+        min=1,
+        max=1000
+    )
+
+    bpy.types.Scene.blendermcp_cache_dir = bpy.props.StringProperty(
+        name="Asset Cache",
+        description="Directory for cached downloads (empty uses ~/.cache/blendermcp/assets)",
+        subtype="DIR_PATH",
+        default=""
+    )
+
+    bpy.types.Scene.blendermcp_cache_size_mb = IntProperty(
+        name="Cache Size (MB)",
+        description="Least recently used assets are evicted beyond this size",
+        default=DEFAULT_CACHE_SIZE_MB,
+        min=64,
+        max=1024 * 1024
+    )
+
     bpy.types.Scene.blendermcp_server_running = bpy.props.BoolProperty(
         name="Server Running",
         default=False
@@ -1844,6 +5246,12 @@ def unregister():
     bpy.utils.unregister_class(BLENDERMCP_OT_StopServer)
 
     del bpy.types.Scene.blendermcp_port
+    del bpy.types.Scene.blendermcp_use_unix_socket
+    del bpy.types.Scene.blendermcp_unix_socket_path
+    del bpy.types.Scene.blendermcp_queue_size
+    del bpy.types.Scene.blendermcp_tick_budget_ms
+    del bpy.types.Scene.blendermcp_cache_dir
+    del bpy.types.Scene.blendermcp_cache_size_mb
     del bpy.types.Scene.blendermcp_server_running
     del bpy.types.Scene.blendermcp_use_polyhaven
     del bpy.types.Scene.blendermcp_use_hyper3d
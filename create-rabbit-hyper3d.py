@@ -8,14 +8,18 @@ import socket
 import json
 import time
 import os
+import sys
 from pathlib import Path
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "scripts"))
+from mcp_connection import connect
+
+GENERATION_TIMEOUT = 300  # Seconds to wait for generation and import
+
 def send_blender_command(command):
     """Send command to Blender MCP and get response"""
     try:
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.settimeout(30)  # Longer timeout for API calls
-        sock.connect(('localhost', 9876))
+        sock = connect(timeout=30)  # Longer timeout for API calls
         
         # Send command
         sock.send(json.dumps(command).encode())
@@ -86,91 +90,92 @@ result
     else:
         print("⚠️ Could not check Hyper3D status, proceeding anyway...")
     
-    # 2. Create a Rodin job for rabbit generation
+    # 2. Create the Rodin job; the addon polls it and imports the GLB when done
     print("\n🎨 Creating rabbit generation job...")
-    response = send_blender_command({
-        "type": "create_rodin_job",
-        "params": {
-            "prompt": "a cute rabbit, white bunny with long ears, sitting position, 3D model, game asset",
-            "mode": "generation"  # or "refine" if we have an existing model
-        }
-    })
-    
-    if not response or response.get('status') != 'success':
-        error_msg = response.get('message', 'Unknown error') if response else 'No response'
-        print(f"❌ Failed to create job: {error_msg}")
-        
+    print("   This may take 30-60 seconds...")
+    result = generate_and_import(
+        "a cute rabbit, white bunny with long ears, sitting position, 3D model, game asset",
+        "Hyper3D_Rabbit",
+    )
+
+    if result is None:
         # Try alternative approach with direct API call
         print("\n🔄 Trying alternative approach with direct API...")
         return create_rabbit_alternative()
-    
-    job_result = response.get('result', {})
-    job_uuid = job_result.get('uuid')
-    
-    if not job_uuid:
-        print("❌ No job UUID returned")
-        return False
-    
-    print(f"✅ Job created with UUID: {job_uuid}")
-    
-    # 3. Poll for job completion
-    print("\n⏳ Waiting for model generation...")
-    print("   This may take 30-60 seconds...")
-    
-    max_attempts = 30
-    for attempt in range(max_attempts):
-        time.sleep(5)  # Wait 5 seconds between polls
-        
-        print(f"   Polling attempt {attempt + 1}/{max_attempts}...")
-        
-        response = send_blender_command({
-            "type": "poll_rodin_job_status",
-            "params": {
-                "uuid": job_uuid
-            }
-        })
-        
-        if response and response.get('status') == 'success':
-            job_status = response.get('result', {})
-            status = job_status.get('status')
-            
-            print(f"   Status: {status}")
-            
-            if status == 'Succeeded':
-                print("✅ Model generation complete!")
-                
-                # Get the generated model URL
-                model_url = job_status.get('model_url')
-                if model_url:
-                    print(f"   Model URL: {model_url}")
-                    
-                    # 4. Import the generated model
-                    print("\n📦 Importing generated rabbit...")
-                    response = send_blender_command({
-                        "type": "import_generated_asset",
-                        "params": {
-                            "uuid": job_uuid,
-                            "asset_name": "Hyper3D_Rabbit"
-                        }
-                    })
-                    
-                    if response and response.get('status') == 'success':
-                        print("✅ Rabbit imported into Blender!")
-                        return export_rabbit()
-                    else:
-                        error = response.get('message', 'Unknown error') if response else 'No response'
-                        print(f"❌ Failed to import: {error}")
-                
-                break
-                
-            elif status == 'Failed':
-                error = job_status.get('error', 'Unknown error')
-                print(f"❌ Generation failed: {error}")
-                break
-    
-    print("❌ Job did not complete in time")
+
+    if result.get('status') == 'completed':
+        print("✅ Rabbit imported into Blender!")
+        return export_rabbit()
+
+    print(f"❌ Failed to import: {result.get('error', 'Unknown error')}")
     return False
 
+def generate_and_import(prompt, name, timeout=GENERATION_TIMEOUT):
+    """Submit a Rodin job and wait for the addon's push events.
+
+    The addon polls Rodin itself (with backoff) and imports the GLB as
+    `name`; this connection just listens for rodin_job_status,
+    rodin_job_completed and the import's job_completed event. Returns the
+    import job, or None if the job could not be submitted.
+    """
+    try:
+        sock = connect(timeout=30)
+    except OSError as e:
+        print(f"❌ Error: {e}")
+        return None
+
+    try:
+        # Switch to newline-delimited JSON so events can be read line by line
+        sock.sendall(json.dumps({"type": "hello", "params": {"framing": "ndjson"}}).encode())
+        hello = b''
+        while True:
+            hello += sock.recv(4096)
+            try:
+                json.loads(hello.decode())
+                break
+            except ValueError:
+                continue
+        stream = sock.makefile('rb')
+
+        sock.sendall((json.dumps({
+            "type": "create_rodin_job",
+            "params": {"text_prompt": prompt, "subscribe": True, "import_name": name},
+        }) + "\n").encode())
+
+        sock.settimeout(timeout)
+        import_job_id = None
+        while True:
+            line = stream.readline()
+            if not line:
+                print("❌ Connection closed")
+                return None
+            message = json.loads(line)
+            event = message.get("event")
+
+            if event is None:
+                if message.get('status') != 'success' or message.get('result', {}).get('error'):
+                    error = message.get('message') or message.get('result', {}).get('error', 'Unknown error')
+                    print(f"❌ Failed to create job: {error}")
+                    return None
+                print(f"✅ Job created with UUID: {message['result'].get('uuid')}")
+            elif event == "rodin_job_status":
+                print(f"   Status: {message['rodin_job']['detail']}")
+            elif event == "rodin_job_completed":
+                job = message['rodin_job']
+                if job['status'] != 'completed':
+                    print(f"❌ Generation failed: {job.get('error', 'Unknown error')}")
+                    return {"status": "failed", "error": job.get('error')}
+                print("✅ Model generation complete!")
+                print("\n📦 Importing generated rabbit...")
+                import_job_id = job.get('import_job_id')
+            elif event == "job_completed" and message['job']['job_id'] == import_job_id:
+                return message['job']
+    except socket.timeout:
+        print("❌ Job did not complete in time")
+        return {"status": "failed", "error": "timed out"}
+    finally:
+        sock.close()
+
 def create_rabbit_alternative():
     """Alternative approach - create a simple rabbit procedurally"""
     
@@ -20,6 +20,9 @@ class BlenderDogImporter:
         self.export_dir = self.project_root / 'watched_exports'
         self.target_dir = self.project_root / 'assets/models/animals/dog'
         self.timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        # Local mirror of the Blender scene, kept current with get_scene_changes
+        self.scene_revision = 0
+        self.scene_objects = {}
         
     def send_mcp_command(self, command):
         """Send command to Blender via MCP"""
@@ -31,10 +34,21 @@ class BlenderDogImporter:
             message = json.dumps(command) + '\n'
             sock.send(message.encode())
             
-            response = sock.recv(8192).decode()
+            # Read until the reply parses; scene listings span several packets
+            buffer = b''
+            response = None
+            while response is None:
+                chunk = sock.recv(65536)
+                if not chunk:
+                    break
+                buffer += chunk
+                try:
+                    response = json.loads(buffer.decode())
+                except ValueError:
+                    continue
             sock.close()
             
-            return json.loads(response) if response else None
+            return response
         except Exception as e:
             print(f"❌ MCP Command failed: {e}")
             return None
@@ -92,6 +106,30 @@ print(json.dumps(scene_data, indent=2))
                 return response
         return None
     
+    def sync_scene_objects(self):
+        """Fetch only the objects changed since the last sync and update the local mirror"""
+        cursor = None
+        while True:
+            params = {"since_revision": self.scene_revision}
+            if cursor:
+                params["cursor"] = cursor
+            response = self.send_mcp_command({"type": "get_scene_changes", "params": params})
+            if not response or response.get('status') != 'success':
+                return list(self.scene_objects.values())
+            
+            changes = response['result']
+            if changes['full'] and not cursor:
+                self.scene_objects = {}
+            for name in changes['removed']:
+                self.scene_objects.pop(name, None)
+            for obj in changes['objects']:
+                self.scene_objects[obj['name']] = obj
+            
+            cursor = changes['next_cursor']
+            if not cursor:
+                self.scene_revision = changes['revision']
+                return list(self.scene_objects.values())
+    
     def identify_dog_object(self, scene_info):
         """Identify the dog object in the scene"""
         print("\n🔍 Identifying Dog Object...")
@@ -109,13 +147,7 @@ print(json.dumps(scene_data, indent=2))
         
         if not objects:
             # Fallback: Nehme das größte Mesh-Objekt
-            command = {
-                "method": "get_scene_info",
-                "params": {}
-            }
-            response = self.send_mcp_command(command)
-            if response:
-                objects = response.get('result', {}).get('objects', [])
+            objects = self.sync_scene_objects()
         
         for obj in objects:
             obj_name_lower = obj.get('name', '').lower()
@@ -11,10 +11,13 @@ import subprocess
 import os
 from datetime import datetime
 
+from mcp_connection import MCP_HOST, MCP_PORT, MCP_SOCKET_PATH, connect, unix_socket_available
+
 class BlenderMCPHealthCheck:
     def __init__(self):
-        self.port = 9876
-        self.host = 'localhost'
+        self.port = MCP_PORT
+        self.host = MCP_HOST
+        self.socket_path = MCP_SOCKET_PATH
         self.results = {
             'timestamp': datetime.now().isoformat(),
             'checks': {}
@@ -81,6 +84,38 @@ class BlenderMCPHealthCheck:
             }
             return False
     
+    def check_mcp_unix_socket(self):
+        """Prüft ob der Unix Socket des Addons erreichbar ist (optional, TCP reicht)"""
+        if not unix_socket_available(self.socket_path):
+            self.results['checks']['mcp_unix_socket'] = {
+                'status': 'absent',
+                'path': self.socket_path,
+                'message': 'Kein Unix Socket, Clients nutzen TCP'
+            }
+            return True
+        try:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(2)
+            sock.connect(self.socket_path)
+            sock.close()
+            self.results['checks']['mcp_unix_socket'] = {
+                'status': 'open',
+                'path': self.socket_path,
+                'message': f'Unix Socket {self.socket_path} ist offen'
+            }
+            return True
+        except Exception as e:
+            self.results['checks']['mcp_unix_socket'] = {
+                'status': 'stale',
+                'path': self.socket_path,
+                'message': f'Unix Socket antwortet nicht: {e}'
+            }
+            return False
+
+    def connect(self, timeout=5):
+        """Verbindung aufbauen, Unix Socket bevorzugt"""
+        return connect(self.host, self.port, self.socket_path, timeout)
+
     def check_uvx_installation(self):
         """Prüft ob uvx installiert ist"""
         try:
@@ -190,9 +225,7 @@ class BlenderMCPHealthCheck:
     def send_test_command(self):
         """Sendet ein Test-Command an Blender MCP"""
         try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(5)
-            sock.connect((self.host, self.port))
+            sock = self.connect()
             
             # Test-Command senden
             test_command = {
@@ -237,6 +270,7 @@ class BlenderMCPHealthCheck:
             ("uvx Installation", self.check_uvx_installation),
             ("Cursor Config", self.check_cursor_config),
             ("MCP Port 9876", self.check_mcp_port),
+            ("MCP Unix Socket", self.check_mcp_unix_socket),
             ("Blender-MCP Prozesse", self.check_blender_mcp_processes),
             ("Test Command", self.send_test_command)
         ]
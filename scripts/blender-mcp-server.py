@@ -6,11 +6,15 @@ Professional veterinary simulator backend
 """
 
 import asyncio
+import ast
+import hashlib
 import websockets
 import json
 import subprocess
 import os
 import sys
+import time
+from collections import deque
 from datetime import datetime
 import logging
 from pathlib import Path
@@ -26,13 +30,457 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Warm Blender worker pool (scripts/blender_worker.py); 0 workers falls back
+# to one cold `blender --background` process per request. Unset, the pool has
+# one worker per concurrent job
+DEFAULT_WORKERS = int(os.environ['BLENDER_WORKERS']) if os.environ.get('BLENDER_WORKERS') else None
+WORKER_MAX_JOBS = int(os.environ.get('BLENDER_WORKER_MAX_JOBS', '25'))  # Recycle after this many jobs
+WORKER_MAX_RSS_MB = int(os.environ.get('BLENDER_WORKER_MAX_RSS_MB', '2048'))  # ... or this much memory
+WORKER_START_TIMEOUT = 120  # Seconds for Blender to start and preload the generator
+WORKER_JOB_TIMEOUT = int(os.environ.get('BLENDER_JOB_TIMEOUT', '900'))
+WORKER_LOG_TAIL = 200  # Output lines kept per worker for error reports
+WORKER_LINE_LIMIT = 1024 * 1024
+WORKER_MESSAGE_PREFIX = "@@VETSCAN_WORKER@@ "  # Must match blender_worker.MESSAGE_PREFIX
+
+# Job scheduler
+MAX_CONCURRENT_JOBS = int(os.environ.get('BLENDER_MAX_CONCURRENT_JOBS', '0')) or os.cpu_count() or 1
+JOB_PRIORITIES = {"high": 0, "normal": 5, "low": 9}  # Lower runs first; plain ints 0-9 also accepted
+MAX_FINISHED_JOBS = 200  # Finished jobs kept for get_generation_status
+JOB_LOG_TAIL = 500  # Blender output lines kept per job
+LOG_LINE_MAX_CHARS = 2000  # Longer output lines are cut before they are kept
+PROGRESS_PREFIX = "@@VETSCAN_PROGRESS@@ "  # Must match generate_all_animals.PROGRESS_PREFIX
+
+# Relative cost of one species per template, used to start the slowest species first
+TEMPLATE_COST = {
+    'quadruped_large': 3.0,
+    'quadruped_medium': 2.0,
+    'quadruped_small': 1.5,
+    'bird_medium': 1.2,
+    'bird_small': 1.0,
+}
+UNKNOWN_TEMPLATE_COST = 0.5  # Templates the generator skips still export a manifest
+
+GENERATION_CACHE_FILE = ".generation_cache.json"  # Per species export directory
+
+def load_generator_definitions(scripts_path):
+    """ANIMAL_SPECIES, QUALITY_LEVELS and the code hash of generate_all_animals.py, without importing bpy.
+
+    The two tables are left out of source_sha256: cache keys cover each
+    entry separately, so editing one species only invalidates that species.
+    file_sha256 hashes the whole file, as reported by warm workers.
+    """
+    with open(os.path.join(scripts_path, 'generate_all_animals.py'), 'rb') as f:
+        source = f.read()
+    lines = source.splitlines(keepends=True)
+    definitions = {}
+    for node in ast.parse(source).body:
+        if isinstance(node, ast.Assign):
+            for target in node.targets:
+                if getattr(target, 'id', None) in ('ANIMAL_SPECIES', 'QUALITY_LEVELS'):
+                    definitions[target.id.lower()] = ast.literal_eval(node.value)
+                    lines[node.lineno - 1:node.end_lineno] = [b''] * (node.end_lineno - node.lineno + 1)
+    missing = {'animal_species', 'quality_levels'} - definitions.keys()
+    if missing:
+        raise ValueError(f"{', '.join(sorted(m.upper() for m in missing))} not found in generate_all_animals.py")
+    definitions['source_sha256'] = hashlib.sha256(b''.join(lines)).hexdigest()
+    definitions['file_sha256'] = hashlib.sha256(source).hexdigest()
+    return definitions
+
+def generation_cache_key(definitions, species_id, quality_level):
+    """Changes whenever the species entry, the quality settings or the generator code change"""
+    material = json.dumps({
+        "species": definitions['animal_species'][species_id],
+        "quality": definitions['quality_levels'][quality_level],
+        "generator": definitions['source_sha256'],
+    }, sort_keys=True)
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+def file_sha256(path):
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+def species_cost(species_data):
+    """Estimated generation cost: template size, plus a little per extra feature"""
+    base = TEMPLATE_COST.get(species_data.get('template'), UNKNOWN_TEMPLATE_COST)
+    return base * (1 + 0.1 * len(species_data.get('features', [])))
+
+def split_into_shards(costs, shard_count):
+    """Longest-first greedy split of {item: cost} into at most shard_count lists"""
+    shards = [[] for _ in range(max(1, min(shard_count, len(costs))))]
+    loads = [0.0] * len(shards)
+    for item in sorted(costs, key=costs.get, reverse=True):
+        lightest = loads.index(min(loads))
+        shards[lightest].append(item)
+        loads[lightest] += costs[item]
+    return shards
+
+class WorkerError(Exception):
+    """A Blender worker failed to start, died or timed out"""
+
+class BlenderWorker:
+    """One long-lived headless Blender process running blender_worker.py"""
+
+    def __init__(self, blender_path, worker_script, scripts_path, cwd):
+        self.blender_path = blender_path
+        self.worker_script = worker_script
+        self.scripts_path = scripts_path
+        self.cwd = cwd
+        self.process = None
+        self.reader = None
+        self.ready = None
+        self.pending = None  # Future for the job in flight
+        self.pid = None
+        self.started_at = None
+        self.generator_sha256 = None  # Version of generate_all_animals.py this process loaded
+        self.jobs_done = 0
+        self.rss_bytes = 0
+        self.log_tail = deque(maxlen=WORKER_LOG_TAIL)
+        self.on_output = None  # Called with each non-protocol output line of the current job
+
+    @property
+    def alive(self):
+        return self.process is not None and self.process.returncode is None
+
+    async def start(self, timeout=WORKER_START_TIMEOUT):
+        """Launch Blender and wait until the generator modules are loaded"""
+        loop = asyncio.get_running_loop()
+        self.ready = loop.create_future()
+        self.started_at = time.time()
+        self.process = await asyncio.create_subprocess_exec(
+            self.blender_path,
+            '--background',
+            '--factory-startup',
+            '--python', self.worker_script,
+            '--', '--scripts', self.scripts_path,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,  # One stream, so neither pipe can fill up unread
+            cwd=self.cwd,
+            limit=WORKER_LINE_LIMIT,
+        )
+        self.reader = asyncio.create_task(self._read_output())
+        try:
+            info = await asyncio.wait_for(asyncio.shield(self.ready), timeout)
+        except Exception as e:
+            await self.stop()
+            if isinstance(e, asyncio.TimeoutError):
+                raise WorkerError(f"Blender worker not ready after {timeout}s") from None
+            raise
+        self.pid = info.get('pid', self.process.pid)
+        self.generator_sha256 = info.get('generator_sha256')
+        self.rss_bytes = info.get('rss_bytes', 0)
+        logger.info(f"🔥 Blender worker {self.pid} ready (Blender {info.get('blender_version')})")
+
+    async def _read_output(self):
+        while True:
+            try:
+                raw = await self.process.stdout.readline()
+            except ValueError:
+                # Over-long line; the reader dropped it, keep going
+                continue
+            if not raw:
+                break
+            line = raw.decode('utf-8', errors='replace').rstrip('\n')
+            if line.startswith(WORKER_MESSAGE_PREFIX):
+                try:
+                    self._handle_message(json.loads(line[len(WORKER_MESSAGE_PREFIX):]))
+                except ValueError:
+                    logger.warning(f"⚠️ Unparseable worker message: {line[:200]}")
+                continue
+            self.log_tail.append(line)
+            if self.on_output:
+                self.on_output(line)
+
+        await self.process.wait()
+        tail = "\n".join(list(self.log_tail)[-20:])
+        error = WorkerError(f"Blender worker exited with code {self.process.returncode}\n{tail}")
+        for future in (self.ready, self.pending):
+            if future is not None and not future.done():
+                future.set_exception(error)
+
+    def _handle_message(self, message):
+        event = message.get('event')
+        if event == 'ready':
+            if not self.ready.done():
+                self.ready.set_result(message)
+        elif event == 'result':
+            self.jobs_done = message.get('jobs_done', self.jobs_done + 1)
+            self.rss_bytes = message.get('rss_bytes', self.rss_bytes)
+            if self.pending is not None and not self.pending.done():
+                self.pending.set_result(message)
+        elif event == 'error':
+            if self.pending is not None and not self.pending.done():
+                self.pending.set_exception(WorkerError(message.get('error', 'Worker error')))
+
+    async def run(self, job, timeout=WORKER_JOB_TIMEOUT):
+        """Send one job and wait for its result message"""
+        if not self.alive:
+            raise WorkerError("Blender worker is not running")
+        self.pending = asyncio.get_running_loop().create_future()
+        try:
+            self.process.stdin.write((json.dumps(job) + "\n").encode('utf-8'))
+            await self.process.stdin.drain()
+            return await asyncio.wait_for(self.pending, timeout)
+        except asyncio.TimeoutError:
+            # Busy in the job, it would never read a shutdown request
+            await self.kill()
+            raise WorkerError(f"Job timed out after {timeout}s") from None
+        except (BrokenPipeError, ConnectionResetError) as e:
+            raise WorkerError(f"Blender worker pipe closed: {e}") from None
+        except asyncio.CancelledError:
+            await self.kill()
+            raise
+        finally:
+            self.pending = None
+
+    async def stop(self, timeout=5):
+        """Ask the worker to exit, killing it if it does not"""
+        if self.alive:
+            try:
+                self.process.stdin.write(b'{"type": "shutdown"}\n')
+                await self.process.stdin.drain()
+                await asyncio.wait_for(self.process.wait(), timeout)
+            except Exception:
+                if self.alive:
+                    self.process.kill()
+                await self.process.wait()
+        if self.reader:
+            await asyncio.gather(self.reader, return_exceptions=True)
+
+    async def kill(self):
+        if self.alive:
+            self.process.kill()
+        if self.process is not None:
+            await self.process.wait()
+        if self.reader:
+            await asyncio.gather(self.reader, return_exceptions=True)
+
+    def status(self):
+        return {
+            "pid": self.pid,
+            "alive": self.alive,
+            "jobs_done": self.jobs_done,
+            "generator_sha256": self.generator_sha256,
+            "rss_mb": round(self.rss_bytes / (1024 * 1024), 1),
+            "uptime_seconds": round(time.time() - self.started_at, 1) if self.started_at else 0,
+        }
+
+class BlenderWorkerPool:
+    """Keeps `size` warm Blender workers and hands each job to an idle one.
+
+    Workers are replaced after max_jobs jobs, when their memory passes
+    max_rss_mb, or when they crash or time out.
+    """
+
+    def __init__(self, size, blender_path, worker_script, scripts_path, cwd,
+                 max_jobs=WORKER_MAX_JOBS, max_rss_mb=WORKER_MAX_RSS_MB, job_timeout=WORKER_JOB_TIMEOUT):
+        self.size = size
+        self.blender_path = blender_path
+        self.worker_script = worker_script
+        self.scripts_path = scripts_path
+        self.cwd = cwd
+        self.max_jobs = max_jobs
+        self.max_rss_bytes = max_rss_mb * 1024 * 1024
+        self.job_timeout = job_timeout
+        self.workers = set()
+        self.idle = asyncio.Queue()
+        self.spawning = 0
+        self.closing = False
+        self.generator_sha256 = None  # Workers that loaded another version are replaced
+        self.background = set()
+        self.stats = {"jobs": 0, "failed": 0, "started": 0, "start_failures": 0, "recycled": 0}
+
+    async def start(self):
+        """Warm up every worker concurrently"""
+        self.spawning += self.size
+        results = await asyncio.gather(*(self._replace() for _ in range(self.size)))
+        logger.info(f"🔥 Worker pool ready: {sum(results)}/{self.size} Blender workers")
+
+    async def _replace(self):
+        """Start one worker and make it available; returns whether that worked.
+
+        Callers count it in self.spawning before scheduling this, so run()
+        never starts a second worker while a replacement is still pending.
+        """
+        worker = BlenderWorker(self.blender_path, self.worker_script, self.scripts_path, self.cwd)
+        try:
+            await worker.start()
+        except Exception as e:
+            self.stats["start_failures"] += 1
+            logger.error(f"❌ Blender worker failed to start: {e}")
+            return False
+        finally:
+            self.spawning -= 1
+        if self.closing:
+            await worker.stop()
+            return False
+        self.stats["started"] += 1
+        self.workers.add(worker)
+        self.idle.put_nowait(worker)
+        return True
+
+    def expect_generator(self, generator_sha256):
+        """The generator script changed: replace idle workers still running the old code.
+
+        Busy workers are replaced when their current job finishes.
+        """
+        if generator_sha256 == self.generator_sha256:
+            return
+        self.generator_sha256 = generator_sha256
+        for _ in range(self.idle.qsize()):
+            worker = self.idle.get_nowait()
+            if self._is_stale(worker):
+                self._retire(worker, "generator script changed")
+            else:
+                self.idle.put_nowait(worker)
+
+    def _is_stale(self, worker):
+        return self.generator_sha256 is not None and worker.generator_sha256 != self.generator_sha256
+
+    def _in_background(self, coroutine):
+        task = asyncio.create_task(coroutine)
+        self.background.add(task)
+        task.add_done_callback(self.background.discard)
+
+    def _retire(self, worker, reason):
+        logger.info(f"♻️ Recycling Blender worker {worker.pid}: {reason}")
+        self.workers.discard(worker)
+        self.stats["recycled"] += 1
+        self._in_background(worker.stop())
+        if not self.closing:
+            self.spawning += 1
+            self._in_background(self._replace())
+
+    async def run(self, job, on_output=None):
+        """Run a job on the next idle worker; returns the worker's result message"""
+        while True:
+            if not self.workers and not self.spawning:
+                # Every start so far failed; try once more for this request
+                self.spawning += 1
+                if not await self._replace():
+                    raise WorkerError("No Blender worker could be started")
+            worker = await self.idle.get()
+            if not worker.alive:
+                self._retire(worker, "exited while idle")
+            elif self._is_stale(worker):
+                self._retire(worker, "generator script changed")
+            else:
+                break
+
+        worker.on_output = on_output
+        self.stats["jobs"] += 1
+        try:
+            reply = await worker.run(job, self.job_timeout)
+        except WorkerError:
+            self.stats["failed"] += 1
+            self._retire(worker, "crashed or timed out")
+            raise
+        except asyncio.CancelledError:
+            self._retire(worker, "job cancelled")
+            raise
+        finally:
+            worker.on_output = None
+
+        if self._is_stale(worker):
+            self._retire(worker, "generator script changed")
+        elif worker.jobs_done >= self.max_jobs:
+            self._retire(worker, f"{worker.jobs_done} jobs done")
+        elif worker.rss_bytes >= self.max_rss_bytes:
+            self._retire(worker, f"{worker.rss_bytes // (1024 * 1024)} MB resident")
+        else:
+            self.idle.put_nowait(worker)
+        return reply
+
+    async def stop(self):
+        self.closing = True
+        await asyncio.gather(*(worker.stop() for worker in list(self.workers)), return_exceptions=True)
+        await asyncio.gather(*list(self.background), return_exceptions=True)
+        self.workers.clear()
+        while not self.idle.empty():
+            self.idle.get_nowait()
+
+    def status(self):
+        return {
+            "size": self.size,
+            "alive": sum(1 for worker in self.workers if worker.alive),
+            "idle": self.idle.qsize(),
+            "starting": self.spawning,
+            "max_jobs_per_worker": self.max_jobs,
+            "max_rss_mb": self.max_rss_bytes // (1024 * 1024),
+            **self.stats,
+            "workers": [worker.status() for worker in self.workers],
+        }
+
+class GenerationJob:
+    """One queued generation request and its timing"""
+
+    def __init__(self, job_id, kind, params, priority):
+        self.id = job_id
+        self.kind = kind  # 'single' or 'all'
+        self.params = params
+        self.priority = priority
+        self.state = 'queued'  # queued -> running (-> cancelling) -> completed / failed / cancelled
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.result = None
+        self.error = None
+        self.task = None
+        self.done = asyncio.Event()
+        self.subscribers = set()  # WebSockets that get progress notifications
+        self.progress = None  # Latest progress event
+        self.species_done = set()
+        self.log_tail = deque(maxlen=JOB_LOG_TAIL)
+        self.log_lines = 0
+
+    @property
+    def finished(self):
+        return self.state in ('completed', 'failed', 'cancelled')
+
+    def finish(self, state, result=None, error=None):
+        self.state = state
+        self.result = result
+        self.error = error
+        self.finished_at = time.time()
+        self.done.set()
+
+    def to_dict(self):
+        now = time.time()
+        started = self.started_at or self.finished_at or now
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "species_id": self.params.get('species_id'),
+            "priority": self.priority,
+            "status": self.state,
+            "created_at": datetime.fromtimestamp(self.created_at).isoformat(),
+            "started_at": datetime.fromtimestamp(self.started_at).isoformat() if self.started_at else None,
+            "finished_at": datetime.fromtimestamp(self.finished_at).isoformat() if self.finished_at else None,
+            "queued_seconds": round(started - self.created_at, 3),
+            "running_seconds": round((self.finished_at or now) - self.started_at, 3) if self.started_at else None,
+            "progress": self.progress,
+            "log_lines": self.log_lines,
+            "result": self.result,
+            "error": self.error,
+        }
+
 class BlenderMCPServer:
-    def __init__(self, host='0.0.0.0', port=8765):
+    def __init__(self, host='0.0.0.0', port=8765, workers=DEFAULT_WORKERS, max_concurrent_jobs=MAX_CONCURRENT_JOBS):
         self.host = host
         self.port = port
         self.clients = set()
-        self.generation_queue = asyncio.Queue()
-        self.active_jobs = {}
+        self.generation_queue = asyncio.PriorityQueue()  # (priority, sequence, job_id)
+        self.active_jobs = {}  # job_id -> GenerationJob, in submission order
+        self.job_sequence = 0
+        self.job_runners = []
+        self.reply_tasks = set()  # Replies to "wait" requests, sent when their job finishes
+        self.species_seconds = {}  # Last measured generation time per species, for shard ordering
+        self.generator_definitions = None
+        self.generator_stamp = None  # (mtime_ns, size) of the parsed generate_all_animals.py
+        self.cache_stats = {"hits": 0, "misses": 0}  # Per species request: served from disk / ran Blender
         
         # Setup paths
         self.blender_path = os.environ.get('BLENDER_PATH', '/usr/bin/blender')
@@ -43,10 +491,31 @@ class BlenderMCPServer:
         # Create necessary directories
         os.makedirs(self.export_path, exist_ok=True)
         os.makedirs(f"{self.project_root}/logs", exist_ok=True)
+
+        # Long-lived Blender processes that keep the generator loaded, by
+        # default one for each job that may run at once
+        self.max_concurrent_jobs = max(1, max_concurrent_jobs)
+        if workers is None:
+            workers = self.max_concurrent_jobs
+        self.worker_pool = None
+        if workers > 0:
+            self.worker_pool = BlenderWorkerPool(
+                workers,
+                self.blender_path,
+                f"{self.scripts_path}/blender_worker.py",
+                self.scripts_path,
+                self.project_root,
+            )
+
+        # Running more jobs than there are warm workers would only queue them inside the pool
+        if self.worker_pool:
+            self.max_concurrent_jobs = min(self.max_concurrent_jobs, workers)
         
         logger.info(f"🚀 VetScan Pro MCP Server initializing...")
         logger.info(f"📁 Export path: {self.export_path}")
         logger.info(f"🔧 Blender path: {self.blender_path}")
+        logger.info(f"🔥 Blender workers: {workers}")
+        logger.info(f"⚙️ Concurrent jobs: {self.max_concurrent_jobs}")
 
     async def register_client(self, websocket):
         """Register new WebSocket client"""
@@ -63,6 +532,10 @@ class BlenderMCPServer:
                 "generate_single_animal",
                 "generate_all_animals", 
                 "get_generation_status",
+                "subscribe_job",
+                "unsubscribe_job",
+                "list_jobs",
+                "cancel_job",
                 "list_available_species",
                 "get_model_info",
                 "health_check"
@@ -82,40 +555,382 @@ class BlenderMCPServer:
             logger.info(f"📨 Received: {method} (ID: {request_id})")
             
             # Route to appropriate handler
-            if method == 'generate_single_animal':
-                response = await self.generate_single_animal(params)
-            elif method == 'generate_all_animals':
-                response = await self.generate_all_animals(params)
+            if method in ('generate_single_animal', 'generate_all_animals'):
+                response = self.submit_job('single' if method == 'generate_single_animal' else 'all',
+                                           params, websocket)
+                if params.get('wait') and 'job_id' in response:
+                    # Reply once the job has finished; this client's other requests go on meanwhile
+                    task = asyncio.create_task(
+                        self._reply_when_finished(websocket, request_id, self.active_jobs[response['job_id']]))
+                    self.reply_tasks.add(task)
+                    task.add_done_callback(self.reply_tasks.discard)
+                    return
+            elif method == 'get_generation_status':
+                response = self.get_generation_status(params)
+            elif method == 'subscribe_job':
+                response = self.subscribe_job(params, websocket)
+            elif method == 'unsubscribe_job':
+                response = self.unsubscribe_job(params, websocket)
+            elif method == 'list_jobs':
+                response = self.list_jobs(params)
+            elif method == 'cancel_job':
+                response = self.cancel_job(params)
             elif method == 'health_check':
                 response = await self.health_check()
             else:
                 response = {
                     "error": f"Unknown method: {method}",
                     "available_methods": [
-                        "generate_single_animal", "generate_all_animals", "health_check"
+                        "generate_single_animal", "generate_all_animals", "get_generation_status",
+                        "subscribe_job", "unsubscribe_job", "list_jobs", "cancel_job", "health_check"
                     ]
                 }
             
-            # Send response
-            response_msg = {
-                "id": request_id,
-                "result": response,
-                "timestamp": datetime.now().isoformat()
-            }
-            
-            await websocket.send(json.dumps(response_msg))
+            await self._send_response(websocket, request_id, response)
             
         except Exception as e:
             logger.error(f"❌ Error handling message: {str(e)}")
 
-    async def generate_single_animal(self, params):
-        """Generate a single animal species"""
+    async def _send_response(self, websocket, request_id, response):
+        response_msg = {
+            "id": request_id,
+            "result": response,
+            "timestamp": datetime.now().isoformat()
+        }
+        await websocket.send(json.dumps(response_msg))
+
+    async def _reply_when_finished(self, websocket, request_id, job):
+        """Answer a "wait" request with the job's final status"""
+        await job.done.wait()
+        try:
+            await self._send_response(websocket, request_id, job.to_dict())
+        except websockets.ConnectionClosed:
+            logger.info(f"📴 Client left before {job.id} finished")
+
+    def submit_job(self, kind, params, websocket=None):
+        """Queue a generation job and return its id right away.
+
+        The requesting client gets progress notifications unless
+        params["subscribe"] is false. With params["wait"], handle_message
+        sends the reply once the job has finished instead.
+        """
+        priority = params.get('priority', 'normal')
+        if isinstance(priority, str):
+            if priority not in JOB_PRIORITIES:
+                return {"error": f"Unknown priority: {priority}", "priorities": list(JOB_PRIORITIES)}
+            priority = JOB_PRIORITIES[priority]
+        elif not isinstance(priority, int) or not 0 <= priority <= 9:
+            return {"error": "priority must be 'high', 'normal', 'low' or an integer 0-9"}
+
+        self.job_sequence += 1
+        label = params.get('species_id', 'dog') if kind == 'single' else 'all'
+        job_id = f"{label}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{self.job_sequence}"
+        job = GenerationJob(job_id, kind, params, priority)
+        if websocket is not None and params.get('subscribe', True):
+            job.subscribers.add(websocket)
+        self.active_jobs[job_id] = job
+        self.generation_queue.put_nowait((priority, self.job_sequence, job_id))
+        logger.info(f"📥 Queued {job_id} (priority {priority}, {self.generation_queue.qsize()} waiting)")
+        return {"job_id": job_id, "status": job.state, "priority": priority, "queued": self.generation_queue.qsize()}
+
+    async def _job_runner(self):
+        """Take jobs off generation_queue one at a time; max_concurrent_jobs of these run"""
+        while True:
+            _, _, job_id = await self.generation_queue.get()
+            job = self.active_jobs.get(job_id)
+            if job is None or job.state != 'queued':
+                continue  # Cancelled while waiting
+
+            job.state = 'running'
+            job.started_at = time.time()
+            job.task = asyncio.create_task(self._run_job(job))
+            try:
+                result = await asyncio.shield(job.task)
+            except asyncio.CancelledError:
+                if not job.task.cancelled():
+                    raise  # The runner itself is being shut down
+                job.finish('cancelled', error="Cancelled while running")
+                logger.info(f"🛑 Cancelled {job.id}")
+            except Exception as e:
+                job.finish('failed', error=str(e))
+            else:
+                # A partly failed mass run counts as failed; its result has the per-species detail
+                state = 'completed' if result.get('status', 'completed') == 'completed' else 'failed'
+                job.finish(state, result=result, error=result.get('error'))
+            finally:
+                job.task = None
+                self._notify_finished(job)
+                self._prune_finished_jobs()
+
+    async def _run_job(self, job):
+        on_output = lambda line: self._job_output(job, line)
+        if job.kind == 'all':
+            return await self.generate_all_animals(job.params, on_output)
+        return await self.generate_single_animal(job.params, job.id, on_output)
+
+    def _job_output(self, job, line):
+        """One line of Blender output for a job: keep it in the tail or push it as progress"""
+        if line.startswith(PROGRESS_PREFIX):
+            try:
+                event = json.loads(line[len(PROGRESS_PREFIX):])
+            except ValueError:
+                event = None
+            if isinstance(event, dict):
+                if event.get('stage') == 'species_completed':
+                    job.species_done.add(event.get('species_id'))
+                event['job_elapsed'] = round(time.time() - job.started_at, 3)
+                if job.kind == 'all':
+                    event['species_done'] = len(job.species_done)
+                job.progress = event
+                self._notify(job, {"type": "progress", "job_id": job.id, **event})
+                return
+        job.log_lines += 1
+        job.log_tail.append(line[:LOG_LINE_MAX_CHARS])
+
+    def _notify(self, job, message):
+        """Send a notification to the job's subscribers without waiting on slow clients"""
+        if job.subscribers:
+            message["timestamp"] = datetime.now().isoformat()
+            websockets.broadcast(job.subscribers, json.dumps(message))
+
+    def _notify_finished(self, job):
+        self._notify(job, {"type": "job_finished", **job.to_dict()})
+
+    def _prune_finished_jobs(self):
+        finished = [job_id for job_id, job in self.active_jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self.active_jobs[job_id]
+
+    def cancel_job(self, params):
+        """Cancel a queued job, or kill the Blender process of a running one.
+
+        A running job reports "cancelling" until its task has actually
+        stopped; job_finished (or get_generation_status) then says "cancelled".
+        """
+        job = self.active_jobs.get(params.get('job_id'))
+        if job is None:
+            return {"error": f"Unknown job: {params.get('job_id')}"}
+        if job.finished:
+            return {"job_id": job.id, "status": job.state, "cancelled": False}
+        if job.state == 'queued':
+            job.finish('cancelled', error="Cancelled before start")
+            self._notify_finished(job)
+            logger.info(f"🛑 Cancelled {job.id} (queued)")
+        elif job.state == 'running':
+            if not job.task.cancel():
+                # The job finished already; its runner has not recorded it yet
+                return {"job_id": job.id, "status": job.state, "cancelled": False}
+            job.state = 'cancelling'
+            logger.info(f"🛑 Cancelling {job.id}")
+        return {"job_id": job.id, "status": job.state, "cancelled": True}
+
+    def get_generation_status(self, params):
+        """Job status; params["log_lines"] adds that many lines of retained Blender output"""
+        job = self.active_jobs.get(params.get('job_id'))
+        if job is None:
+            return {"error": f"Unknown job: {params.get('job_id')}"}
+        log_lines = params.get('log_lines', 0)
+        if isinstance(log_lines, bool) or not isinstance(log_lines, int) or log_lines < 0:
+            return {"error": "log_lines must be a non-negative integer"}
+        status = job.to_dict()
+        if log_lines:
+            status["log_tail"] = list(job.log_tail)[-log_lines:]
+        if job.state == 'queued':
+            waiting = sorted((j.priority, j.created_at, j.id) for j in self.active_jobs.values() if j.state == 'queued')
+            status["position"] = [item[2] for item in waiting].index(job.id) + 1
+        return status
+
+    def subscribe_job(self, params, websocket):
+        """Receive progress notifications for an existing job"""
+        job = self.active_jobs.get(params.get('job_id'))
+        if job is None:
+            return {"error": f"Unknown job: {params.get('job_id')}"}
+        if not job.finished:
+            job.subscribers.add(websocket)
+        return job.to_dict()
+
+    def unsubscribe_job(self, params, websocket):
+        job = self.active_jobs.get(params.get('job_id'))
+        if job is None:
+            return {"error": f"Unknown job: {params.get('job_id')}"}
+        job.subscribers.discard(websocket)
+        return {"job_id": job.id, "subscribed": False}
+
+    def list_jobs(self, params):
+        """All known jobs, optionally filtered by status"""
+        wanted = params.get('status')
+        jobs = [job for job in self.active_jobs.values() if not wanted or job.state == wanted]
+        counts = {}
+        for job in self.active_jobs.values():
+            counts[job.state] = counts.get(job.state, 0) + 1
+        return {
+            "max_concurrent_jobs": self.max_concurrent_jobs,
+            "counts": counts,
+            "jobs": [job.to_dict() for job in jobs],
+        }
+
+    async def generate_single_animal(self, params, job_id=None, on_output=None):
+        """Generate a single animal species; on_output gets each line of Blender output"""
         species_id = params.get('species_id', 'dog')
         
         logger.info(f"🐕 Starting generation: {species_id}")
         
-        job_id = f"{species_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-        
+        job_id = job_id or f"{species_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+
+        keys = self._cache_keys(species_id, params.get('quality_levels'))
+        keyed_with = self.generator_definitions['file_sha256'] if keys else None
+        hits = {} if params.get('force') else self._cache_hits(species_id, keys)
+        if keys and len(hits) == len(keys):
+            self.cache_stats["hits"] += 1
+            logger.info(f"♻️ Cache hit: {species_id} ({', '.join(hits)})")
+            return {
+                "job_id": job_id,
+                "status": "completed",
+                "species_id": species_id,
+                "cached": True,
+                "cache_hits": list(hits),
+                "files": hits,
+            }
+
+        self.cache_stats["misses"] += 1
+        # Build just the quality levels that are out of date
+        missing = [q for q in keys if q not in hits] or params.get('quality_levels')
+        if self.worker_pool:
+            result = await self._generate_on_worker(job_id, species_id, missing, on_output)
+        else:
+            result = await self._generate_cold(job_id, species_id, missing, on_output)
+        built_with = result.pop('generator_sha256', None)
+        if keys:
+            if result.get('status') == 'completed' and self._generator_unchanged(keyed_with, built_with):
+                self._record_cache(species_id, keys)
+            result.update(cached=False, cache_hits=list(hits))
+        return result
+
+    def _generator_unchanged(self, keyed_with, built_with=None):
+        """Whether outputs can be cached under keys computed from generator version keyed_with.
+
+        False when the script was edited during the run, or when a warm
+        worker built them with a version it loaded earlier.
+        """
+        definitions = self._generator()
+        return bool(definitions) and definitions['file_sha256'] == keyed_with == (built_with or keyed_with)
+
+    def _generator(self):
+        """Parsed generator definitions, re-read whenever the script changes; None if unreadable"""
+        path = os.path.join(self.scripts_path, 'generate_all_animals.py')
+        try:
+            st = os.stat(path)
+            stamp = (st.st_mtime_ns, st.st_size)
+            if stamp != self.generator_stamp:
+                self.generator_definitions = load_generator_definitions(self.scripts_path)
+                self.generator_stamp = stamp
+                if self.worker_pool:
+                    self.worker_pool.expect_generator(self.generator_definitions['file_sha256'])
+        except (OSError, SyntaxError, ValueError) as e:
+            logger.warning(f"⚠️ Cannot read generator definitions: {e}")
+            return None
+        return self.generator_definitions
+
+    def _cache_keys(self, species_id, quality_levels=None):
+        """{quality_level: cache key} for one species; empty if the cache cannot be used"""
+        definitions = self._generator()
+        if not definitions or species_id not in definitions['animal_species']:
+            return {}
+        quality_levels = quality_levels or list(definitions['quality_levels'])
+        if any(q not in definitions['quality_levels'] for q in quality_levels):
+            return {}
+        return {q: generation_cache_key(definitions, species_id, q) for q in quality_levels}
+
+    def _read_cache_index(self, species_id):
+        try:
+            with open(os.path.join(self.export_path, species_id, GENERATION_CACHE_FILE), encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _cache_hits(self, species_id, keys):
+        """{quality_level: GLB path} for outputs generated from the same inputs and still on disk.
+
+        A GLB counts only if its content still hashes to what was recorded,
+        so one overwritten with a same-sized file is rebuilt.
+        """
+        index = self._read_cache_index(species_id)
+        hits = {}
+        for quality_level, key in keys.items():
+            entry = index.get(quality_level) or {}
+            path = os.path.join(self.export_path, species_id, f"{species_id}_{quality_level}.glb")
+            if entry.get('key') != key or not entry.get('sha256'):
+                continue
+            try:
+                # The size check skips hashing files that obviously changed
+                if os.path.getsize(path) == entry.get('size') and file_sha256(path) == entry['sha256']:
+                    hits[quality_level] = path
+            except OSError:
+                continue
+        return hits
+
+    def _record_cache(self, species_id, keys):
+        """Remember the inputs of every GLB a successful run left behind"""
+        index = self._read_cache_index(species_id)
+        for quality_level, key in keys.items():
+            path = os.path.join(self.export_path, species_id, f"{species_id}_{quality_level}.glb")
+            if os.path.isfile(path):
+                index[quality_level] = {
+                    "key": key,
+                    "size": os.path.getsize(path),
+                    "sha256": file_sha256(path),
+                    "generated_at": datetime.now().isoformat(),
+                }
+            else:
+                # Template without an exporter yet; nothing to reuse
+                index.pop(quality_level, None)
+        index_path = os.path.join(self.export_path, species_id, GENERATION_CACHE_FILE)
+        try:
+            os.makedirs(os.path.dirname(index_path), exist_ok=True)
+            with open(index_path + '.tmp', 'w', encoding='utf-8') as f:
+                json.dump(index, f, indent=2)
+            os.replace(index_path + '.tmp', index_path)
+        except OSError as e:
+            logger.warning(f"⚠️ Cannot write generation cache for {species_id}: {e}")
+
+    async def _generate_on_worker(self, job_id, species_id, quality_levels=None, on_output=None):
+        """Run one species on a warm Blender worker"""
+        try:
+            reply = await self.worker_pool.run({
+                "id": job_id,
+                "species_id": species_id,
+                "quality_levels": quality_levels,
+                "export_path": self.export_path,
+            }, on_output)
+        except WorkerError as e:
+            logger.error(f"❌ Generation failed: {e}")
+            return {"job_id": job_id, "status": "failed", "species_id": species_id, "error": str(e)}
+
+        if reply.get('status') == 'completed':
+            all_levels = set(self.generator_definitions['quality_levels']) if self.generator_definitions else set()
+            if not quality_levels or set(quality_levels) >= all_levels:
+                # Only full runs are comparable for shard ordering
+                self.species_seconds[species_id] = reply.get('seconds')
+            logger.info(f"✅ Generation completed: {species_id} ({reply.get('seconds')}s)")
+            return {
+                "job_id": job_id,
+                "status": "completed",
+                "species_id": species_id,
+                "seconds": reply.get('seconds'),
+                "generator_sha256": reply.get('generator_sha256'),
+                **reply.get('result', {}),
+            }
+        logger.error(f"❌ Generation failed: {reply.get('error')}")
+        return {
+            "job_id": job_id,
+            "status": "failed",
+            "species_id": species_id,
+            "error": reply.get('error'),
+            "traceback": reply.get('traceback'),
+        }
+
+    async def _generate_cold(self, job_id, species_id, quality_levels=None, on_output=None):
+        """Run one species in a fresh Blender process (no worker pool)"""
         try:
             # Run Blender script
             script_path = f"{self.scripts_path}/generate_all_animals.py"
@@ -125,25 +940,29 @@ class BlenderMCPServer:
                 '--python', script_path,
                 '--', species_id
             ]
+            if quality_levels:
+                cmd.append(','.join(quality_levels))
             
             process = await asyncio.create_subprocess_exec(
                 *cmd,
                 stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-                cwd=self.project_root
+                stderr=asyncio.subprocess.STDOUT,
+                cwd=self.project_root,
+                limit=WORKER_LINE_LIMIT
             )
             
-            stdout, stderr = await process.communicate()
+            tail = await self._stream_output(process, on_output)
             
             if process.returncode == 0:
                 logger.info(f"✅ Generation completed: {species_id}")
                 return {
                     "job_id": job_id,
                     "status": "completed",
-                    "species_id": species_id
+                    "species_id": species_id,
+                    "quality_levels": quality_levels,  # None: every level
                 }
             else:
-                error_msg = stderr.decode() if stderr else "Unknown error"
+                error_msg = "\n".join(tail) or "Unknown error"
                 logger.error(f"❌ Generation failed: {error_msg}")
                 return {
                     "job_id": job_id,
@@ -154,8 +973,46 @@ class BlenderMCPServer:
         except Exception as e:
             return {"status": "failed", "error": str(e)}
 
-    async def generate_all_animals(self, params):
-        """Generate all 20 animal species"""
+    async def _stream_output(self, process, on_output=None, tail_lines=20):
+        """Read Blender's output line by line until it exits.
+
+        Each line goes to on_output as it arrives; only the last
+        tail_lines are kept and returned, for error messages. Blender is
+        killed if the job is cancelled.
+        """
+        tail = deque(maxlen=tail_lines)
+        try:
+            while True:
+                try:
+                    raw = await process.stdout.readline()
+                except ValueError:
+                    continue  # Over-long line; the reader dropped it
+                if not raw:
+                    break
+                line = raw.decode('utf-8', errors='replace').rstrip('\n')
+                if not line.startswith(PROGRESS_PREFIX):
+                    tail.append(line[:LOG_LINE_MAX_CHARS])
+                if on_output:
+                    on_output(line)
+            await process.wait()
+        except asyncio.CancelledError:
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+            raise
+        return list(tail)
+
+    async def generate_all_animals(self, params, on_output=None):
+        """Generate all 20 animal species.
+
+        By default this is the single serial Blender run. With "parallel": true
+        the species are spread over several Blender processes (warm workers
+        when the pool is enabled) and the per-species results are gathered
+        into one summary. "quality_levels" limits the exported levels either way.
+        """
+        if params.get('parallel', False):
+            return await self._generate_all_parallel(params, on_output)
+
         logger.info(f"🌟 Starting mass generation")
         
         try:
@@ -166,36 +1023,199 @@ class BlenderMCPServer:
                 '--python', script_path,
                 '--', 'all'
             ]
+            if params.get('quality_levels'):
+                cmd.append(','.join(params['quality_levels']))
             
             process = await asyncio.create_subprocess_exec(
                 *cmd,
                 stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-                cwd=self.project_root
+                stderr=asyncio.subprocess.STDOUT,
+                cwd=self.project_root,
+                limit=WORKER_LINE_LIMIT
             )
             
-            stdout, stderr = await process.communicate()
+            tail = await self._stream_output(process, on_output)
             
             if process.returncode == 0:
                 logger.info(f"✅ Mass generation completed")
                 return {"status": "completed", "message": "All animals generated"}
             else:
-                error_msg = stderr.decode() if stderr else "Unknown error"
+                error_msg = "\n".join(tail) or "Unknown error"
                 return {"status": "failed", "error": error_msg}
                 
         except Exception as e:
             return {"status": "failed", "error": str(e)}
 
+    def _species_costs(self, catalog):
+        """Measured seconds where known, template estimates scaled to match otherwise"""
+        estimates = {species_id: species_cost(data) for species_id, data in catalog.items()}
+        measured = {s: self.species_seconds[s] for s in catalog if self.species_seconds.get(s)}
+        if not measured:
+            return estimates
+        # Seconds per estimate unit, so measured and estimated species compare fairly
+        rate = sum(measured.values()) / sum(estimates[s] for s in measured)
+        return {s: measured.get(s, estimates[s] * rate) for s in catalog}
+
+    async def _generate_all_parallel(self, params, on_output=None):
+        started = time.time()
+        definitions = self._generator()
+        if definitions is None:
+            return {"status": "failed", "error": "Cannot read species list from generate_all_animals.py"}
+        catalog = definitions['animal_species']
+
+        species_ids = params.get('species') or list(catalog)
+        unknown = [s for s in species_ids if s not in catalog]
+        if unknown:
+            return {"status": "failed", "error": f"Unknown species: {unknown}"}
+
+        # Species whose every output is already up to date never reach Blender
+        results = {}
+        keys = {s: self._cache_keys(s, params.get('quality_levels')) for s in species_ids}
+        if not params.get('force'):
+            for species_id in species_ids:
+                hits = self._cache_hits(species_id, keys[species_id])
+                if keys[species_id] and len(hits) == len(keys[species_id]):
+                    self.cache_stats["hits"] += 1
+                    results[species_id] = {"status": "completed", "cached": True, "shard": None, "seconds": 0, "error": None}
+        to_generate = [s for s in species_ids if s not in results]
+        costs = self._species_costs({s: catalog[s] for s in to_generate})
+
+        default_shards = self.worker_pool.size if self.worker_pool else self.max_concurrent_jobs
+        shard_count = max(1, min(int(params.get('shards') or default_shards), len(to_generate) or 1))
+        logger.info(f"🌟 Starting parallel mass generation: {len(to_generate)} species on {shard_count} shards "
+                    f"({len(results)} cached)")
+
+        mode = "workers" if self.worker_pool else "processes"
+        if to_generate and self.worker_pool:
+            results.update(await self._generate_on_worker_shards(
+                costs, shard_count, params.get('quality_levels'), on_output, params.get('force')))
+        elif to_generate:
+            self.cache_stats["misses"] += len(to_generate)
+            generated = await self._generate_on_process_shards(
+                costs, shard_count, params.get('quality_levels'), on_output)
+            unchanged = self._generator_unchanged(definitions['file_sha256'])
+            for species_id, result in generated.items():
+                if unchanged and result['status'] == 'completed' and keys[species_id]:
+                    self._record_cache(species_id, keys[species_id])
+            results.update(generated)
+
+        failed = sorted(s for s, r in results.items() if r['status'] != 'completed')
+        status = "completed" if not failed else "partial" if len(failed) < len(results) else "failed"
+        seconds = round(time.time() - started, 3)
+        logger.info(f"{'✅' if not failed else '⚠️'} Mass generation {status}: "
+                    f"{len(results) - len(failed)}/{len(results)} species in {seconds}s")
+        return {
+            "status": status,
+            "mode": mode,
+            "shards": shard_count,
+            "seconds": seconds,
+            "completed": len(results) - len(failed),
+            "cached": sorted(s for s, r in results.items() if r.get('cached')),
+            "failed": failed,
+            "error": f"{len(failed)} species failed: {', '.join(failed)}" if failed else None,
+            "species": {s: results[s] for s in species_ids},
+        }
+
+    async def _generate_on_worker_shards(self, costs, shard_count, quality_levels=None, on_output=None, force=False):
+        """Feed species, slowest first, to shard_count concurrent warm-worker jobs"""
+        pending = deque(sorted(costs, key=costs.get, reverse=True))
+        results = {}
+
+        async def shard(index):
+            while pending:
+                species_id = pending.popleft()
+                result = await self.generate_single_animal(
+                    {'species_id': species_id, 'quality_levels': quality_levels, 'force': force},
+                    f"all_{species_id}_{index}",
+                    on_output,
+                )
+                results[species_id] = {
+                    "status": result.get('status'),
+                    "cached": result.get('cached', False),
+                    "shard": index,
+                    "seconds": result.get('seconds'),
+                    "error": result.get('error'),
+                }
+
+        await asyncio.gather(*(shard(i) for i in range(shard_count)))
+        return results
+
+    async def _generate_on_process_shards(self, costs, shard_count, quality_levels=None, on_output=None):
+        """One cold Blender process per shard, each running its species list slowest first"""
+        shards = split_into_shards(costs, shard_count)
+        results = {}
+        completed = set()
+
+        def shard_output(line):
+            # The generator reports each species once all its qualities are exported
+            if line.startswith(PROGRESS_PREFIX) and '"species_completed"' in line:
+                try:
+                    completed.add(json.loads(line[len(PROGRESS_PREFIX):]).get('species_id'))
+                except ValueError:
+                    pass
+            if on_output:
+                on_output(line)
+
+        async def shard(index, species_ids):
+            started = time.time()
+            cmd = [
+                self.blender_path,
+                '--background',
+                '--python-exit-code', '1',
+                '--python', f"{self.scripts_path}/generate_all_animals.py",
+                '--', ','.join(species_ids),
+            ]
+            if quality_levels:
+                cmd.append(','.join(quality_levels))
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    *cmd,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.STDOUT,
+                    cwd=self.project_root,
+                    limit=WORKER_LINE_LIMIT
+                )
+                output = await self._stream_output(process, shard_output)
+                error = None if process.returncode == 0 else f"Shard exited with code {process.returncode}"
+            except OSError as e:
+                output, error = [], str(e)
+
+            seconds = round(time.time() - started, 3)
+            for species_id in species_ids:
+                done = species_id in completed
+                results[species_id] = {
+                    "status": "completed" if done else "failed",
+                    "cached": False,
+                    "shard": index,
+                    "seconds": None,
+                    "error": None if done else error or "No completion reported",
+                }
+            tail = "\n".join(output)
+            if error:
+                logger.error(f"❌ Shard {index} ({', '.join(species_ids)}) failed after {seconds}s\n{tail}")
+            else:
+                logger.info(f"✅ Shard {index} done in {seconds}s: {', '.join(species_ids)}")
+
+        await asyncio.gather(*(shard(i, species_ids) for i, species_ids in enumerate(shards)))
+        return results
+
     async def health_check(self):
         """Health check endpoint"""
         return {
             "status": "healthy",
             "server": "VetScan Pro Blender MCP",
             "version": "2.0",
+            "workers": self.worker_pool.status() if self.worker_pool else None,
+            "generation_cache": dict(self.cache_stats),
+            "jobs": {
+                "max_concurrent": self.max_concurrent_jobs,
+                "queued": sum(1 for job in self.active_jobs.values() if job.state == 'queued'),
+                "running": sum(1 for job in self.active_jobs.values() if job.state in ('running', 'cancelling')),
+            },
             "timestamp": datetime.now().isoformat()
         }
 
-    async def handle_client(self, websocket, path):
+    async def handle_client(self, websocket, path=None):
         """Handle individual WebSocket client"""
         self.clients.add(websocket)
         try:
@@ -205,10 +1225,17 @@ class BlenderMCPServer:
             logger.error(f"❌ Client error: {str(e)}")
         finally:
             self.clients.discard(websocket)
+            for job in self.active_jobs.values():
+                job.subscribers.discard(websocket)
 
     async def start_server(self):
         """Start the WebSocket server"""
         logger.info(f"🚀 Starting VetScan Pro Blender MCP Server on {self.host}:{self.port}")
+
+        # Warm the workers in the background; early requests wait for the first idle one
+        if self.worker_pool:
+            self.worker_pool_task = asyncio.create_task(self.worker_pool.start())
+        self.job_runners = [asyncio.create_task(self._job_runner()) for _ in range(self.max_concurrent_jobs)]
         
         server = await websockets.serve(
             self.handle_client,
@@ -229,489 +1256,14 @@ async def main():
         logger.info("🛑 Server shutdown")
     finally:
         websocket_server.close()
+        for runner in server.job_runners:
+            runner.cancel()
+        for job in server.active_jobs.values():
+            if job.task:
+                job.task.cancel()
+        if server.worker_pool:
+            await server.worker_pool.stop()
 
 if __name__ == "__main__":
     os.makedirs('/app/logs', exist_ok=True)
     asyncio.run(main())
-- get_viewport_screenshot: Viewport Screenshot
-- generate_bello_model: Bello 3D-Modell generieren
-"""
-
-import asyncio
-import websockets
-import json
-import logging
-import os
-import sys
-import subprocess
-import threading
-from pathlib import Path
-from typing import Dict, Any, List, Optional
-
-# Logging Setup
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('/app/logs/blender-mcp.log'),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
-logger = logging.getLogger('BlenderMCP')
-
-class BlenderMCPServer:
-    def __init__(self, host='0.0.0.0', port=8765):
-        self.host = host
-        self.port = port
-        self.blender_process = None
-        self.clients = set()
-        
-    async def start_blender_headless(self):
-        """Startet Blender im Headless-Modus mit Python Server"""
-        try:
-            # Blender Python Script für interaktive Session
-            blender_script = """
-import bpy
-import json
-import sys
-import os
-from mathutils import Vector
-
-# Cleanup default scene
-bpy.ops.object.select_all(action='SELECT')
-bpy.ops.object.delete(use_global=False)
-
-# Add basic lighting
-bpy.ops.object.light_add(type='SUN', location=(5, 5, 10))
-light = bpy.context.object
-light.data.energy = 3
-
-# Add camera
-bpy.ops.object.camera_add(location=(7, -7, 5))
-camera = bpy.context.object
-camera.rotation_euler = (1.1, 0, 0.785)
-
-# Create Bello base model (simple dog shape)
-def create_bello_base():
-    # Add cube for body
-    bpy.ops.mesh.primitive_cube_add(scale=(2, 1, 0.8), location=(0, 0, 0.8))
-    body = bpy.context.object
-    body.name = "Bello_Body"
-    
-    # Add cylinder for head
-    bpy.ops.mesh.primitive_uv_sphere_add(scale=(0.8, 0.8, 0.8), location=(2.2, 0, 0.8))
-    head = bpy.context.object
-    head.name = "Bello_Head"
-    
-    # Add cylinders for legs
-    locations = [(1.2, 0.6, 0), (1.2, -0.6, 0), (-0.8, 0.6, 0), (-0.8, -0.6, 0)]
-    for i, loc in enumerate(locations):
-        bpy.ops.mesh.primitive_cylinder_add(radius=0.2, depth=0.8, location=loc)
-        leg = bpy.context.object
-        leg.name = f"Bello_Leg_{i+1}"
-    
-    # Add tail
-    bpy.ops.mesh.primitive_cylinder_add(radius=0.1, depth=1.5, location=(-2.2, 0, 0.8))
-    tail = bpy.context.object
-    tail.name = "Bello_Tail"
-    tail.rotation_euler = (0, 1.3, 0)
-    
-    # Join all parts
-    bpy.ops.object.select_all(action='DESELECT')
-    for obj_name in ["Bello_Body", "Bello_Head", "Bello_Leg_1", "Bello_Leg_2", 
-                     "Bello_Leg_3", "Bello_Leg_4", "Bello_Tail"]:
-        if obj_name in bpy.data.objects:
-            bpy.data.objects[obj_name].select_set(True)
-    
-    bpy.context.view_layer.objects.active = bpy.data.objects["Bello_Body"]
-    bpy.ops.object.join()
-    
-    # Rename final object
-    bello = bpy.context.object
-    bello.name = "Bello"
-    
-    # Add basic material
-    mat = bpy.data.materials.new(name="Bello_Fur")
-    mat.use_nodes = True
-    mat.node_tree.nodes["Principled BSDF"].inputs[0].default_value = (0.8, 0.6, 0.3, 1.0)  # Brown fur
-    bello.data.materials.append(mat)
-    
-    print("✅ Bello base model created successfully")
-    return bello
-
-# Create Bello if not exists
-if "Bello" not in bpy.data.objects:
-    create_bello_base()
-
-print("🎯 Blender MCP Server ready - Bello model loaded")
-print("📊 Scene objects:", [obj.name for obj in bpy.data.objects])
-
-# Keep Blender running
-import time
-while True:
-    time.sleep(1)
-"""
-            
-            # Start Blender with our script
-            cmd = [
-                'blender', 
-                '--background',
-                '--python-expr', blender_script
-            ]
-            
-            logger.info(f"Starting Blender: {' '.join(cmd)}")
-            self.blender_process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                env={**os.environ, 'DISPLAY': ':99'}
-            )
-            
-            # Wait a bit for Blender to start
-            await asyncio.sleep(5)
-            logger.info("✅ Blender started successfully")
-            
-        except Exception as e:
-            logger.error(f"❌ Failed to start Blender: {e}")
-            raise
-    
-    def execute_blender_python(self, code: str) -> Dict[str, Any]:
-        """Execute Python code in Blender and return result"""
-        try:
-            # Create temp script file
-            script_file = f"/app/temp/exec_{hash(code) % 10000}.py"
-            with open(script_file, 'w') as f:
-                f.write(f"""
-import bpy
-import json
-import sys
-
-try:
-{chr(10).join('    ' + line for line in code.split(chr(10)))}
-    result = "success"
-except Exception as e:
-    result = str(e)
-    print(f"Error: {{e}}")
-
-print(f"Result: {{result}}")
-""")
-            
-            # Execute in Blender
-            result = subprocess.run([
-                'blender', '--background', 
-                '--python', script_file
-            ], capture_output=True, text=True, timeout=30)
-            
-            # Clean up
-            os.remove(script_file)
-            
-            return {
-                "success": result.returncode == 0,
-                "output": result.stdout,
-                "error": result.stderr if result.returncode != 0 else None
-            }
-            
-        except Exception as e:
-            return {"success": False, "error": str(e)}
-    
-    def get_scene_info(self) -> Dict[str, Any]:
-        """Get current scene information"""
-        code = """
-import bpy
-scene_info = {
-    'objects': [obj.name for obj in bpy.data.objects],
-    'meshes': [mesh.name for mesh in bpy.data.meshes],
-    'materials': [mat.name for mat in bpy.data.materials],
-    'cameras': [cam.name for cam in bpy.data.cameras],
-    'lights': [light.name for light in bpy.data.lights]
-}
-print("SCENE_INFO:", json.dumps(scene_info))
-"""
-        result = self.execute_blender_python(code)
-        
-        # Extract scene info from output
-        try:
-            for line in result['output'].split('\n'):
-                if line.startswith('SCENE_INFO:'):
-                    return json.loads(line[11:])
-        except:
-            pass
-            
-        return {"objects": [], "error": "Could not retrieve scene info"}
-    
-    def get_object_info(self, object_name: str) -> Dict[str, Any]:
-        """Get detailed information about specific object"""
-        code = f"""
-import bpy
-import bmesh
-
-obj_info = {{"exists": False}}
-
-if "{object_name}" in bpy.data.objects:
-    obj = bpy.data.objects["{object_name}"]
-    obj_info = {{
-        "exists": True,
-        "name": obj.name,
-        "type": obj.type,
-        "location": list(obj.location),
-        "rotation": list(obj.rotation_euler),
-        "scale": list(obj.scale)
-    }}
-    
-    if obj.type == 'MESH' and obj.data:
-        # Get mesh statistics
-        mesh = obj.data
-        obj_info.update({{
-            "vertices": len(mesh.vertices),
-            "edges": len(mesh.edges), 
-            "faces": len(mesh.polygons),
-            "polygon_count": len(mesh.polygons),
-            "materials": [mat.name for mat in mesh.materials]
-        }})
-
-print("OBJECT_INFO:", json.dumps(obj_info))
-"""
-        result = self.execute_blender_python(code)
-        
-        # Extract object info from output
-        try:
-            for line in result['output'].split('\n'):
-                if line.startswith('OBJECT_INFO:'):
-                    return json.loads(line[12:])
-        except:
-            pass
-            
-        return {"exists": False, "error": f"Object '{object_name}' not found"}
-    
-    def export_gltf(self, filepath: str, selected_only: bool = True, quality: str = "high") -> Dict[str, Any]:
-        """Export scene or selection to GLB format"""
-        
-        # Quality settings
-        quality_settings = {
-            "high": {"draco_level": 6, "texture_size": 2048},
-            "medium": {"draco_level": 4, "texture_size": 1024}, 
-            "low": {"draco_level": 2, "texture_size": 512}
-        }
-        
-        settings = quality_settings.get(quality, quality_settings["high"])
-        
-        code = f"""
-import bpy
-import os
-
-# Export settings
-export_path = "{filepath}"
-os.makedirs(os.path.dirname(export_path), exist_ok=True)
-
-try:
-    # Select objects for export
-    if {selected_only} and "Bello" in bpy.data.objects:
-        bpy.ops.object.select_all(action='DESELECT')
-        bpy.data.objects["Bello"].select_set(True)
-        bpy.context.view_layer.objects.active = bpy.data.objects["Bello"]
-    
-    # Export GLB
-    bpy.ops.export_scene.gltf(
-        filepath=export_path,
-        export_format='GLB',
-        export_selected={selected_only},
-        export_draco_mesh_compression_enable=True,
-        export_draco_mesh_compression_level={settings['draco_level']},
-        export_materials='EXPORT',
-        export_animations=True,
-        export_cameras=False,
-        export_lights=False
-    )
-    
-    file_size = os.path.getsize(export_path) if os.path.exists(export_path) else 0
-    print("EXPORT_RESULT:", json.dumps({{
-        "success": True,
-        "filepath": export_path,
-        "file_size": file_size,
-        "quality": "{quality}"
-    }}))
-    
-except Exception as e:
-    print("EXPORT_RESULT:", json.dumps({{
-        "success": False,
-        "error": str(e)
-    }}))
-"""
-        
-        result = self.execute_blender_python(code)
-        
-        # Extract export result
-        try:
-            for line in result['output'].split('\n'):
-                if line.startswith('EXPORT_RESULT:'):
-                    return json.loads(line[14:])
-        except:
-            pass
-            
-        return {"success": False, "error": "Export failed"}
-
-    def get_viewport_screenshot(self, filepath: str = "/app/exports/viewport.png", max_size: int = 800) -> Dict[str, Any]:
-        """Render a screenshot from the active camera and save to a PNG file.
-
-        Note: In headless mode there is no viewport; we perform an off-screen render
-        using the active camera. Returns file path and size.
-        """
-        # Clamp resolution to a sensible range
-        clamped_size = max(64, min(int(max_size), 4096))
-
-        code = f"""
-import bpy
-import os
-import json
-
-output_path = r"{filepath}"
-os.makedirs(os.path.dirname(output_path), exist_ok=True)
-
-scene = bpy.context.scene
-
-# Ensure a camera exists
-if not bpy.data.cameras:
-    bpy.ops.object.camera_add(location=(7, -7, 5))
-    cam = bpy.context.object
-    cam.rotation_euler = (1.1, 0, 0.785)
-    scene.camera = cam
-elif scene.camera is None:
-    # Pick any existing camera
-    for obj in bpy.data.objects:
-        if obj.type == 'CAMERA':
-            scene.camera = obj
-            break
-
-# Set render settings
-scene.render.resolution_x = {clamped_size}
-scene.render.resolution_y = {clamped_size}
-scene.render.resolution_percentage = 100
-scene.render.image_settings.file_format = 'PNG'
-scene.render.filepath = output_path
-
-try:
-    bpy.ops.render.render(write_still=True)
-    file_size = os.path.getsize(output_path) if os.path.exists(output_path) else 0
-    print("SCREENSHOT_RESULT:", json.dumps({
-        "success": True,
-        "filepath": output_path,
-        "file_size": file_size,
-        "width": scene.render.resolution_x,
-        "height": scene.render.resolution_y
-    }))
-except Exception as e:
-    print("SCREENSHOT_RESULT:", json.dumps({
-        "success": False,
-        "error": str(e)
-    }))
-"""
-
-        result = self.execute_blender_python(code)
-
-        try:
-            for line in result['output'].split('\n'):
-                if line.startswith('SCREENSHOT_RESULT:'):
-                    return json.loads(line[len('SCREENSHOT_RESULT:'):].strip())
-        except Exception as e:
-            return {"success": False, "error": f"Failed to parse screenshot result: {e}"}
-
-        return {"success": False, "error": "Screenshot failed"}
-    
-    async def handle_mcp_request(self, websocket, path):
-        """Handle MCP WebSocket requests"""
-        try:
-            self.clients.add(websocket)
-            logger.info(f"Client connected from {websocket.remote_address}")
-            
-            async for message in websocket:
-                try:
-                    request = json.loads(message)
-                    response = await self.process_request(request)
-                    await websocket.send(json.dumps(response))
-                    
-                except json.JSONDecodeError:
-                    await websocket.send(json.dumps({
-                        "error": "Invalid JSON", 
-                        "id": None
-                    }))
-                except Exception as e:
-                    await websocket.send(json.dumps({
-                        "error": str(e),
-                        "id": request.get("id", None)
-                    }))
-                    
-        except websockets.exceptions.ConnectionClosed:
-            logger.info("Client disconnected")
-        except Exception as e:
-            logger.error(f"WebSocket error: {e}")
-        finally:
-            self.clients.discard(websocket)
-    
-    async def process_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
-        """Process individual MCP request"""
-        method = request.get("method")
-        params = request.get("params", {})
-        request_id = request.get("id")
-        
-        logger.info(f"Processing request: {method}")
-        
-        if method == "get_scene_info":
-            result = self.get_scene_info()
-        elif method == "get_object_info":
-            object_name = params.get("object_name", "Bello")
-            result = self.get_object_info(object_name)
-        elif method == "execute_blender_code":
-            code = params.get("code", "")
-            result = self.execute_blender_python(code)
-        elif method == "export_gltf":
-            filepath = params.get("filepath", "/app/exports/bello.glb")
-            quality = params.get("quality", "high")
-            result = self.export_gltf(filepath, quality=quality)
-        elif method == "get_viewport_screenshot":
-            filepath = params.get("filepath", "/app/exports/viewport.png")
-            max_size = params.get("max_size", 800)
-            result = self.get_viewport_screenshot(filepath=filepath, max_size=max_size)
-        elif method == "ping":
-            result = {"pong": "Blender MCP Server is running"}
-        else:
-            result = {"error": f"Unknown method: {method}"}
-        
-        return {
-            "id": request_id,
-            "result": result
-        }
-    
-    async def start_server(self):
-        """Start the MCP WebSocket server"""
-        # Start Blender first
-        await self.start_blender_headless()
-        
-        # Start health server in background
-        health_process = subprocess.Popen([
-            'python3', '/app/health-server.py'
-        ], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        
-        # Start WebSocket server
-        logger.info(f"Starting MCP Server on {self.host}:{self.port}")
-        server = await websockets.serve(
-            self.handle_mcp_request,
-            self.host,
-            self.port
-        )
-        
-        logger.info("🚀 Blender MCP Server is running!")
-        logger.info(f"WebSocket: ws://{self.host}:{self.port}")
-        logger.info(f"Health Check: http://{self.host}:8080/health")
-        
-        # Keep server running
-        await server.wait_closed()
-
-if __name__ == "__main__":
-    # Create logs directory
-    os.makedirs('/app/logs', exist_ok=True)
-    os.makedirs('/app/temp', exist_ok=True)
-    os.makedirs('/app/exports', exist_ok=True)
-    
-    # Start server
-    server = BlenderMCPServer()
-    asyncio.run(server.start_server())
\ No newline at end of file
@@ -11,18 +11,24 @@ import json
 import socket
 from typing import Dict, Any
 
+from mcp_connection import MCP_HOST, MCP_PORT, MCP_SOCKET_PATH, connect
+
 class BlenderMCPAnimalClient:
     """Client to control Blender animal generation via MCP"""
     
-    def __init__(self, host='localhost', port=9876):
+    def __init__(self, host=MCP_HOST, port=MCP_PORT, socket_path=MCP_SOCKET_PATH):
         self.host = host
         self.port = port
+        self.socket_path = socket_path
+
+    def connect(self) -> socket.socket:
+        """Open a connection, preferring the Unix socket when Blender exposes one"""
+        return connect(self.host, self.port, self.socket_path)
         
     def send_command(self, command: Dict[str, Any]) -> Dict[str, Any]:
         """Send command to Blender MCP and get response"""
         try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.connect((self.host, self.port))
+            sock = self.connect()
             
             # Send command
             message = json.dumps(command).encode('utf-8')
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+VetScan Pro 3000 - Long-lived Blender generation worker
+Runs inside headless Blender and takes generation jobs over stdin
+
+Started by the WebSocket server's worker pool:
+    blender --background --factory-startup --python blender_worker.py -- --scripts /app/scripts
+
+Protocol: one JSON job per line on stdin. Replies are single stdout lines
+starting with MESSAGE_PREFIX; every other stdout line is log output from
+Blender or the generator.
+"""
+
+import bpy
+import hashlib
+import json
+import os
+import sys
+import time
+import traceback
+
+MESSAGE_PREFIX = "@@VETSCAN_WORKER@@ "
+
+
+def parse_args():
+    """Arguments after Blender's own, i.e. after '--'"""
+    argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+    args = {'scripts': os.path.dirname(os.path.abspath(__file__))}
+    for flag, value in zip(argv[::2], argv[1::2]):
+        args[flag.lstrip('-')] = value
+    return args
+
+
+def send(message):
+    """Write one protocol line; flushed so the pool sees it immediately"""
+    sys.stdout.write(MESSAGE_PREFIX + json.dumps(message) + "\n")
+    sys.stdout.flush()
+
+
+def rss_bytes():
+    """Current resident set size (Linux), falling back to the peak"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def reset_scene():
+    """Empty factory scene, so no objects, materials or collections leak between jobs"""
+    bpy.ops.wm.read_factory_settings(use_empty=True)
+
+
+def run_job(generator_module, job):
+    species_id = job.get('species_id')
+    if species_id not in generator_module.ANIMAL_SPECIES:
+        raise ValueError(f"Unknown species: {species_id}")
+
+    quality_levels = job.get('quality_levels')
+    unknown = [q for q in quality_levels or [] if q not in generator_module.QUALITY_LEVELS]
+    if unknown:
+        raise ValueError(f"Unknown quality levels: {unknown}")
+
+    generator = generator_module.AnimalGenerator()
+    if job.get('export_path'):
+        generator.export_path = job['export_path']
+    generator.generate_single_species(species_id, quality_levels)
+    return {
+        'species_id': species_id,
+        'quality_levels': quality_levels or list(generator_module.QUALITY_LEVELS.keys()),
+        'export_dir': os.path.join(generator.export_path, species_id),
+    }
+
+
+def main():
+    args = parse_args()
+    if args['scripts'] not in sys.path:
+        sys.path.insert(0, args['scripts'])
+
+    # Preload once; every job reuses the imported module
+    import generate_all_animals
+    with open(generate_all_animals.__file__, 'rb') as f:
+        # Lets the server tell which version of the generator this process runs
+        generator_sha256 = hashlib.sha256(f.read()).hexdigest()
+
+    send({
+        'event': 'ready',
+        'pid': os.getpid(),
+        'blender_version': bpy.app.version_string,
+        'generator_sha256': generator_sha256,
+        'rss_bytes': rss_bytes(),
+    })
+
+    jobs_done = 0
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            job = json.loads(line)
+        except ValueError as e:
+            send({'event': 'error', 'error': f"Invalid job: {e}"})
+            continue
+        if job.get('type') == 'shutdown':
+            break
+
+        started = time.perf_counter()
+        reply = {'event': 'result', 'id': job.get('id'), 'generator_sha256': generator_sha256}
+        try:
+            reset_scene()
+            reply.update(status='completed', result=run_job(generate_all_animals, job))
+        except Exception as e:
+            reply.update(status='failed', error=str(e), traceback=traceback.format_exc())
+        jobs_done += 1
+        reply.update(
+            seconds=round(time.perf_counter() - started, 3),
+            jobs_done=jobs_done,
+            rss_bytes=rss_bytes(),
+        )
+        send(reply)
+
+
+if __name__ == "__main__":
+    main()
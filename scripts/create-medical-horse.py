@@ -4,23 +4,27 @@
 Creates a medically accurate 3D horse model with veterinary examination features
 """
 
-import socket
 import json
 import time
 from datetime import datetime
 
+from mcp_connection import MCP_HOST, MCP_PORT, MCP_SOCKET_PATH, connect
+
 class MedicalHorseCreator:
     def __init__(self):
-        self.host = 'localhost'
-        self.port = 9876
+        self.host = MCP_HOST
+        self.port = MCP_PORT
+        self.socket_path = MCP_SOCKET_PATH
         self.timestamp = datetime.now().strftime("%H%M%S")
+
+    def connect(self, timeout=30):
+        """Open a connection, preferring the Unix socket when Blender exposes one"""
+        return connect(self.host, self.port, self.socket_path, timeout)
         
     def execute_blender_code(self, code):
         """Execute Python code in Blender via MCP"""
         try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(30)
-            sock.connect((self.host, self.port))
+            sock = self.connect()
             
             command = {
                 "method": "execute_blender_code",
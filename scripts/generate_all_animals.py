@@ -11,8 +11,13 @@ from mathutils import Vector
 import math
 import json
 import os
+import sys
+import time
 from typing import Dict, List, Tuple
 
+# Stdout lines starting with this carry one JSON progress event for the MCP server
+PROGRESS_PREFIX = "@@VETSCAN_PROGRESS@@ "
+
 # Import veterinary data structure
 ANIMAL_SPECIES = {
     # QUADRUPED SMALL
@@ -196,6 +201,16 @@ class AnimalGenerator:
         self.current_animal = None
         self.generated_count = 0
         self.export_path = "/app/exports"
+        self.species_started = None
+
+    def report_progress(self, stage: str, species_id: str = None, quality_level: str = None, **extra):
+        """Emit a structured progress marker (species, quality level, stage, elapsed seconds)"""
+        event = {'stage': stage, 'species_id': species_id, 'quality_level': quality_level}
+        if self.species_started is not None:
+            event['elapsed'] = round(time.perf_counter() - self.species_started, 3)
+        event.update(extra)
+        sys.stdout.write(PROGRESS_PREFIX + json.dumps(event) + '\n')
+        sys.stdout.flush()
         
     def clear_scene(self):
         """Clean up the scene completely"""
@@ -556,9 +571,12 @@ class AnimalGenerator:
             return
             
         print(f'\n🚀 Generating {species_id.upper()} in {len(quality_levels)} quality levels...')
+        self.species_started = time.perf_counter()
+        self.report_progress('species_started', species_id, quality_levels=quality_levels)
         
-        for quality_level in quality_levels:
+        for index, quality_level in enumerate(quality_levels, 1):
             print(f'\n--- {quality_level.upper()} QUALITY ---')
+            self.report_progress('building', species_id, quality_level, index=index, total=len(quality_levels))
             
             # Clear scene for each quality level
             self.clear_scene()
@@ -574,6 +592,7 @@ class AnimalGenerator:
                 continue
                 
             # Apply materials
+            self.report_progress('materials', species_id, quality_level)
             materials = self.create_medical_materials(species_id, species_data['colors'])
             model_obj = bpy.data.objects.get(model_name)
             if model_obj and materials:
@@ -583,27 +602,33 @@ class AnimalGenerator:
             self.create_anatomy_markers(model_obj, species_id)
             
             # Optimize for quality level
+            self.report_progress('optimizing', species_id, quality_level)
             self.optimize_for_quality(model_name, quality_level)
             
             # Export
+            self.report_progress('exporting', species_id, quality_level)
             self.export_model(species_id, quality_level, model_name)
+            self.report_progress('quality_completed', species_id, quality_level, index=index, total=len(quality_levels))
             
         # Create manifest
         self.create_manifest(species_id, species_data)
         print(f'✅ {species_id} generation completed!')
+        self.report_progress('species_completed', species_id)
 
-    def generate_all_species(self):
+    def generate_all_species(self, quality_levels: List[str] = None):
         """Generate all 20 animal species"""
+        if quality_levels is None:
+            quality_levels = list(QUALITY_LEVELS.keys())
         print('🌟 STARTING MASS GENERATION OF ALL 20 SPECIES 🌟')
-        print(f'Total models to generate: {len(ANIMAL_SPECIES)} species × {len(QUALITY_LEVELS)} qualities = {len(ANIMAL_SPECIES) * len(QUALITY_LEVELS)} models')
+        print(f'Total models to generate: {len(ANIMAL_SPECIES)} species × {len(quality_levels)} qualities = {len(ANIMAL_SPECIES) * len(quality_levels)} models')
         
         for i, species_id in enumerate(ANIMAL_SPECIES.keys(), 1):
             print(f'\n{"="*60}')
             print(f'📍 PROGRESS: {i}/{len(ANIMAL_SPECIES)} - {species_id.upper()}')
             print(f'{"="*60}')
             
-            self.generate_single_species(species_id)
-            self.generated_count += len(QUALITY_LEVELS)
+            self.generate_single_species(species_id, quality_levels)
+            self.generated_count += len(quality_levels)
             
             print(f'✅ Species {i}/{len(ANIMAL_SPECIES)} completed')
             print(f'📊 Total models generated so far: {self.generated_count}')
@@ -620,17 +645,39 @@ def main():
     
     generator = AnimalGenerator()
     
-    # Check if specific species requested
+    # Check if specific species requested (Blender passes script args after '--').
+    # An optional second argument limits the quality levels, e.g. mobile,desktop
     import sys
-    if len(sys.argv) > 1:
-        species_id = sys.argv[1]
+    argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else sys.argv[1:]
+    quality_levels = argv[1].split(',') if len(argv) > 1 else None
+    if quality_levels:
+        unknown = [q for q in quality_levels if q not in QUALITY_LEVELS]
+        if unknown:
+            print(f'❌ Unknown quality levels: {", ".join(unknown)}')
+            print(f'Available quality levels: {list(QUALITY_LEVELS.keys())}')
+            sys.exit(1)
+    if argv:
+        species_id = argv[0]
         if species_id == 'all':
-            generator.generate_all_species()
-        elif species_id in ANIMAL_SPECIES:
-            generator.generate_single_species(species_id)
-        else:
-            print(f'❌ Unknown species: {species_id}')
+            generator.generate_all_species(quality_levels)
+            return
+        # Comma-separated list, e.g. a shard from the MCP server: horse,cow,dog
+        species_ids = species_id.split(',')
+        unknown = [s for s in species_ids if s not in ANIMAL_SPECIES]
+        if unknown:
+            print(f'❌ Unknown species: {", ".join(unknown)}')
             print(f'Available species: {list(ANIMAL_SPECIES.keys())}')
+            sys.exit(1)
+        failed = []
+        for species_id in species_ids:
+            try:
+                generator.generate_single_species(species_id, quality_levels)
+            except Exception as e:
+                # Keep going with the rest of the list
+                print(f'❌ {species_id} generation failed: {e}')
+                failed.append(species_id)
+        if failed:
+            sys.exit(1)
     else:
         # Default: generate all species
         generator.generate_all_species()
@@ -0,0 +1,33 @@
+"""
+Connection helper shared by the scripts that talk to the BlenderMCP addon
+
+The addon listens on a Unix domain socket next to TCP port 9876. Clients
+use the socket when Blender exposes one and fall back to TCP otherwise.
+"""
+
+import os
+import socket
+import tempfile
+
+MCP_HOST = 'localhost'
+MCP_PORT = 9876
+
+# Unix domain socket the addon listens on next to TCP (same default as the addon)
+MCP_SOCKET_PATH = os.environ.get("BLENDERMCP_SOCKET", os.path.join(tempfile.gettempdir(), "blendermcp.sock"))
+
+
+def unix_socket_available(socket_path=MCP_SOCKET_PATH):
+    return bool(socket_path) and hasattr(socket, "AF_UNIX") and os.path.exists(socket_path)
+
+
+def connect(host=MCP_HOST, port=MCP_PORT, socket_path=MCP_SOCKET_PATH, timeout=None):
+    """Open a connection to the addon, preferring the Unix socket when Blender exposes one"""
+    if unix_socket_available(socket_path):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(timeout)
+        try:
+            sock.connect(socket_path)
+            return sock
+        except OSError:
+            sock.close()
+    return socket.create_connection((host, port), timeout=timeout)
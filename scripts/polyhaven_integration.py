@@ -10,8 +10,47 @@ import bpy
 import requests
 import json
 import os
+import importlib.util
 from pathlib import Path
 
+ADDON_PATH = Path(__file__).resolve().parents[1] / "assets" / "blender-mcp-addon.py"
+
+_addon = None
+_asset_cache = None
+_catalog = None
+
+def _load_addon():
+    global _addon
+    if _addon is None:
+        spec = importlib.util.spec_from_file_location("blender_mcp_addon", ADDON_PATH)
+        _addon = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(_addon)
+    return _addon
+
+def _running_server():
+    return getattr(bpy.types, "blendermcp_server", None)
+
+def get_shared_asset_cache():
+    """Use the running BlenderMCP server's asset cache, or open the same cache directory"""
+    global _asset_cache
+    server = _running_server()
+    if server is not None and getattr(server, "asset_cache", None) is not None:
+        return server.asset_cache
+    if _asset_cache is None:
+        _asset_cache = _load_addon().AssetCache()
+    return _asset_cache
+
+def get_shared_catalog():
+    """Use the running BlenderMCP server's Poly Haven catalog, or open the same file"""
+    global _catalog
+    server = _running_server()
+    if server is not None and getattr(server, "polyhaven_catalog", None) is not None:
+        return server.polyhaven_catalog
+    if _catalog is None:
+        cache = get_shared_asset_cache()
+        _catalog = _load_addon().PolyHavenCatalog(os.path.join(cache.root, "polyhaven-catalog.json"))
+    return _catalog
+
 class PolyHavenTextureManager:
     """Manager for PolyHaven textures and materials"""
     
@@ -19,29 +58,24 @@ class PolyHavenTextureManager:
         self.api_base = "https://api.polyhaven.com"
         self.texture_cache = Path("/Users/doriangrey/Desktop/coding/tierarztspiel/assets/textures/polyhaven")
         self.texture_cache.mkdir(parents=True, exist_ok=True)
-        
-    def search_textures(self, category=None, search_term=None):
-        """Search for textures on PolyHaven"""
-        
-        url = f"{self.api_base}/assets"
-        params = {"type": "textures"}
-        
-        if category:
-            params["categories"] = category
-            
-        response = requests.get(url, params=params)
-        if response.status_code == 200:
-            assets = response.json()
-            
-            # Filter by search term if provided
-            if search_term:
-                filtered = {}
-                for asset_id, asset_data in assets.items():
-                    if search_term.lower() in asset_data.get("name", "").lower():
-                        filtered[asset_id] = asset_data
-                return filtered
-            return assets
-        return {}
+        self.asset_cache = get_shared_asset_cache()
+        self.catalog = get_shared_catalog()
+        
+    def search_textures(self, category=None, search_term=None, offset=0, limit=None):
+        """Search for textures in the local PolyHaven catalog"""
+        
+        try:
+            results = self.catalog.search(
+                asset_type="textures",
+                categories=category,
+                query=search_term,
+                offset=offset,
+                limit=limit,
+            )
+        except Exception as e:
+            print(f"❌ Failed to search textures: {e}")
+            return {}
+        return results["assets"]
         
     def download_texture(self, texture_id, resolution="2k"):
         """Download a specific texture from PolyHaven"""
@@ -81,18 +115,16 @@ class PolyHavenTextureManager:
                     url = file_info
                     
                 if url:
-                    # Download file
+                    # Download file through the cache shared with the addon
                     local_path = self.texture_cache / f"{texture_id}_{map_type}_{resolution}.jpg"
+                    cache_key = self.asset_cache.make_key("polyhaven", texture_id, resolution, "jpg", map_type)
                     
-                    if not local_path.exists():
+                    if not self.asset_cache.contains(cache_key):
                         print(f"   Downloading {map_type} map...")
-                        r = requests.get(url)
-                        if r.status_code == 200:
-                            with open(local_path, 'wb') as f:
-                                f.write(r.content)
-                            texture_files[map_type] = str(local_path)
-                    else:
-                        print(f"   Using cached {map_type} map")
+                    r = self.asset_cache.fetch(cache_key, url, str(local_path))
+                    if r["status_code"] == 200:
+                        if r["cache"] == "hit":
+                            print(f"   Using cached {map_type} map")
                         texture_files[map_type] = str(local_path)
                         
         return texture_files
@@ -0,0 +1,338 @@
+"""
+Minimal stand-in for Blender's `bpy` module, enough to import
+assets/blender-mcp-addon.py and exercise its non-UI code under pytest.
+
+Only what the tests touch is modelled. Timers run when a test calls
+`bpy.app.timers.run_for()` / `run_until()` on its own thread, the way
+Blender runs them on the main thread.
+"""
+
+import os
+import time
+import types as _types
+
+from . import props  # noqa: F401  (bpy.props is imported as a submodule)
+
+
+class _Timers:
+    def __init__(self):
+        self.callbacks = {}
+
+    def register(self, callback, first_interval=0.0, persistent=False):
+        self.callbacks[callback] = time.monotonic() + first_interval
+
+    def is_registered(self, callback):
+        return callback in self.callbacks
+
+    def unregister(self, callback):
+        self.callbacks.pop(callback, None)
+
+    def run_once(self):
+        now = time.monotonic()
+        for callback, due in list(self.callbacks.items()):
+            if now >= due and callback in self.callbacks:
+                interval = callback()
+                if interval is None:
+                    self.callbacks.pop(callback, None)
+                else:
+                    self.callbacks[callback] = time.monotonic() + interval
+
+    def run_until(self, predicate, timeout=10.0):
+        """Pump timers until predicate() is true; returns whether it became true"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if predicate():
+                return True
+            self.run_once()
+            time.sleep(0.001)
+        return predicate()
+
+    def run_for(self, seconds):
+        self.run_until(lambda: False, seconds)
+
+
+def _persistent(function):
+    return function
+
+
+app = _types.SimpleNamespace(
+    timers=_Timers(),
+    handlers=_types.SimpleNamespace(depsgraph_update_post=[], load_post=[], persistent=_persistent),
+    version=(4, 2, 0),
+    version_string="4.2.0 (test stub)",
+)
+
+
+class ID:
+    """Datablock with a name and custom properties (id["key"])"""
+
+    def __init__(self, name, **attributes):
+        self.name = name
+        self._properties = {}
+        self.users = 0
+        self.__dict__.update(attributes)
+
+    def __getitem__(self, key):
+        return self._properties[key]
+
+    def __setitem__(self, key, value):
+        self._properties[key] = value
+
+    def __contains__(self, key):
+        return key in self._properties
+
+    def get(self, key, default=None):
+        return self._properties.get(key, default)
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self.name!r}>"
+
+
+class Image(ID):
+    def __init__(self, name, filepath="", colorspace="sRGB"):
+        super().__init__(name, filepath=filepath, packed_file=None, source='FILE', is_dirty=False,
+                         size=(1024, 1024), file_format='JPEG',
+                         colorspace_settings=_types.SimpleNamespace(name=colorspace))
+
+    def pack(self):
+        with open(self.filepath, "rb") as f:
+            self.packed_file = _types.SimpleNamespace(data=f.read())
+        self.packed_file.size = len(self.packed_file.data)
+
+    def reload(self):
+        pass
+
+    def copy(self):
+        duplicate = data.images.add(Image(self.name, filepath=self.filepath,
+                                          colorspace=self.colorspace_settings.name))
+        duplicate.packed_file = self.packed_file
+        duplicate._properties = dict(self._properties)
+        return duplicate
+
+
+class _Socket:
+    def __init__(self, node, name):
+        self.node = node
+        self.name = name
+        self.links = []
+        self.default_value = None
+
+
+class _Sockets:
+    """node.inputs / node.outputs: sockets are created on first access by name or index"""
+
+    def __init__(self, node):
+        self.node = node
+        self.sockets = {}
+
+    def __getitem__(self, key):
+        if key not in self.sockets:
+            self.sockets[key] = _Socket(self.node, str(key))
+        return self.sockets[key]
+
+    def __iter__(self):
+        return iter(list(self.sockets.values()))
+
+
+class _Node:
+    def __init__(self, node_type, name):
+        # Only image nodes are looked up by node.type
+        self.type = "TEX_IMAGE" if node_type == "ShaderNodeTexImage" else node_type
+        self.name = name
+        self.image = None
+        self.location = (0, 0)
+        self.inputs = _Sockets(self)
+        self.outputs = _Sockets(self)
+
+
+class _Nodes:
+    def __init__(self):
+        self.nodes = []
+
+    def __iter__(self):
+        return iter(list(self.nodes))
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def new(self, type):
+        node = _Node(type, f"{type}.{len(self.nodes):03d}")
+        self.nodes.append(node)
+        return node
+
+    def remove(self, node):
+        self.nodes.remove(node)
+
+    def clear(self):
+        self.nodes.clear()
+
+
+class _Links:
+    def __init__(self):
+        self.links = []
+
+    def new(self, from_socket, to_socket):
+        link = _types.SimpleNamespace(from_node=from_socket.node, from_socket=from_socket,
+                                      to_node=to_socket.node, to_socket=to_socket)
+        from_socket.links.append(link)
+        self.links.append(link)
+        return link
+
+    def remove(self, link):
+        link.from_socket.links.remove(link)
+        self.links.remove(link)
+
+
+class Material(ID):
+    def __init__(self, name):
+        super().__init__(name, use_nodes=False,
+                         node_tree=_types.SimpleNamespace(nodes=_Nodes(), links=_Links()))
+
+
+class Collection:
+    """bpy.data.<kind>: iterable, indexable by name, with remove()"""
+
+    def __init__(self, factory=ID):
+        self.items = {}
+        self.factory = factory
+
+    def __iter__(self):
+        return iter(list(self.items.values()))
+
+    def __len__(self):
+        return len(self.items)
+
+    def __getitem__(self, name):
+        return self.items[name]
+
+    def __contains__(self, name):
+        return name in self.items
+
+    def get(self, name, default=None):
+        return self.items.get(name, default)
+
+    def keys(self):
+        return list(self.items)
+
+    def add(self, item):
+        base, index = item.name, 1
+        while item.name in self.items:
+            item.name = f"{base}.{index:03d}"
+            index += 1
+        self.items[item.name] = item
+        return item
+
+    def new(self, name, *args, **kwargs):
+        return self.add(self.factory(name))
+
+    def remove(self, item):
+        self.items.pop(item.name, None)
+
+    def clear(self):
+        self.items.clear()
+
+
+class _Images(Collection):
+    def __init__(self):
+        super().__init__(Image)
+
+    def load(self, filepath, check_existing=False):
+        return self.add(Image(os.path.basename(filepath), filepath=filepath))
+
+
+data = _types.SimpleNamespace(
+    images=_Images(),
+    materials=Collection(Material),
+    objects=Collection(),
+    worlds=Collection(),
+    collections=Collection(),
+    libraries=Collection(),
+)
+
+
+class _Path:
+    @staticmethod
+    def abspath(path):
+        return path
+
+
+path = _Path()
+
+
+class _Scene:
+    name = "Scene"
+    objects = ()
+    blendermcp_use_polyhaven = True
+    blendermcp_use_hyper3d = True
+    blendermcp_use_sketchfab = True
+    blendermcp_hyper3d_api_key = "test-key"
+    blendermcp_hyper3d_mode = "MAIN_SITE"
+    blendermcp_sketchfab_api_key = "test-key"
+
+
+context = _types.SimpleNamespace(
+    scene=_Scene(),
+    selected_objects=[],
+    view_layer=_types.SimpleNamespace(update=lambda: None, objects=_types.SimpleNamespace(active=None)),
+)
+
+
+class _OperatorNamespace:
+    """bpy.ops.<area>.<name>(**kwargs); records calls in bpy.ops_calls.
+
+    A test can give an operator a body by adding it to bpy.ops_handlers
+    under its dotted name, e.g. "import_scene.gltf".
+    """
+
+    def __init__(self, path=()):
+        self._path = path
+
+    def __getattr__(self, name):
+        return _OperatorNamespace(self._path + (name,))
+
+    def __call__(self, *args, **kwargs):
+        name = ".".join(self._path)
+        ops_calls.append((name, kwargs))
+        if name in ops_handlers:
+            ops_handlers[name](**kwargs)
+        return {'FINISHED'}
+
+
+ops = _OperatorNamespace()
+ops_calls = []
+ops_handlers = {}
+
+
+class _Types:
+    class Panel:
+        pass
+
+    class Operator:
+        pass
+
+    class Scene:
+        pass
+
+    class Object:
+        pass
+
+    class Collection:
+        pass
+
+    Image = Image
+
+
+types = _Types
+
+
+class _Utils:
+    @staticmethod
+    def register_class(cls):
+        pass
+
+    @staticmethod
+    def unregister_class(cls):
+        pass
+
+
+utils = _Utils()
@@ -0,0 +1,8 @@
+"""bpy.props stand-in: property definitions are only stored on classes"""
+
+
+def _property(*args, **kwargs):
+    return None
+
+
+StringProperty = IntProperty = BoolProperty = EnumProperty = FloatProperty = _property
@@ -0,0 +1,4 @@
+"""mathutils stand-in"""
+
+Vector = tuple
+Matrix = tuple
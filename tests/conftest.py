@@ -0,0 +1,331 @@
+"""
+Shared fixtures for the pytest suite
+
+Blender is not available on CI machines, so the generation server tests run
+against a throwaway project directory with a fake `blender` executable. It
+runs the real scripts/blender_worker.py (and a small stand-in generator with
+the same interface as generate_all_animals.py) under a minimal `bpy` module.
+
+The addon tests import assets/blender-mcp-addon.py against the stub `bpy` in
+tests/blender_stubs and point its API URLs at a local http.server stand-in.
+"""
+
+import http.server
+import importlib.util
+import json
+import logging
+import os
+import shutil
+import socket
+import sys
+import textwrap
+import threading
+from contextlib import suppress
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+SCRIPTS = REPO_ROOT / "scripts"
+
+# The integration tester runs inside a real Blender and writes bpy scripts here
+collect_ignore = ["blender_integration_test.py", "blender_integration"]
+
+
+def load_script(name, path):
+    """Import a script whose file name is not a valid module name"""
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+FAKE_BPY = '''
+import types
+app = types.SimpleNamespace(version_string="4.2.0 (test)")
+
+class _WindowManagerOps:
+    def read_factory_settings(self, use_empty=False):
+        print("factory settings loaded", flush=True)
+
+ops = types.SimpleNamespace(wm=_WindowManagerOps())
+'''
+
+FAKE_BLENDER = '''#!{python}
+# Stand-in for `blender --background [--python-exit-code N] --python SCRIPT -- ARGS`
+import runpy, sys
+sys.path.insert(0, {bpy_dir!r})
+script = sys.argv[sys.argv.index('--python') + 1]
+exit_code = int(sys.argv[sys.argv.index('--python-exit-code') + 1]) if '--python-exit-code' in sys.argv else 0
+try:
+    runpy.run_path(script, run_name='__main__')
+except SystemExit:
+    raise
+except Exception:
+    import traceback
+    traceback.print_exc()
+    sys.exit(exit_code)
+'''
+
+STUB_GENERATOR = '''
+import json, os, sys, time
+
+PROGRESS_PREFIX = "@@VETSCAN_PROGRESS@@ "
+
+ANIMAL_SPECIES = {
+    'horse': {'template': 'quadruped_large', 'features': ['mane', 'hooves']},
+    'dog': {'template': 'quadruped_medium', 'features': []},
+    'cat': {'template': 'quadruped_small', 'features': []},
+    'goldfish': {'template': 'fish', 'features': []},
+    'crash': {'template': 'bird_small', 'features': []},
+    'slow': {'template': 'bird_small', 'features': []},
+}
+
+QUALITY_LEVELS = {
+    'mobile': {'vertices': 800},
+    'desktop': {'vertices': 12000},
+}
+
+BUILD_TAG = "v1"
+
+
+class AnimalGenerator:
+    def __init__(self):
+        self.export_path = os.path.join(os.environ.get('PROJECT_ROOT', '/app'), 'exports')
+
+    def report_progress(self, stage, species_id=None, quality_level=None, **extra):
+        event = {'stage': stage, 'species_id': species_id, 'quality_level': quality_level, **extra}
+        print(PROGRESS_PREFIX + json.dumps(event), flush=True)
+
+    def generate_single_species(self, species_id, quality_levels=None):
+        quality_levels = quality_levels or list(QUALITY_LEVELS)
+        self.report_progress('species_started', species_id)
+        for quality_level in quality_levels:
+            self.report_progress('building', species_id, quality_level)
+            print(f"building {species_id} {quality_level}", flush=True)
+            if species_id == 'crash':
+                raise RuntimeError("generator crashed")
+            if species_id == 'slow':
+                time.sleep(30)
+            if ANIMAL_SPECIES[species_id]['template'] == 'fish':
+                continue  # Template without an exporter, like the real generator
+            path = os.path.join(self.export_path, species_id, f"{species_id}_{quality_level}.glb")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w') as f:
+                f.write(f"{BUILD_TAG}:{species_id}:{quality_level}")
+        print(f"✅ {species_id} generation completed!", flush=True)
+        self.report_progress('species_completed', species_id)
+
+
+def main():
+    argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else sys.argv[1:]
+    quality_levels = argv[1].split(',') if len(argv) > 1 else None
+    if argv[0] == 'all':
+        species_ids = [s for s in ANIMAL_SPECIES if s not in ('crash', 'slow')]
+    else:
+        species_ids = argv[0].split(',')
+    failed = []
+    for species_id in species_ids:
+        try:
+            AnimalGenerator().generate_single_species(species_id, quality_levels)
+        except Exception as e:
+            print(f"❌ {species_id} generation failed: {e}", flush=True)
+            failed.append(species_id)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
+'''
+
+
+@pytest.fixture
+def blender_project(tmp_path, monkeypatch):
+    """A PROJECT_ROOT with a fake Blender, the real worker script and a stand-in generator"""
+    root = tmp_path / "project"
+    scripts = root / "scripts"
+    scripts.mkdir(parents=True)
+    bpy_dir = tmp_path / "fake_bpy"
+    (bpy_dir / "bpy").mkdir(parents=True)
+    (bpy_dir / "bpy" / "__init__.py").write_text(FAKE_BPY)
+
+    blender = tmp_path / "blender"
+    blender.write_text(FAKE_BLENDER.format(python=sys.executable, bpy_dir=str(bpy_dir)))
+    blender.chmod(0o755)
+
+    shutil.copy(SCRIPTS / "blender_worker.py", scripts / "blender_worker.py")
+    (scripts / "generate_all_animals.py").write_text(textwrap.dedent(STUB_GENERATOR))
+
+    monkeypatch.setenv("PROJECT_ROOT", str(root))
+    monkeypatch.setenv("BLENDER_PATH", str(blender))
+    return root
+
+
+@pytest.fixture(scope="session")
+def server_module(tmp_path_factory):
+    """scripts/blender-mcp-server.py, imported with its /app/logs log file redirected to a temp dir"""
+    log_dir = tmp_path_factory.mktemp("server-logs")
+    file_handler = logging.FileHandler
+    logging.FileHandler = lambda filename, *args, **kwargs: file_handler(
+        log_dir / os.path.basename(filename), *args, **kwargs)
+    try:
+        return load_script("blender_mcp_server", SCRIPTS / "blender-mcp-server.py")
+    finally:
+        logging.FileHandler = file_handler
+
+
+BLENDER_STUBS = REPO_ROOT / "tests" / "blender_stubs"
+
+
+@pytest.fixture(scope="session")
+def addon():
+    """assets/blender-mcp-addon.py, imported against the stub bpy in tests/blender_stubs"""
+    sys.path.insert(0, str(BLENDER_STUBS))
+    return load_script("blendermcp_addon", REPO_ROOT / "assets" / "blender-mcp-addon.py")
+
+
+class StandIn(http.server.ThreadingHTTPServer):
+    """Local HTTP server answering from a {(method, path): handler} table.
+
+    A handler takes the request handler and returns (status, body[, headers]);
+    body may be bytes or anything JSON-serializable. Every request is recorded
+    in `requests` as (method, path, parsed JSON body or None).
+    """
+
+    daemon_threads = True
+
+    def __init__(self):
+        self.routes = {}
+        self.requests = []
+        super().__init__(("127.0.0.1", 0), _StandInHandler)
+        self.url = f"http://127.0.0.1:{self.server_address[1]}"
+
+    def route(self, method, path, handler):
+        if not callable(handler):
+            response = handler
+            handler = lambda request: response  # noqa: E731
+        self.routes[(method, path)] = handler
+
+    def hits(self, method, path):
+        return [body for m, p, body in self.requests if (m, p) == (method, path)]
+
+
+class _StandInHandler(http.server.BaseHTTPRequestHandler):
+    def _respond(self, method):
+        path = self.path.split("?", 1)[0]
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        try:
+            body = json.loads(raw) if raw else None
+        except ValueError:
+            body = raw
+        self.body = body
+        self.server.requests.append((method, path, body))
+
+        handler = self.server.routes.get((method, path))
+        reply = handler(self) if handler else (404, {"error": "not found"})
+        status, payload = reply[0], reply[1]
+        headers = reply[2] if len(reply) > 2 else {}
+        if not isinstance(payload, bytes):
+            payload = json.dumps(payload).encode("utf-8")
+            headers.setdefault("Content-Type", "application/json")
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        self._respond("GET")
+
+    def do_POST(self):
+        self._respond("POST")
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stand_in():
+    server = StandIn()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+class AddonClient:
+    """Socket client for a running addon server.
+
+    Replies are read on a background thread; call() pumps the stub
+    bpy.app.timers on the calling thread until the reply arrives, the way
+    Blender's main loop would drain the command queue.
+    """
+
+    def __init__(self, bpy, port):
+        self.bpy = bpy
+        self.sock = socket.create_connection(("127.0.0.1", port))
+        self.messages = []
+        self.next_id = 0
+        self.lock = threading.Lock()
+        threading.Thread(target=self._read, daemon=True).start()
+
+    def _read(self):
+        decoder = json.JSONDecoder()
+        buffer = ""
+        while True:
+            try:
+                data = self.sock.recv(65536)
+            except OSError:
+                return
+            if not data:
+                return
+            buffer += data.decode("utf-8")
+            while True:
+                buffer = buffer.lstrip()
+                try:
+                    message, end = decoder.raw_decode(buffer)
+                except ValueError:
+                    break
+                buffer = buffer[end:]
+                with self.lock:
+                    self.messages.append(message)
+
+    def send(self, *commands, newline=False):
+        """Write commands back to back in a single sendall()"""
+        data = b"".join(json.dumps(command).encode("utf-8") + (b"\n" if newline else b"") for command in commands)
+        self.sock.sendall(data)
+
+    def wait_for(self, predicate, timeout=10.0):
+        """Pump timers until a received message matches predicate; returns it"""
+        def find():
+            with self.lock:
+                return next((message for message in self.messages if predicate(message)), None)
+        assert self.bpy.app.timers.run_until(lambda: find() is not None, timeout), "no matching message"
+        message = find()
+        with self.lock:
+            self.messages.remove(message)
+        return message
+
+    def call(self, command_type, params=None, timeout=10.0):
+        self.next_id += 1
+        request_id = self.next_id
+        self.send({"type": command_type, "params": params or {}, "id": request_id})
+        return self.wait_for(lambda message: message.get("id") == request_id, timeout)
+
+    def close(self):
+        with suppress(OSError):
+            self.sock.close()
+
+
+@pytest.fixture
+def addon_server(addon, tmp_path):
+    """A started BlenderMCPServer on a free port with its cache under tmp_path"""
+    server = addon.BlenderMCPServer(host="127.0.0.1", port=0, cache_dir=str(tmp_path / "cache"))
+    server.start()
+    server.client = lambda: AddonClient(sys.modules["bpy"], server.socket.getsockname()[1])
+    yield server
+    server.stop()
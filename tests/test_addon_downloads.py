@@ -0,0 +1,124 @@
+"""
+Tests for the addon's download helpers and background job replies
+(assets/blender-mcp-addon.py), against a local HTTP stand-in
+"""
+
+import hashlib
+import zipfile
+
+import pytest
+
+
+def serve_file(stand_in, path, content):
+    stand_in.route("GET", path, (200, content, {"Content-Type": "application/octet-stream"}))
+    return stand_in.url + path
+
+
+def test_download_to_file_streams_hashes_and_reports_progress(addon, stand_in, tmp_path):
+    content = bytes(range(256)) * 4096
+    url = serve_file(stand_in, "/maps/diffuse.jpg", content)
+    hasher = hashlib.sha256()
+    progress = addon.TransferProgress()
+
+    result = addon.download_to_file(url, str(tmp_path / "out" / "diffuse.jpg"), hasher=hasher, progress=progress)
+
+    assert result["status_code"] == 200
+    assert result["bytes"] == len(content)
+    assert (tmp_path / "out" / "diffuse.jpg").read_bytes() == content
+    assert hasher.hexdigest() == hashlib.sha256(content).hexdigest()
+    assert progress.to_dict() == {
+        "bytes_done": len(content), "bytes_total": len(content),
+        "files_done": 1, "files_total": 1, "percent": 100.0,
+    }
+
+
+def test_download_to_file_leaves_nothing_behind_on_error(addon, stand_in, tmp_path):
+    result = addon.download_to_file(stand_in.url + "/missing.jpg", str(tmp_path / "missing.jpg"))
+    assert result["status_code"] == 404
+    assert result["bytes"] == 0
+    assert not (tmp_path / "missing.jpg").exists()
+
+
+def test_download_files_pool_goes_through_the_cache(addon, stand_in, tmp_path):
+    maps = {name: name.encode() * 10000 for name in ("diffuse", "normal", "rough")}
+    files = {
+        name: (serve_file(stand_in, f"/{name}.jpg", content), str(tmp_path / "first" / f"{name}.jpg"),
+               addon.AssetCache.make_key("polyhaven", "brick", "1k", "jpg", name))
+        for name, content in maps.items()
+    }
+    files["plain"] = (serve_file(stand_in, "/plain.jpg", b"plain"), str(tmp_path / "first" / "plain.jpg"))
+    cache = addon.AssetCache(str(tmp_path / "cache"), max_bytes=10 * 1024 * 1024)
+
+    first = addon.download_files(files, cache=cache, max_workers=3)
+    assert {key: result["status_code"] for key, result in first.items()} == dict.fromkeys(files, 200)
+    assert [first[name]["cache"] for name in maps] == ["miss"] * 3
+    assert "cache" not in first["plain"]
+    for name, content in maps.items():
+        assert (tmp_path / "first" / f"{name}.jpg").read_bytes() == content
+        assert first[name]["sha256"] == hashlib.sha256(content).hexdigest()
+
+    # Same keys into a new directory: served from the cache without any request
+    stand_in.requests.clear()
+    again = {name: (url, str(tmp_path / "second" / f"{name}.jpg"), key)
+             for name, (url, _, key) in list(files.items())[:3]}
+    second = addon.download_files(again, cache=cache)
+    assert [second[name]["cache"] for name in maps] == ["hit"] * 3
+    assert stand_in.requests == []
+    assert (tmp_path / "second" / "normal.jpg").read_bytes() == maps["normal"]
+    assert cache.status()["hits"] == 3
+
+
+def make_zip(path, members):
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, content in members.items():
+            archive.writestr(name, content)
+    return str(path)
+
+
+def test_extract_zip_writes_members(addon, tmp_path):
+    archive = make_zip(tmp_path / "model.zip", {"scene.gltf": b"{}", "textures/base.png": b"png" * 100})
+    total = addon.extract_zip(archive, str(tmp_path / "out"))
+    assert total == 2 + 300
+    assert (tmp_path / "out" / "textures" / "base.png").read_bytes() == b"png" * 100
+
+
+@pytest.mark.parametrize("name", ["../escape.txt", "/etc/escape.txt"])
+def test_extract_zip_rejects_paths_outside_destination(addon, tmp_path, name):
+    archive = make_zip(tmp_path / "evil.zip", {name: b"x"})
+    with pytest.raises(ValueError, match="Security issue"):
+        addon.extract_zip(archive, str(tmp_path / "out"))
+    assert not (tmp_path / "escape.txt").exists()
+
+
+def test_extract_zip_enforces_size_and_entry_limits(addon, tmp_path):
+    archive = make_zip(tmp_path / "big.zip", {"a.bin": b"\0" * 1000, "b.bin": b"\0" * 1000})
+    with pytest.raises(ValueError, match="larger than"):
+        addon.extract_zip(archive, str(tmp_path / "one"), max_entry_bytes=999)
+    with pytest.raises(ValueError, match="expands to more than"):
+        addon.extract_zip(archive, str(tmp_path / "two"), max_total_bytes=1500)
+    with pytest.raises(ValueError, match="entries"):
+        addon.extract_zip(archive, str(tmp_path / "three"), max_entries=1)
+
+
+def test_failed_job_reply_shape_depends_on_hello(addon, addon_server, stand_in, monkeypatch):
+    monkeypatch.setattr(addon, "POLYHAVEN_API_URL", stand_in.url)
+    legacy = addon_server.client()
+    negotiated = addon_server.client()
+    try:
+        # A client that never sent "hello" gets the job's final result as before
+        legacy_reply = legacy.call("download_polyhaven_asset", {"asset_id": "nope", "asset_type": "hdris"})
+
+        negotiated.send({"type": "hello", "params": {"framing": "ndjson"}, "id": "hello"})
+        assert negotiated.wait_for(lambda message: message.get("id") == "hello")["status"] == "success"
+        negotiated.send({"type": "download_polyhaven_asset", "id": "job",
+                         "params": {"asset_id": "nope", "asset_type": "hdris", "wait": True}}, newline=True)
+        negotiated_reply = negotiated.wait_for(lambda message: message.get("id") == "job")
+    finally:
+        legacy.close()
+        negotiated.close()
+
+    assert legacy_reply["status"] == "success"
+    assert legacy_reply["result"] == {"error": "Failed to get asset files: 404"}
+    assert negotiated_reply["status"] == "error"
+    assert negotiated_reply["message"] == "Failed to get asset files: 404"
+    assert stand_in.hits("GET", "/files/nope") == [None, None]
@@ -0,0 +1,228 @@
+"""
+Tests for Hyper3D Rodin submit, poll and import in assets/blender-mcp-addon.py
+and create-rabbit-hyper3d.py, against a local stand-in for the Rodin API
+"""
+
+import sys
+import threading
+import time
+import types
+
+import pytest
+
+from conftest import REPO_ROOT, load_script
+
+GLB = b"glTF" + b"\0" * 60
+
+
+class _Identity:
+    def __matmul__(self, vector):
+        return vector
+
+
+def imported_mesh(filepath):
+    """What bpy.ops.import_scene.gltf leaves behind for a single-mesh GLB"""
+    bpy = sys.modules["bpy"]
+    with open(filepath, "rb") as f:
+        assert f.read() == GLB
+    bpy.data.objects.add(bpy.ID(
+        "Mesh", type="MESH", parent=None, children=[],
+        data=types.SimpleNamespace(name="Mesh"),
+        location=types.SimpleNamespace(x=0.0, y=0.0, z=0.0),
+        rotation_euler=types.SimpleNamespace(x=0.0, y=0.0, z=0.0),
+        scale=types.SimpleNamespace(x=1.0, y=1.0, z=1.0),
+        bound_box=[(-1.0, -1.0, 0.0), (1.0, 1.0, 2.0)],
+        matrix_world=_Identity(),
+    ))
+
+
+@pytest.fixture
+def rodin(addon, stand_in, monkeypatch):
+    """Main site and fal.ai endpoints on the stand-in, with fast polling"""
+    bpy = sys.modules["bpy"]
+    monkeypatch.setattr(addon, "RODIN_API_URL", stand_in.url + "/rodin-api")
+    monkeypatch.setattr(addon, "FAL_AI_RODIN_URL", stand_in.url + "/fal")
+    monkeypatch.setattr(addon, "RODIN_POLL_MIN_INTERVAL", 0.01)
+    monkeypatch.setattr(addon, "RODIN_POLL_MAX_INTERVAL", 0.05)
+    monkeypatch.setattr(bpy.context.scene, "blendermcp_hyper3d_mode", "MAIN_SITE", raising=False)
+    monkeypatch.setitem(bpy.ops_handlers, "import_scene.gltf", imported_mesh)
+
+    statuses = iter([["Waiting"], ["Generating"], ["Generating"]])
+    stand_in.route("POST", "/rodin-api/rodin", (201, {"uuid": "task-1", "jobs": {"subscription_key": "sub-1"}}))
+    stand_in.route("POST", "/rodin-api/status",
+                   lambda request: (200, {"jobs": [{"status": s} for s in next(statuses, ["Done"])]}))
+    stand_in.route("POST", "/rodin-api/download",
+                   (200, {"list": [{"name": "preview.webp", "url": stand_in.url + "/files/preview.webp"},
+                                   {"name": "base.glb", "url": stand_in.url + "/files/base.glb"}]}))
+    stand_in.route("GET", "/files/base.glb", (200, GLB))
+    yield stand_in
+    bpy.data.objects.clear()
+
+
+def wait_until(predicate, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.005)
+    return predicate()
+
+
+def test_submit_watch_and_import_main_site(addon_server, rodin):
+    client = addon_server.client()
+    try:
+        created = client.call("create_rodin_job", {"text_prompt": "a rabbit", "subscribe": True,
+                                                   "import_name": "Rabbit"})
+        assert created["status"] == "success"
+        assert created["result"]["uuid"] == "task-1"
+        assert created["result"]["watch"]["watch_id"] == "sub-1"
+
+        status = client.wait_for(lambda message: message.get("event") == "rodin_job_status")
+        assert status["rodin_job"]["detail"] in (["Waiting"], ["Generating"])
+        completed = client.wait_for(lambda message: message.get("event") == "rodin_job_completed")
+        assert completed["rodin_job"]["status"] == "completed"
+        import_job_id = completed["rodin_job"]["import_job_id"]
+        imported = client.wait_for(lambda message: message.get("event") == "job_completed")
+        assert imported["job"]["job_id"] == import_job_id
+        assert imported["job"]["status"] == "completed"
+        assert imported["job"]["result"]["name"] == "Rabbit"
+        assert imported["job"]["result"]["world_bounding_box"] == [[-1.0, -1.0, 0.0], [1.0, 1.0, 2.0]]
+
+        # The poller already knows the answer, so this does not reach Rodin
+        polls = len(rodin.hits("POST", "/rodin-api/status"))
+        polled = client.call("poll_rodin_job_status", {"subscription_key": "sub-1"})
+        assert polled["result"]["status_list"] == ["Done"]
+        assert len(rodin.hits("POST", "/rodin-api/status")) == polls
+    finally:
+        client.close()
+
+    assert polls >= 4
+    assert rodin.hits("POST", "/rodin-api/status")[0] == {"subscription_key": "sub-1"}
+    assert rodin.hits("POST", "/rodin-api/download") == [{"task_uuid": "task-1"}]
+    assert [obj.name for obj in sys.modules["bpy"].data.objects] == ["Rabbit"]
+
+
+def test_rabbit_script_generate_and_import(addon_server, rodin, monkeypatch):
+    rabbit = load_script("create_rabbit_hyper3d", REPO_ROOT / "create-rabbit-hyper3d.py")
+    rabbit_connection = sys.modules["mcp_connection"]
+    port = addon_server.socket.getsockname()[1]
+
+    # The shared helper, pointed at the test server instead of Blender's default port
+    monkeypatch.setattr(rabbit, "connect", lambda timeout=None: rabbit_connection.connect(
+        "127.0.0.1", port, socket_path=None, timeout=timeout))
+    results = []
+    thread = threading.Thread(target=lambda: results.append(rabbit.generate_and_import("a rabbit", "Bunny", 10)))
+    thread.start()
+    sys.modules["bpy"].app.timers.run_until(lambda: not thread.is_alive(), timeout=15)
+    thread.join(1)
+
+    assert results and results[0]["status"] == "completed"
+    assert results[0]["result"]["name"] == "Bunny"
+    assert rodin.hits("POST", "/rodin-api/download") == [{"task_uuid": "task-1"}]
+
+
+def test_poller_retries_server_errors_with_backoff(addon, stand_in, monkeypatch):
+    monkeypatch.setattr(addon, "FAL_AI_RODIN_URL", stand_in.url + "/fal")
+    monkeypatch.setattr(addon, "RODIN_POLL_MIN_INTERVAL", 0.01)
+    replies = iter([(503, {"detail": "busy"}), (503, {"detail": "busy"}), (200, {"status": "IN_PROGRESS"})])
+    stand_in.route("GET", "/fal/requests/req-1/status",
+                   lambda request: next(replies, (200, {"status": "COMPLETED"})))
+    stand_in.route("GET", "/fal/requests/req-2/status", (401, {"detail": "bad key"}))
+
+    finished, events = [], []
+    subscriber = types.SimpleNamespace(open=True, send=events.append)
+    poller = addon.RodinJobPoller(on_finished=finished.append)
+    try:
+        retried = poller.watch("FAL_AI", "key", "req-1", subscriber=subscriber)
+        rejected = poller.watch("FAL_AI", "key", "req-2")
+        assert wait_until(lambda: retried.finished and rejected.finished)
+    finally:
+        poller.stop()
+
+    assert retried.status == "completed"
+    assert retried.errors == 0 and retried.error is None
+    assert len(stand_in.hits("GET", "/fal/requests/req-1/status")) == 4
+    # A client error will not go away by retrying
+    assert rejected.status == "failed"
+    assert "401" in rejected.error
+    assert len(stand_in.hits("GET", "/fal/requests/req-2/status")) == 1
+    assert sorted(watch.id for watch in finished) == ["req-1", "req-2"]
+    assert [event["event"] for event in events] == ["rodin_job_status", "rodin_job_completed"]
+
+
+def test_unwatched_poll_runs_off_the_main_thread(addon_server, rodin):
+    release = threading.Event()
+    released = []
+
+    def slow_status(request):
+        released.append(release.wait(5))
+        return 200, {"jobs": [{"status": "Generating"}, {"status": "Done"}]}
+
+    rodin.route("POST", "/rodin-api/status", slow_status)
+    client = addon_server.client()
+    try:
+        client.send({"type": "poll_rodin_job_status", "params": {"subscription_key": "sub-9"}, "id": "poll"})
+        bpy = sys.modules["bpy"]
+        assert bpy.app.timers.run_until(lambda: rodin.hits("POST", "/rodin-api/status"))
+        # Blender keeps serving commands while the status request is in flight
+        other = client.call("execute_code", {"code": "print('still responsive')"})
+        assert other["result"]["result"] == "still responsive\n"
+        release.set()
+        polled = client.wait_for(lambda message: message.get("id") == "poll")
+    finally:
+        release.set()
+        client.close()
+
+    # The request was still waiting when execute_code ran
+    assert released == [True]
+    assert polled["status"] == "success"
+    assert polled["result"] == {"status_list": ["Generating", "Done"]}
+
+
+def test_unwatched_poll_passes_error_body_through(addon_server, rodin, monkeypatch):
+    monkeypatch.setattr(sys.modules["bpy"].context.scene, "blendermcp_hyper3d_mode", "FAL_AI", raising=False)
+    rodin.route("GET", "/fal/requests/gone/status", (404, {"detail": "Request not found"}))
+    rodin.route("GET", "/fal/requests/invalid/status", (400, {"error": "Invalid request id"}))
+    rodin.route("GET", "/fal/requests/broken/status", (502, b"<html>Bad gateway</html>"))
+    client = addon_server.client()
+    try:
+        missing = client.call("poll_rodin_job_status", {"request_id": "gone"})
+        invalid = client.call("poll_rodin_job_status", {"request_id": "invalid"})
+        broken = client.call("poll_rodin_job_status", {"request_id": "broken"})
+    finally:
+        client.close()
+
+    assert missing["status"] == "success"
+    assert missing["result"] == {"detail": "Request not found"}
+    # An "error" key in the body does not turn it into a failed job
+    assert invalid["status"] == "success"
+    assert invalid["result"] == {"error": "Invalid request id"}
+    assert {job.description["request_id"]: job.status for job in addon_server.jobs.values()} == {
+        "gone": "completed", "invalid": "completed", "broken": "failed",
+    }
+    assert broken["status"] == "success"
+    assert broken["result"] == {"error": "Status request failed with status code 502"}
+
+
+def test_poller_reports_failed_fal_requests_at_once(addon, stand_in, monkeypatch):
+    monkeypatch.setattr(addon, "FAL_AI_RODIN_URL", stand_in.url + "/fal")
+    monkeypatch.setattr(addon, "RODIN_POLL_MIN_INTERVAL", 0.01)
+    for state in addon.FAL_AI_FAILED_STATES:
+        stand_in.route("GET", f"/fal/requests/{state}/status", (200, {"status": state}))
+
+    finished, events = [], []
+    subscriber = types.SimpleNamespace(open=True, send=events.append)
+    poller = addon.RodinJobPoller(on_finished=finished.append)
+    try:
+        watches = [poller.watch("FAL_AI", "key", state, subscriber=subscriber)
+                   for state in addon.FAL_AI_FAILED_STATES]
+        assert wait_until(lambda: all(watch.finished for watch in watches))
+    finally:
+        poller.stop()
+
+    for watch in watches:
+        assert watch.status == "failed"
+        assert watch.detail == {"status": watch.id}
+        assert len(stand_in.hits("GET", f"/fal/requests/{watch.id}/status")) == 1
+    assert len(finished) == 3
+    assert [event["event"] for event in events] == ["rodin_job_completed"] * 3
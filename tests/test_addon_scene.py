@@ -0,0 +1,515 @@
+"""
+Tests for the scene queries in assets/blender-mcp-addon.py: get_scene_changes,
+query_objects, get_mesh_buffers and get_viewport_screenshot
+"""
+
+import base64
+import contextlib
+import json
+import os
+import socket
+import struct
+import sys
+import types
+
+import numpy as np
+import pytest
+
+
+class SceneObject:
+    """What the scene queries read from a bpy.types.Object"""
+
+    def __init__(self, name, location=(0.0, 0.0, 0.0), type="MESH"):
+        self.name = name
+        self.type = type
+        self.parent = None
+        self.location = list(location)
+        self.rotation_euler = [0.0, 0.0, 0.0]
+        self.scale = [1.0, 1.0, 1.0]
+
+
+@pytest.fixture
+def scene(addon, monkeypatch):
+    """A scene of its own, with SceneObject registered as bpy.types.Object"""
+    bpy = sys.modules["bpy"]
+    monkeypatch.setattr(bpy.types, "Object", SceneObject)
+    scene = type(bpy.context.scene)()
+    scene.objects = bpy.Collection()
+    monkeypatch.setattr(bpy.context, "scene", scene)
+    return scene
+
+
+def depsgraph_update(scene, *updates):
+    """Run the depsgraph_update_post handlers; updates are (datablock, transformed) pairs"""
+    bpy = sys.modules["bpy"]
+    depsgraph = types.SimpleNamespace(updates=[
+        types.SimpleNamespace(id=id_data, is_updated_transform=transformed, is_updated_geometry=False)
+        for id_data, transformed in updates
+    ])
+    for handler in list(bpy.app.handlers.depsgraph_update_post):
+        handler(scene, depsgraph)
+
+
+def names(changes):
+    return [obj["name"] for obj in changes["objects"]]
+
+
+def test_scene_changes_follow_depsgraph_updates(addon_server, scene):
+    bpy = sys.modules["bpy"]
+    tracker = addon_server.scene_tracker
+    tracker.reset(scene)
+    scene_update = (bpy.types.Scene(), False)
+
+    cube = scene.objects.add(SceneObject("Cube"))
+    scene.objects.add(SceneObject("Lamp", type="LIGHT"))
+    depsgraph_update(scene, scene_update)
+    added = tracker.revision
+
+    client = addon_server.client()
+    try:
+        full = client.call("get_scene_changes", {"since_revision": 0})["result"]
+    finally:
+        client.close()
+    assert full["full"] and full["revision"] == added
+    assert names(full) == ["Cube", "Lamp"]
+    assert full["objects"][0] == {
+        "name": "Cube", "type": "MESH", "parent": None, "location": [0.0, 0.0, 0.0],
+        "rotation": [0.0, 0.0, 0.0], "scale": [1.0, 1.0, 1.0], "revision": added,
+    }
+
+    # An update that touches no object leaves the revision alone
+    depsgraph_update(scene, (types.SimpleNamespace(name="Material"), False))
+    assert tracker.revision == added
+
+    cube.location = [1.0, 2.0, 3.0]
+    depsgraph_update(scene, (cube, True))
+    moved = addon_server.get_scene_changes(since_revision=added)
+    assert not moved["full"] and moved["revision"] == added + 1
+    assert names(moved) == ["Cube"] and moved["objects"][0]["location"] == [1.0, 2.0, 3.0]
+    assert moved["removed"] == []
+
+    scene.objects.remove(scene.objects["Lamp"])
+    depsgraph_update(scene, scene_update)
+    removed = addon_server.get_scene_changes(since_revision=moved["revision"])
+    assert names(removed) == [] and removed["removed"] == ["Lamp"]
+    # Nothing new since the latest revision
+    latest = addon_server.get_scene_changes(since_revision=removed["revision"])
+    assert (names(latest), latest["removed"], latest["full"]) == ([], [], False)
+
+
+def test_scene_changes_page_by_name(addon_server, scene):
+    tracker = addon_server.scene_tracker
+    for name in ("d", "b", "a", "c"):
+        scene.objects.add(SceneObject(name))
+    tracker.reset(scene)
+
+    pages, cursor = [], None
+    while True:
+        page = addon_server.get_scene_changes(cursor=cursor, limit=3)
+        pages.append(names(page))
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert pages == [["a", "b", "c"], ["d"]]
+    assert page["total_count"] == 4
+
+
+def test_scene_changes_fall_back_to_full_listing_when_history_is_truncated(addon_server, scene):
+    bpy = sys.modules["bpy"]
+    tracker = addon_server.scene_tracker
+    tracker.reset(scene)
+    tracker.max_tombstones = 1
+    scene_update = (bpy.types.Scene(), False)
+    scene.objects.add(SceneObject("Keep"))
+    depsgraph_update(scene, scene_update)
+    before = tracker.revision
+
+    for name in ("Gone1", "Gone2"):
+        scene.objects.add(SceneObject(name))
+        depsgraph_update(scene, scene_update)
+        scene.objects.remove(scene.objects[name])
+        depsgraph_update(scene, scene_update)
+
+    # Gone1's tombstone was dropped, so a delta from before it cannot be trusted
+    assert list(tracker.removed) == ["Gone2"]
+    assert tracker.floor > before
+    stale = addon_server.get_scene_changes(since_revision=before)
+    assert stale["full"] and names(stale) == ["Keep"] and stale["removed"] == []
+    recent = addon_server.get_scene_changes(since_revision=tracker.floor)
+    assert not recent["full"] and recent["removed"] == ["Gone2"]
+    # A revision the tracker never handed out also gets a full listing
+    assert addon_server.get_scene_changes(since_revision=tracker.revision + 5)["full"]
+
+
+class Elements:
+    """A mesh element sequence; foreach_get flattens one attribute per element"""
+
+    def __init__(self, **columns):
+        self.columns = columns
+
+    def __len__(self):
+        return len(next(iter(self.columns.values()), ()))
+
+    def foreach_get(self, attribute, out):
+        out[:] = np.asarray(self.columns[attribute]).ravel()
+
+
+class Mesh:
+    def __init__(self, positions, polygons, uvs=None):
+        corners = [index for polygon in polygons for index in polygon]
+        starts = np.cumsum([0] + [len(polygon) for polygon in polygons[:-1]])
+        self.polygon_corners = polygons
+        self.vertices = Elements(co=positions, normal=[(0.0, 0.0, 1.0)] * len(positions))
+        self.loops = Elements(vertex_index=corners)
+        self.polygons = Elements(loop_start=starts, loop_total=[len(polygon) for polygon in polygons])
+        layer = types.SimpleNamespace(data=Elements(uv=uvs)) if uvs is not None else None
+        self.uv_layers = types.SimpleNamespace(active=layer)
+        self.loop_triangles = Elements()
+
+    def calc_loop_triangles(self):
+        # Fan triangulation, which is what Blender does for convex polygons
+        triangles = [(polygon[0], polygon[i], polygon[i + 1])
+                     for polygon in self.polygon_corners for i in range(1, len(polygon) - 1)]
+        self.loop_triangles = Elements(vertices=triangles)
+
+
+class MeshObject(SceneObject):
+    def __init__(self, name, mesh, translation=(0.0, 0.0, 0.0)):
+        super().__init__(name, location=translation)
+        self.data = mesh
+        self.matrix_world = np.identity(4)
+        self.matrix_world[:3, 3] = translation
+
+
+@pytest.fixture
+def meshes(addon, monkeypatch):
+    """A quad plane with UVs and a triangle without, in bpy.data.objects"""
+    bpy = sys.modules["bpy"]
+    objects = bpy.Collection()
+    monkeypatch.setattr(bpy.data, "objects", objects)
+    plane = objects.add(MeshObject("Plane", Mesh(
+        [(-1.0, -1.0, 0.0), (1.0, -1.0, 0.0), (1.0, 1.0, 0.0), (-1.0, 1.0, 0.0)],
+        [(0, 1, 2, 3)],
+        uvs=[(0.0, 0.0), (1.0, 0.0), (1.0, 1.0), (0.0, 1.0)],
+    ), translation=(0.0, 0.0, 2.0)))
+    triangle = objects.add(MeshObject("Triangle", Mesh(
+        [(0.0, 0.0, 0.0), (1.0, 0.0, 0.0), (0.0, 1.0, 0.0)], [(0, 1, 2)],
+    )))
+    objects.add(SceneObject("Lamp", type="LIGHT"))
+    return plane, triangle
+
+
+def request_binary(bpy, port, command, framing):
+    """Send command on a fresh connection with the given framing; returns (reply, payload)"""
+    sock = socket.create_connection(("127.0.0.1", port))
+    sock.setblocking(False)
+    buffer = bytearray()
+
+    def read(parse, framing):
+        """Pump timers and read until parse(buffer, framing) returns something"""
+        found = []
+
+        def ready():
+            try:
+                buffer.extend(sock.recv(65536))
+            except BlockingIOError:
+                pass
+            message = parse(buffer, framing)
+            if message is not None:
+                found.append(message)
+            return bool(found)
+
+        assert bpy.app.timers.run_until(ready, 10.0), bytes(buffer)
+        return found[0]
+
+    try:
+        if framing != "legacy":
+            # The hello reply itself still comes in the legacy framing
+            sock.sendall(json.dumps({"type": "hello", "params": {"framing": framing}, "id": "hello"}).encode())
+            assert read(read_message, "legacy")["result"]["framing"] == framing
+        data = json.dumps(command).encode()
+        sock.sendall(struct.pack(">I", len(data)) + data if framing == "length" else data + b"\n")
+        reply = read(read_message, framing)
+        return reply, bytes(read(lambda buffer, _: bytes(buffer) if len(buffer) >= reply["binary_length"] else None,
+                                 framing))
+    finally:
+        sock.close()
+
+
+def read_message(buffer, framing):
+    """Take one message off the front of buffer, or return None if it is incomplete"""
+    if framing == "length":
+        if len(buffer) < 4 or len(buffer) < 4 + struct.unpack(">I", buffer[:4])[0]:
+            return None
+        end = 4 + struct.unpack(">I", buffer[:4])[0]
+        message = json.loads(buffer[4:end])
+    else:
+        # Only the bytes up to the end of the message have to be text
+        try:
+            message, end = json.JSONDecoder().raw_decode(buffer.decode("utf-8", "replace"))
+        except ValueError:
+            return None
+        if framing == "ndjson":
+            assert buffer[end:end + 1] == b"\n"
+            end += 1
+    del buffer[:end]
+    return message
+
+
+def view(payload, description):
+    array = np.frombuffer(payload, dtype=np.dtype(description["dtype"]).newbyteorder("<"),
+                          count=int(np.prod(description["shape"])), offset=description["offset"])
+    assert array.nbytes == description["byte_length"]
+    return array.reshape(description["shape"])
+
+
+@pytest.mark.parametrize("framing", ["legacy", "ndjson", "length"])
+def test_mesh_buffers_follow_the_reply_as_one_payload(addon, addon_server, meshes, framing):
+    bpy = sys.modules["bpy"]
+    plane, triangle = meshes
+    reply, payload = request_binary(bpy, addon_server.socket.getsockname()[1], {
+        "type": "get_mesh_buffers", "id": 7,
+        "params": {"names": ["Plane", "Triangle"], "attributes": list(addon.MESH_BUFFER_ATTRIBUTES) + ["triangles"]},
+    }, framing)
+
+    assert reply["status"] == "success" and reply["id"] == 7
+    # The payload is raw bytes straight after the message frame and nothing else
+    assert reply["binary_length"] == len(payload)
+    result = reply["result"]
+    assert result["byte_order"] == "little"
+    first, second = result["objects"]
+    assert (first["name"], first["vertex_count"], first["loop_count"], first["polygon_count"]) == ("Plane", 4, 4, 1)
+    assert (second["name"], second["vertex_count"], second["loop_count"]) == ("Triangle", 3, 3)
+    # A mesh without a UV layer has no uvs buffer
+    assert "uvs" in first["buffers"] and "uvs" not in second["buffers"]
+
+    buffers = [first["buffers"][name] for name in first["buffers"]] + [
+        second["buffers"][name] for name in second["buffers"]]
+    offsets = [description["offset"] for description in buffers]
+    assert offsets == sorted(offsets) and all(offset % addon.BINARY_ALIGNMENT == 0 for offset in offsets)
+    assert buffers[-1]["offset"] + buffers[-1]["byte_length"] == len(payload)
+    assert {name: (description["dtype"], description["shape"]) for name, description in first["buffers"].items()} == {
+        "positions": ("float32", [4, 3]),
+        "normals": ("float32", [4, 3]),
+        "loops": ("int32", [4]),
+        "polygons": ("int32", [1, 2]),
+        "uvs": ("float32", [4, 2]),
+        "triangles": ("int32", [2, 3]),
+    }
+
+    assert np.array_equal(view(payload, first["buffers"]["positions"]), plane.data.vertices.columns["co"])
+    assert np.array_equal(view(payload, first["buffers"]["polygons"]), [[0, 4]])
+    assert np.array_equal(view(payload, first["buffers"]["uvs"]), plane.data.uv_layers.active.data.columns["uv"])
+    assert np.array_equal(view(payload, first["buffers"]["triangles"]), [[0, 1, 2], [0, 2, 3]])
+    assert np.array_equal(view(payload, second["buffers"]["loops"]), [0, 1, 2])
+
+
+def test_mesh_buffers_in_world_space_and_errors(addon_server, meshes):
+    plane, _ = meshes
+    world = addon_server.get_mesh_buffers("Plane", attributes=["positions", "normals"], world_space=True)
+    positions = view(world.payload, world.result["objects"][0]["buffers"]["positions"])
+    assert np.allclose(positions, np.asarray(plane.data.vertices.columns["co"]) + [0.0, 0.0, 2.0])
+    normals = view(world.payload, world.result["objects"][0]["buffers"]["normals"])
+    assert np.allclose(normals, [[0.0, 0.0, 1.0]] * 4)
+
+    for names, attributes, message in (
+        (["Missing"], None, "Object not found: Missing"),
+        (["Lamp"], None, "Object is not a mesh: Lamp"),
+        (["Plane"], ["positions", "colors"], "Unknown mesh attributes: colors"),
+    ):
+        with pytest.raises(ValueError, match=message):
+            addon_server.get_mesh_buffers(names, attributes=attributes)
+
+
+class ObjectData:
+    """bpy.data.objects with the bulk foreach_get that query_objects reads through"""
+
+    def __init__(self, objects):
+        self.objects = list(objects)
+
+    def __iter__(self):
+        return iter(self.objects)
+
+    def __len__(self):
+        return len(self.objects)
+
+    def foreach_get(self, attribute, out):
+        values = []
+        for obj in self.objects:
+            value = np.asarray(getattr(obj, attribute), dtype=np.float32)
+            # Blender matrices are stored column by column
+            values.append(value.ravel(order="F" if attribute == "matrix_world" else "C"))
+        out[:] = np.concatenate(values)
+
+
+def unit_box():
+    return [(x, y, z) for x in (-1.0, 1.0) for y in (-1.0, 1.0) for z in (-1.0, 1.0)]
+
+
+@pytest.fixture
+def populated_scene(scene, monkeypatch):
+    """Two linked duplicates of one mesh, a light, and an object not in the scene"""
+    bpy = sys.modules["bpy"]
+    shared = Mesh([(0.0, 0.0, 0.0)] * 8, [(0, 1, 2, 3)] * 6)
+    shared.as_pointer = lambda: 1234
+    props = types.SimpleNamespace(name="Props")
+    wood = types.SimpleNamespace(name="Wood")
+
+    objects = []
+    for name, translation in (("Crate.001", (4.0, 0.0, 0.0)), ("Crate", (0.0, 2.0, 0.0))):
+        crate = MeshObject(name, shared, translation)
+        crate.users_collection = [props]
+        crate.material_slots = [types.SimpleNamespace(material=wood), types.SimpleNamespace(material=None)]
+        objects.append(crate)
+    lamp = SceneObject("Lamp", location=(0.0, 0.0, 5.0), type="LIGHT")
+    hidden = MeshObject("Backstage", shared)
+    for obj in (lamp, hidden):
+        obj.matrix_world = np.identity(4)
+        obj.matrix_world[:3, 3] = obj.location
+        obj.users_collection = []
+        obj.material_slots = []
+        objects.append(obj)
+    for obj in objects:
+        obj.bound_box = unit_box()
+        if obj is not hidden:
+            scene.objects.add(obj)
+
+    monkeypatch.setattr(bpy.data, "objects", ObjectData(objects))
+    collections = bpy.Collection()
+    props.all_objects = types.SimpleNamespace(keys=lambda: ["Crate", "Crate.001"])
+    collections.add(props)
+    monkeypatch.setattr(bpy.data, "collections", collections)
+    return scene
+
+
+def test_query_objects_returns_columns(addon, addon_server, populated_scene):
+    client = addon_server.client()
+    try:
+        result = client.call("query_objects", {"fields": list(addon.QUERY_OBJECT_FIELDS)})["result"]
+    finally:
+        client.close()
+
+    columns = result["columns"]
+    assert result["count"] == result["total_count"] == 3 and result["next_cursor"] is None
+    assert result["fields"] == ["name", "type"] + list(addon.QUERY_OBJECT_FIELDS)
+    assert columns["name"] == ["Crate", "Crate.001", "Lamp"]
+    assert columns["type"] == ["MESH", "MESH", "LIGHT"]
+    assert columns["location"] == [[0.0, 2.0, 0.0], [4.0, 0.0, 0.0], [0.0, 0.0, 5.0]]
+    assert columns["scale"] == [[1.0, 1.0, 1.0]] * 3
+    assert columns["matrix_world"][1] == [[1.0, 0.0, 0.0, 4.0], [0.0, 1.0, 0.0, 0.0],
+                                          [0.0, 0.0, 1.0, 0.0], [0.0, 0.0, 0.0, 1.0]]
+    # Bounds are the local box moved into world space; lights have none
+    assert columns["world_aabb"] == [[[-1.0, 1.0, -1.0], [1.0, 3.0, 1.0]], [[3.0, -1.0, -1.0], [5.0, 1.0, 1.0]], None]
+    assert columns["parent"] == [None, None, None]
+    assert columns["collections"] == [["Props"], ["Props"], []]
+    assert columns["vertex_count"] == [8, 8, None] and columns["polygon_count"] == [6, 6, None]
+    assert columns["materials"] == [["Wood"], ["Wood"], []]
+
+
+def test_query_objects_filters_and_pages(addon_server, populated_scene):
+    def names(**params):
+        return addon_server.query_objects(fields=["location"], **params)["columns"]["name"]
+
+    assert names(types="LIGHT") == ["Lamp"]
+    assert names(types=["MESH", "LIGHT"], name_prefix="Crate.") == ["Crate.001"]
+    assert names(collection="Props") == ["Crate", "Crate.001"]
+    with pytest.raises(ValueError, match="Collection not found: Attic"):
+        names(collection="Attic")
+    with pytest.raises(ValueError, match="Unknown fields: colour"):
+        addon_server.query_objects(fields=["colour"])
+
+    pages, cursor = [], None
+    while True:
+        page = addon_server.query_objects(fields=["location"], cursor=cursor, limit=2)
+        pages.append(list(zip(page["columns"]["name"], page["columns"]["location"])))
+        assert page["total_count"] == 3
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert pages == [[("Crate", [0.0, 2.0, 0.0]), ("Crate.001", [4.0, 0.0, 0.0])], [("Lamp", [0.0, 0.0, 5.0])]]
+
+
+def test_query_objects_binary_columns(addon_server, populated_scene):
+    reply = addon_server.query_objects(fields=["location", "world_aabb", "materials"], binary=True, limit=2)
+    result = reply.result
+    assert result["columns"] == {
+        "name": ["Crate", "Crate.001"], "type": ["MESH", "MESH"], "materials": [["Wood"], ["Wood"]],
+    }
+    assert result["buffers"]["location"]["shape"] == [2, 3] and result["buffers"]["world_aabb"]["shape"] == [2, 2, 3]
+    assert np.array_equal(view(reply.payload, result["buffers"]["location"]), [[0.0, 2.0, 0.0], [4.0, 0.0, 0.0]])
+    assert result["next_cursor"] == "Crate.001"
+
+
+class ColorBuffer(bytearray):
+    """What read_color returns: a buffer whose dimensions can be reassigned"""
+    dimensions = None
+
+
+def fake_gpu(width, height, fail=None):
+    """A gpu module whose offscreen render yields a solid colour, or raises fail"""
+    def draw_view3d(*args, **kwargs):
+        if fail:
+            raise fail
+
+    offscreen = types.SimpleNamespace(draw_view3d=draw_view3d, bind=contextlib.nullcontext, free=lambda: None)
+    framebuffer = types.SimpleNamespace(read_color=lambda *args: ColorBuffer(bytes([10, 20, 30, 255]) * width * height))
+    return types.SimpleNamespace(
+        types=types.SimpleNamespace(GPUOffScreen=lambda w, h: offscreen),
+        state=types.SimpleNamespace(active_framebuffer_get=lambda: framebuffer),
+    )
+
+
+@pytest.fixture
+def view3d(addon, scene, monkeypatch):
+    """A window with one 64x48 3D viewport"""
+    bpy = sys.modules["bpy"]
+    region = types.SimpleNamespace(type="WINDOW", width=64, height=48)
+    space = types.SimpleNamespace(
+        region_3d=types.SimpleNamespace(view_matrix=np.identity(4), window_matrix=np.identity(4)),
+        shading=types.SimpleNamespace(type="SOLID"),
+    )
+    area = types.SimpleNamespace(type="VIEW_3D", regions=[region], spaces=types.SimpleNamespace(active=space))
+    window = types.SimpleNamespace(screen=types.SimpleNamespace(areas=[area]))
+    monkeypatch.setattr(bpy.context, "window_manager", types.SimpleNamespace(windows=[window]), raising=False)
+    monkeypatch.setattr(bpy.context, "temp_override", lambda **kwargs: contextlib.nullcontext(), raising=False)
+    return area
+
+
+def png_size(png):
+    assert png[:8] == b"\x89PNG\r\n\x1a\n"
+    return struct.unpack(">II", png[16:24])
+
+
+def test_viewport_screenshot_renders_offscreen_and_caches(addon_server, view3d, monkeypatch):
+    monkeypatch.setitem(sys.modules, "gpu", fake_gpu(32, 24))
+    first = addon_server.get_viewport_screenshot(max_size=32)
+    assert (first["method"], first["cached"], first["width"], first["height"]) == ("offscreen", False, 32, 24)
+    assert png_size(base64.b64decode(first["image_base64"])) == (32, 24)
+
+    again = addon_server.get_viewport_screenshot(max_size=32, binary=True)
+    assert again.result["cached"] and png_size(again.payload) == (32, 24)
+
+
+def test_viewport_screenshot_falls_back_to_screenshot_area(addon, addon_server, view3d, monkeypatch):
+    bpy = sys.modules["bpy"]
+    monkeypatch.setitem(sys.modules, "gpu", fake_gpu(64, 48, fail=SystemError("no GPU context")))
+    screenshot = addon.encode_png(np.full((40, 60, 4), 200, dtype=np.uint8))
+    written = []
+
+    def screenshot_area(filepath):
+        with open(filepath, "wb") as f:
+            f.write(screenshot)
+        written.append(filepath)
+
+    monkeypatch.setitem(bpy.ops_handlers, "screen.screenshot_area", screenshot_area)
+    for _ in range(2):
+        result = addon_server.get_viewport_screenshot()
+        assert (result["method"], result["cached"], result["width"], result["height"]) == (
+            "screenshot_area", False, 60, 40)
+        assert base64.b64decode(result["image_base64"]) == screenshot
+    # The temporary file is gone and nothing went into the capture cache
+    assert len(written) == 2 and not any(os.path.exists(path) for path in written)
+    assert not addon_server.viewport_cache
+
+    monkeypatch.setitem(bpy.ops_handlers, "screen.screenshot_area", lambda filepath: None)
+    assert addon_server.get_viewport_screenshot() == {"error": "screenshot_area did not write a PNG"}
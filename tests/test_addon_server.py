@@ -0,0 +1,424 @@
+"""
+Tests for command handling in the addon's socket server (assets/blender-mcp-addon.py)
+"""
+
+import json
+import os
+import socket
+import struct
+import sys
+import time
+import zlib
+
+import pytest
+
+from conftest import AddonClient
+
+
+def wait_until(predicate, timeout=10.0):
+    """Wait without pumping timers, so nothing queued gets executed"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.005)
+    return predicate()
+
+
+@pytest.fixture
+def small_queue_server(addon, tmp_path):
+    """A started server whose queue holds 4 commands, 3 of them from one client"""
+    server = addon.BlenderMCPServer(host="127.0.0.1", port=0, queue_size=4, cache_dir=str(tmp_path / "cache"))
+    server.start()
+    yield server
+    server.stop()
+
+
+def test_full_queue_replies_busy(small_queue_server):
+    server = small_queue_server
+    port = server.socket.getsockname()[1]
+    bpy = sys.modules["bpy"]
+    flood, quiet = AddonClient(bpy, port), AddonClient(bpy, port)
+    try:
+        flood.send(*({"type": "execute_code", "params": {"code": f"print({index})"}, "id": index}
+                     for index in range(5)))
+        assert wait_until(lambda: len(flood.messages) == 2)
+        quiet.send(*({"type": "execute_code", "params": {"code": "print('quiet')"}, "id": f"quiet-{index}"}
+                     for index in range(2)))
+        # Busy replies and status queries are answered without the main thread
+        quiet.send({"type": "get_server_status", "id": "status"})
+        assert wait_until(lambda: len(quiet.messages) == 2)
+        flood_busy, (quiet_busy, status) = list(flood.messages), quiet.messages
+        status = status["result"]["queue"]
+
+        results = [flood.wait_for(lambda message, index=index: message.get("id") == index) for index in range(3)]
+        quiet_result = quiet.wait_for(lambda message: message.get("id") == "quiet-0")
+    finally:
+        flood.close()
+        quiet.close()
+
+    assert flood_busy == [
+        {"status": "busy", "message": "This client already has 3 commands pending, retry later", "id": index}
+        for index in (3, 4)
+    ]
+    assert quiet_busy == {
+        "status": "busy", "message": "Command queue is full (4 pending), retry later", "id": "quiet-1",
+    }
+    assert (status["depth"], status["max_size"], status["client_limit"]) == (4, 4, 3)
+    assert status["rejected_busy"] == 3
+    assert [result["result"]["result"] for result in results] == ["0\n", "1\n", "2\n"]
+    assert quiet_result["result"]["result"] == "quiet\n"
+
+
+def test_drain_tick_stops_at_budget_but_runs_one_command(addon, small_queue_server):
+    server = small_queue_server
+    client = AddonClient(sys.modules["bpy"], server.socket.getsockname()[1])
+    try:
+        client.send(*({"type": "execute_code", "params": {"code": "import time; time.sleep(0.05)"}, "id": index}
+                      for index in range(3)))
+        assert wait_until(lambda: len(server.command_queue) == 3)
+
+        # Each command takes 50 ms: an 80 ms budget fits two, a 1 ms budget still runs one
+        server.tick_budget_ms = 80
+        assert server._drain_command_queue() == 0.0
+        assert len(server.command_queue) == 1
+        server.tick_budget_ms = 1
+        assert server._drain_command_queue() == addon.QUEUE_IDLE_INTERVAL
+        assert len(server.command_queue) == 0
+        assert server._drain_command_queue() == addon.QUEUE_IDLE_INTERVAL
+    finally:
+        client.close()
+
+    stats = server.get_server_status()
+    assert stats["queue"]["executed"] == 3
+    assert stats["tick"]["ticks"] == 2
+    assert stats["tick"]["max_tick_ms"] >= 100
+
+
+def test_execute_code_rejects_non_positive_max_output(addon_server):
+    client = addon_server.client()
+    try:
+        for max_output in (0, -5, "10"):
+            reply = client.call("execute_code", {"code": "print('hi')", "max_output": max_output})
+            assert reply == {"status": "error", "message": "max_output must be a positive integer", "id": reply["id"]}
+        reply = client.call("execute_code", {"code": "print('hi')", "max_output": 1})
+    finally:
+        client.close()
+    assert reply["status"] == "success"
+
+
+def read_until(bpy, sock, buffer, complete, timeout=10.0):
+    """Pump timers and read sock into buffer until complete(buffer) holds"""
+    sock.setblocking(False)
+
+    def ready():
+        try:
+            data = sock.recv(65536)
+        except BlockingIOError:
+            data = b""
+        buffer.extend(data)
+        return complete(buffer)
+
+    assert bpy.app.timers.run_until(ready, timeout), bytes(buffer)
+
+
+def test_reply_uses_framing_in_effect_when_command_was_decoded(addon, addon_server, stand_in, monkeypatch):
+    monkeypatch.setattr(addon, "POLYHAVEN_API_URL", stand_in.url)
+    bpy = sys.modules["bpy"]
+    sock = socket.create_connection(("127.0.0.1", addon_server.socket.getsockname()[1]))
+    decoder = json.JSONDecoder()
+    try:
+        # Two legacy commands (one answered by a job) with a hello pipelined behind them
+        after_hello = json.dumps({"type": "execute_code", "params": {"code": "print(1)"}, "id": 4}).encode()
+        sock.sendall(
+            json.dumps({"type": "execute_code", "params": {"code": "print(0)"}, "id": 1}).encode()
+            + json.dumps({"type": "download_polyhaven_asset", "id": 2, "params": {
+                "asset_id": "nope", "asset_type": "hdris", "wait": True}}).encode()
+            + json.dumps({"type": "hello", "params": {"framing": "length"}, "id": 3}).encode()
+            + struct.pack(">I", len(after_hello)) + after_hello
+        )
+
+        replies, buffer = {}, bytearray()
+
+        def complete(buffer):
+            # Legacy replies are bare JSON; after the switch every frame has a length prefix
+            while buffer:
+                if buffer[:1] == b"{":
+                    try:
+                        message, end = decoder.raw_decode(buffer.decode())
+                    except ValueError:
+                        return False
+                    framing = "legacy"
+                else:
+                    if len(buffer) < 4 or len(buffer) < 4 + struct.unpack(">I", buffer[:4])[0]:
+                        return False
+                    end = 4 + struct.unpack(">I", buffer[:4])[0]
+                    message, framing = json.loads(buffer[4:end]), "length"
+                del buffer[:end]
+                replies[message["id"]] = (framing, message)
+            return len(replies) == 4
+
+        read_until(bpy, sock, buffer, complete)
+    finally:
+        sock.close()
+
+    assert {request_id: framing for request_id, (framing, _) in replies.items()} == {
+        1: "legacy", 2: "legacy", 3: "legacy", 4: "length",
+    }
+    assert replies[1][1]["result"]["result"] == "0\n"
+    assert replies[2][1] == {"status": "success", "result": {"error": "Failed to get asset files: 404"}, "id": 2}
+    assert replies[4][1]["result"]["result"] == "1\n"
+
+
+def test_hello_reply_waits_for_commands_sent_before_it(addon, addon_server, stand_in, monkeypatch):
+    monkeypatch.setattr(addon, "POLYHAVEN_API_URL", stand_in.url)
+
+    def slow_files(request):
+        time.sleep(0.5)
+        return 404, {"error": "not found"}
+
+    stand_in.route("GET", "/files/slow", slow_files)
+    bpy = sys.modules["bpy"]
+    sock = socket.create_connection(("127.0.0.1", addon_server.socket.getsockname()[1]))
+    decoder = json.JSONDecoder()
+    try:
+        after_hello = json.dumps({"type": "execute_code", "params": {"code": "print(3)"}, "id": 3}).encode()
+        sock.sendall(
+            json.dumps({"type": "download_polyhaven_asset", "id": 1, "params": {
+                "asset_id": "slow", "asset_type": "hdris", "wait": True}}).encode()
+            + json.dumps({"type": "hello", "params": {"framing": "length"}, "id": 2}).encode()
+            + struct.pack(">I", len(after_hello)) + after_hello
+        )
+
+        # Read the way a client does: bare JSON until the hello reply, length frames after it
+        order, buffer = [], bytearray()
+
+        def complete(buffer):
+            while buffer:
+                if 2 not in order:
+                    try:
+                        message, end = decoder.raw_decode(buffer.decode())
+                    except ValueError:
+                        return False
+                else:
+                    if len(buffer) < 4 or len(buffer) < 4 + struct.unpack(">I", buffer[:4])[0]:
+                        return False
+                    end = 4 + struct.unpack(">I", buffer[:4])[0]
+                    message = json.loads(buffer[4:end])
+                del buffer[:end]
+                order.append(message["id"])
+            return len(order) == 3
+
+        read_until(bpy, sock, buffer, complete)
+    finally:
+        sock.close()
+
+    assert order == [1, 2, 3]
+
+
+def test_batch_runs_entries_in_order_and_reports_failures(addon_server):
+    commands = [
+        {"type": "execute_code", "params": {"code": "print('first')"}, "id": "a"},
+        {"type": "no_such_command"},
+        {"type": "batch", "params": {"commands": []}},
+        "not an object",
+        {"type": "execute_code", "params": {"code": "print('last')"}, "id": "b"},
+    ]
+    client = addon_server.client()
+    try:
+        everything = client.call("batch", {"commands": commands, "stop_on_error": False})
+        stopped = client.call("batch", {"commands": commands})
+        invalid = client.call("batch", {"commands": {"type": "execute_code"}})
+    finally:
+        client.close()
+
+    assert everything["status"] == "success"
+    result = everything["result"]
+    assert [response["status"] for response in result["results"]] == [
+        "success", "error", "error", "error", "success",
+    ]
+    assert result["results"][0] == {"status": "success", "result": {"executed": True, "result": "first\n"}, "id": "a"}
+    assert result["results"][2]["message"] == "Nested batch commands are not supported"
+    assert result["results"][3]["message"] == "Batch entry 3 is not an object"
+    assert result["results"][4]["id"] == "b"
+    assert (result["total"], result["executed"], result["failed"], result["stopped_early"]) == (5, 5, 3, False)
+
+    result = stopped["result"]
+    assert [response.get("id") for response in result["results"]] == ["a", None]
+    assert (result["total"], result["executed"], result["failed"], result["stopped_early"]) == (5, 2, 1, True)
+    assert invalid["status"] == "error"
+
+
+def test_execute_code_caches_compiled_blocks(addon, addon_server, monkeypatch):
+    monkeypatch.setattr(addon, "CODE_CACHE_SIZE", 2)
+    for code in ("x = 1", "x = 1", "y = 2", "z = 3", "x = 1"):
+        assert addon_server.execute_code(code=code)["executed"]
+
+    cache = addon_server.list_code_sessions()["code_cache"]
+    # "x = 1" was pushed out by the two blocks after it, so its third run compiles again
+    assert (cache["hits"], cache["misses"], cache["entries"], cache["max_entries"]) == (1, 4, 2, 2)
+    with pytest.raises(Exception, match="invalid syntax"):
+        addon_server.execute_code(code="def (")
+
+
+def test_code_sessions_keep_state_between_calls(addon, addon_server, monkeypatch):
+    monkeypatch.setattr(addon, "MAX_CODE_SESSIONS", 2)
+    client = addon_server.client()
+    try:
+        created = client.call("create_code_session", {"name": "tools", "code": "def add(a, b=0):\n    return a + b\n"})
+        assert created["result"]["names"] == ["add"]
+        called = client.call("execute_code", {"session": "tools", "call": "add", "args": [2], "kwargs": {"b": 3}})
+        assert called["result"]["return_value"] == 5
+        unknown = client.call("execute_code", {"code": "print(1)", "session": "missing"})
+        assert unknown["status"] == "error" and "Code session not found: missing" in unknown["message"]
+    finally:
+        client.close()
+
+    addon_server.execute_code(code="total = add(1, 1)", session="tools")
+    assert addon_server.execute_code(code="print(total)", session="tools")["result"] == "2\n"
+    # One-off code never sees a session's names
+    with pytest.raises(Exception, match="name 'total' is not defined"):
+        addon_server.execute_code(code="print(total)")
+
+    assert addon_server.reset_code_session("tools")["names"] == []
+    with pytest.raises(Exception, match="name 'add' is not defined"):
+        addon_server.execute_code(code="add(1)", session="tools")
+
+    # At the limit a new session is refused rather than evicting one in use
+    addon_server.create_code_session("scratch")
+    with pytest.raises(ValueError, match="Too many code sessions"):
+        addon_server.create_code_session("third")
+    assert [session["name"] for session in addon_server.list_code_sessions()["sessions"]] == ["tools", "scratch"]
+    assert addon_server.drop_code_session("scratch") == {"dropped": True, "name": "scratch"}
+    addon_server.create_code_session("third")
+
+
+def test_code_session_over_its_memory_limit_is_dropped(addon_server):
+    addon_server.create_code_session("big", max_memory_mb=1)
+    # Small to look at one level down; the bytes are two containers deep
+    reply = addon_server.execute_code(code="cache = {'frames': [bytearray(2 * 1024 * 1024)]}", session="big")
+    assert "session_dropped" in reply
+    assert addon_server.list_code_sessions()["sessions"] == []
+
+    addon_server.create_code_session("shared", max_memory_mb=1)
+    # The same large object referenced many times is counted once
+    reply = addon_server.execute_code(code="block = bytearray(512 * 1024)\nviews = [block] * 1000", session="shared")
+    assert "session_dropped" not in reply
+    assert 512 * 1024 < addon_server.list_code_sessions()["sessions"][0]["size_bytes"] < 1024 * 1024
+
+
+def test_zlib_replies_decode_and_respect_the_threshold(addon_server):
+    bpy = sys.modules["bpy"]
+    sock = socket.create_connection(("127.0.0.1", addon_server.socket.getsockname()[1]))
+    decoder = json.JSONDecoder()
+    threshold = 1000
+    try:
+        sock.sendall(json.dumps({"type": "hello", "id": 0, "params": {
+            "framing": "length", "compression": ["brotli", "zlib"], "compression_threshold": threshold}}).encode())
+        buffer = bytearray()
+        hello = []
+
+        def hello_read(buffer):
+            try:
+                message, end = decoder.raw_decode(buffer.decode())
+            except ValueError:
+                return False
+            del buffer[:end]
+            hello.append(message)
+            return True
+
+        read_until(bpy, sock, buffer, hello_read)
+        assert hello[0]["result"]["compression"] == "zlib"
+        assert hello[0]["result"]["compression_threshold"] == threshold
+
+        # Output sized so the replies land well below, just below, just above and well above it
+        outputs = {1: "hi", 2: "a" * (threshold - 100), 3: "c" * threshold, 4: "b" * 20000}
+        for request_id, text in outputs.items():
+            command = json.dumps({"type": "execute_code", "id": request_id, "params": {"code": f"print({text!r})"}})
+            sock.sendall(struct.pack(">I", len(command)) + command.encode())
+
+        replies = {}
+
+        def complete(buffer):
+            while len(buffer) >= 4:
+                end = 4 + struct.unpack(">I", buffer[:4])[0]
+                if len(buffer) < end:
+                    return False
+                message = json.loads(buffer[4:end])
+                if "compressed" in message:
+                    if len(buffer) < end + message["compressed_length"]:
+                        return False
+                    payload = zlib.decompress(buffer[end:end + message["compressed_length"]])
+                    assert message["compressed"] == "zlib" and len(payload) == message["length"]
+                    end += message["compressed_length"]
+                    message = dict(json.loads(payload), compressed=True)
+                del buffer[:end]
+                replies[message["id"]] = message
+            return len(replies) == len(outputs)
+
+        read_until(bpy, sock, buffer, complete)
+        status = addon_server.get_metrics()["compression"]
+    finally:
+        sock.close()
+
+    for request_id, text in outputs.items():
+        assert replies[request_id]["result"]["result"] == text + "\n"
+    assert [bool(replies[request_id].get("compressed")) for request_id in outputs] == [False, False, True, True]
+    assert status["replies"] == 2 and status["bytes_in"] > 20000 > status["bytes_out"]
+
+
+def test_metrics_file_unknown_command_types_under_one_key(addon_server):
+    client = addon_server.client()
+    try:
+        for n in range(5):
+            assert client.call(f"made_up_{n}")["status"] == "error"
+        client.call(["not", "a", "string"])
+        client.call("execute_code", {"code": "print(1)"})
+    finally:
+        client.close()
+
+    commands = addon_server.get_metrics()["commands"]
+    assert sorted(commands) == ["execute_code", "unknown"]
+    assert (commands["unknown"]["count"], commands["unknown"]["errors"]) == (6, 6)
+    assert (commands["execute_code"]["count"], commands["execute_code"]["errors"]) == (1, 0)
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="needs Unix domain sockets")
+def test_unix_socket_is_created_owner_only(addon, tmp_path, monkeypatch):
+    # Record the umask in effect when the socket file is created
+    umasks = []
+    real_umask = addon.os.umask
+    real_bind = socket.socket.bind
+
+    def bind(sock, address):
+        umasks.append(real_umask(0o022))
+        real_umask(umasks[-1])
+        return real_bind(sock, address)
+
+    monkeypatch.setattr(socket.socket, "bind", bind)
+    path = str(tmp_path / "blendermcp.sock")
+    previous = real_umask(0o022)
+    server = addon.BlenderMCPServer(
+        host="127.0.0.1", port=0, unix_socket_path=path, cache_dir=str(tmp_path / "cache")
+    )
+    try:
+        server.start()
+        assert server.unix_socket is not None
+        assert os.stat(path).st_mode & 0o777 == 0o600
+        assert 0o177 in umasks
+        assert real_umask(0o022) == 0o022
+    finally:
+        server.stop()
+        real_umask(previous)
+
+
+def test_unix_socket_is_off_by_default(addon, monkeypatch):
+    defaults = {}
+
+    def bool_property(**kwargs):
+        defaults[kwargs["name"]] = kwargs.get("default")
+
+    monkeypatch.setattr(addon.bpy.props, "BoolProperty", bool_property)
+    addon.register()
+    addon.unregister()
+    assert defaults["Unix Socket"] is False
@@ -0,0 +1,105 @@
+"""
+Tests for Poly Haven texture import and set_texture in assets/blender-mcp-addon.py
+"""
+
+import sys
+import types
+
+import pytest
+
+
+class _MaterialSlots(list):
+    def pop(self, index=-1):
+        return super().pop(index)
+
+
+@pytest.fixture
+def scene():
+    bpy = sys.modules["bpy"]
+    yield bpy
+    for collection in (bpy.data.images, bpy.data.materials, bpy.data.objects):
+        collection.clear()
+
+
+def texture_files(stand_in, asset_id, maps):
+    """Serve {map_type: content} as a 1k jpg texture under /files/<asset_id>"""
+    listing = {}
+    for map_type, content in maps.items():
+        path = f"/dl/{asset_id}_{map_type}.jpg"
+        stand_in.route("GET", path, (200, content))
+        listing[map_type] = {"1k": {"jpg": {"url": stand_in.url + path}}}
+    stand_in.route("GET", f"/files/{asset_id}", (200, listing))
+
+
+def test_set_texture_finds_maps_reused_from_another_asset(addon, addon_server, stand_in, scene, monkeypatch):
+    monkeypatch.setattr(addon, "POLYHAVEN_API_URL", stand_in.url)
+    texture_files(stand_in, "brick_a", {"diffuse": b"red bricks", "nor_gl": b"shared normal map"})
+    texture_files(stand_in, "brick_b", {"diffuse": b"grey bricks", "nor_gl": b"shared normal map"})
+    scene.data.objects.add(scene.ID("Cube", data=types.SimpleNamespace(materials=_MaterialSlots()),
+                                    select_set=lambda state: None))
+
+    client = addon_server.client()
+    try:
+        first = client.call("download_polyhaven_asset",
+                            {"asset_id": "brick_a", "asset_type": "textures", "wait": True})
+        second = client.call("download_polyhaven_asset",
+                             {"asset_id": "brick_b", "asset_type": "textures", "wait": True})
+        applied = client.call("set_texture", {"object_name": "Cube", "texture_id": "brick_b"})
+    finally:
+        client.close()
+
+    assert first["result"]["reused_maps"] == []
+    # The normal map was loaded once, under brick_a's name
+    assert second["result"]["reused_maps"] == ["nor_gl"]
+    assert sorted(image.name for image in scene.data.images) == [
+        "brick_a_diffuse.jpg", "brick_a_nor_gl.jpg", "brick_b_diffuse.jpg",
+    ]
+
+    assert applied["status"] == "success"
+    result = applied["result"]
+    assert sorted(result["maps"]) == ["diffuse", "nor_gl"]
+    assert sorted(node["image"] for node in result["material_info"]["texture_nodes"]) == [
+        "brick_a_nor_gl.jpg", "brick_b_diffuse.jpg",
+    ]
+    assert [material.name for material in scene.data.objects["Cube"].data.materials] == [result["material"]]
+
+
+def test_set_texture_falls_back_to_image_names(addon_server, scene):
+    """Textures imported before materials recorded their maps"""
+    scene.data.images.add(scene.Image("old_tiles_diffuse.jpg"))
+    scene.data.images.add(scene.Image("old_tiles_rough.jpg"))
+
+    assert sorted(addon_server._texture_images("old_tiles")) == ["diffuse", "rough"]
+    assert addon_server._texture_images("missing") == {}
+
+
+def test_shared_images_keep_their_color_space(addon, addon_server, stand_in, scene, monkeypatch):
+    monkeypatch.setattr(addon, "POLYHAVEN_API_URL", stand_in.url)
+    monkeypatch.setattr(scene.Image, "reload", lambda image: pytest.fail(f"{image.name} was reloaded"))
+    # One file is a colour map in one texture and a data map in the other
+    texture_files(stand_in, "plaster", {"diffuse": b"grey noise"})
+    texture_files(stand_in, "concrete", {"rough": b"grey noise"})
+    scene.data.objects.add(scene.ID("Wall", data=types.SimpleNamespace(materials=_MaterialSlots()),
+                                    select_set=lambda state: None))
+
+    client = addon_server.client()
+    try:
+        for asset_id in ("plaster", "concrete"):
+            reply = client.call("download_polyhaven_asset",
+                                {"asset_id": asset_id, "asset_type": "textures", "wait": True})
+            assert reply["result"]["reused_maps"] == []
+        for asset_id in ("concrete", "plaster"):
+            assert client.call("set_texture", {"object_name": "Wall", "texture_id": asset_id})["status"] == "success"
+    finally:
+        client.close()
+
+    images = {image.name: image.colorspace_settings.name for image in scene.data.images}
+    assert images == {"plaster_diffuse.jpg": "sRGB", "concrete_rough.jpg": "Non-Color"}
+
+    # With the data copy gone, set_texture makes a new one rather than switch the colour map
+    scene.data.images.remove(scene.data.images["concrete_rough.jpg"])
+    rough = addon_server._texture_images("concrete")["rough"]
+    assert rough.colorspace_settings.name == "Non-Color"
+    assert scene.data.images["plaster_diffuse.jpg"].colorspace_settings.name == "sRGB"
+    assert rough is not scene.data.images["plaster_diffuse.jpg"]
+    assert addon_server._texture_images("concrete")["rough"] is rough
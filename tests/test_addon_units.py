@@ -0,0 +1,270 @@
+"""
+Tests for the pure-Python building blocks of assets/blender-mcp-addon.py
+"""
+
+import hashlib
+import json
+import os
+import struct
+import threading
+import time
+import zlib
+
+import numpy as np
+import pytest
+
+
+def test_frame_decoder_legacy_split_and_pipelined(addon):
+    decoder = addon.FrameDecoder()
+    first = json.dumps({"type": "a", "params": {"text": 'brace } and "quote" \\ inside'}}).encode()
+    second = json.dumps({"type": "b"}).encode()
+    stream = first + b"\n" + second
+    # One byte per recv(): a frame may end anywhere, even inside an escape
+    frames = []
+    for index in range(len(stream)):
+        decoder.feed(stream[index:index + 1])
+        while (frame := decoder.next_frame()) is not None:
+            frames.append(frame)
+    assert frames == [first, second]
+    assert decoder.buffer == bytearray()
+
+
+def test_frame_decoder_ndjson_and_length(addon):
+    decoder = addon.FrameDecoder(addon.FRAMING_NDJSON)
+    decoder.feed(b'{"a": 1}\n\n{"b"')
+    assert decoder.next_frame() == b'{"a": 1}'
+    assert decoder.next_frame() is None
+    decoder.feed(b': 2}\n')
+    assert decoder.next_frame() == b'{"b": 2}'
+
+    decoder.set_framing(addon.FRAMING_LENGTH)
+    payload = b'{"c": 3}'
+    decoder.feed(struct.pack(">I", len(payload)) + payload[:3])
+    assert decoder.next_frame() is None
+    decoder.feed(payload[3:])
+    assert decoder.next_frame() == payload
+    assert addon.encode_frame(payload, addon.FRAMING_LENGTH) == struct.pack(">I", len(payload)) + payload
+
+
+def test_frame_decoder_rejects_garbage_and_oversized_frames(addon):
+    decoder = addon.FrameDecoder()
+    decoder.feed(b"not json")
+    with pytest.raises(addon.FramingError):
+        decoder.next_frame()
+
+    decoder = addon.FrameDecoder(addon.FRAMING_LENGTH, max_frame_size=16)
+    decoder.feed(struct.pack(">I", 17))
+    with pytest.raises(addon.FramingError, match="exceeds limit"):
+        decoder.next_frame()
+    with pytest.raises(addon.FramingError):
+        decoder.set_framing("xml")
+
+
+def store(cache, tmp_path, key, content, ext=".jpg"):
+    tmp = tmp_path / f"upload-{len(cache.entries)}"
+    tmp.write_bytes(content)
+    return cache.store(key, str(tmp), hashlib.sha256(content).hexdigest(), ext)
+
+
+def test_asset_cache_hit_deduplication_and_persistence(addon, tmp_path):
+    cache = addon.AssetCache(str(tmp_path / "cache"), max_bytes=1024 * 1024)
+    first = addon.AssetCache.make_key("polyhaven", "brick", "1k", "jpg", "diffuse")
+    second = addon.AssetCache.make_key("polyhaven", "brick_2", "1k", "jpg", "diffuse")
+    store(cache, tmp_path, first, b"same bytes")
+    store(cache, tmp_path, second, b"same bytes")
+    assert cache.lookup(first) == cache.lookup(second)
+
+    result = cache.get(first, str(tmp_path / "out" / "diffuse.jpg"))
+    assert result["cache"] == "hit"
+    assert (tmp_path / "out" / "diffuse.jpg").read_bytes() == b"same bytes"
+    assert cache.status()["size_bytes"] == len(b"same bytes")
+
+    reopened = addon.AssetCache(str(tmp_path / "cache"))
+    assert reopened.contains(first) and reopened.contains(second)
+
+
+def test_asset_cache_drops_corrupt_blobs_and_evicts_lru(addon, tmp_path):
+    cache = addon.AssetCache(str(tmp_path / "cache"), max_bytes=250)
+    keys = [addon.AssetCache.make_key("polyhaven", name, "1k", "jpg") for name in ("a", "b", "c")]
+    store(cache, tmp_path, keys[0], b"a" * 100)
+    store(cache, tmp_path, keys[1], b"b" * 100)
+    cache.entries[keys[0]]["last_access"] = 0  # keys[1] is now the most recently used
+    store(cache, tmp_path, keys[2], b"c" * 100)
+    assert not cache.contains(keys[0])
+    assert cache.contains(keys[1]) and cache.contains(keys[2])
+    assert cache.status()["evictions"] == 1
+
+    with open(cache.lookup(keys[1]), "wb") as f:
+        f.write(b"tampered")
+    assert cache.get(keys[1], str(tmp_path / "b.jpg")) is None
+    assert cache.status()["corrupt"] == 1
+    assert not cache.contains(keys[1])
+
+
+
+def test_asset_cache_hits_skip_rehash_and_batch_index_writes(addon, tmp_path, monkeypatch):
+    cache = addon.AssetCache(str(tmp_path / "cache"), max_bytes=1024 * 1024)
+    key = addon.AssetCache.make_key("polyhaven", "brick", "1k", "jpg")
+    store(cache, tmp_path, key, b"brick")
+    hashed, saves = [], []
+    monkeypatch.setattr(cache, "_hash_file", lambda path: hashed.append(path) or hashlib.sha256(b"brick").hexdigest())
+    original_save = cache._save_index
+    monkeypatch.setattr(cache, "_save_index", lambda: saves.append(1) or original_save())
+    monkeypatch.setattr(cache, "INDEX_SAVE_HITS", 3)
+
+    for n in range(5):
+        assert cache.get(key, str(tmp_path / f"out{n}.jpg"))["cache"] == "hit"
+    assert hashed == [] and len(saves) == 1
+    cache.flush()
+    assert len(saves) == 2
+    reopened = addon.AssetCache(str(tmp_path / "cache"))
+    assert reopened.entries[key]["last_access"] == cache.entries[key]["last_access"]
+
+    # A blob touched since it was stored is hashed once more, then trusted again
+    blob = cache.lookup(key)
+    stat = os.stat(blob)
+    os.utime(blob, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert cache.lookup(key) == blob and cache.lookup(key) == blob
+    assert hashed == [blob]
+
+
+def test_asset_cache_get_and_eviction_do_not_race(addon, tmp_path, monkeypatch):
+    cache = addon.AssetCache(str(tmp_path / "cache"), max_bytes=150)
+    old, new = (addon.AssetCache.make_key("polyhaven", name, "1k", "jpg") for name in ("old", "new"))
+    store(cache, tmp_path, old, b"o" * 100)
+    materialize = cache._materialize
+    storing = []
+
+    def slow_materialize(blob_path, dest_path):
+        # A download finishing now evicts the entry being read
+        if not storing:
+            storing.append(threading.Thread(target=store, args=(cache, tmp_path, new, b"n" * 100)))
+            storing[0].start()
+            time.sleep(0.1)
+        materialize(blob_path, dest_path)
+
+    monkeypatch.setattr(cache, "_materialize", slow_materialize)
+    assert cache.get(old, str(tmp_path / "old.jpg"))["cache"] == "hit"
+    storing[0].join()
+    assert (tmp_path / "old.jpg").read_bytes() == b"o" * 100
+    assert not cache.contains(old) and cache.contains(new)
+
+
+CATALOG = {
+    "red_brick": {"name": "Red Brick", "type": 1, "tags": ["brick", "wall"], "categories": ["man made"],
+                  "download_count": 50},
+    "brick_floor": {"name": "Brick Floor", "type": 1, "tags": ["brick", "floor"], "categories": ["floor"],
+                    "download_count": 80},
+    "sunset_sky": {"name": "Sunset Sky", "type": 0, "tags": ["sky"], "categories": ["outdoor"],
+                   "download_count": 10},
+}
+
+
+def test_polyhaven_catalog_search_and_conditional_refresh(addon, stand_in, tmp_path):
+    def assets(request):
+        if request.headers.get("If-None-Match") == '"v1"':
+            return 304, b""
+        return 200, CATALOG, {"ETag": '"v1"'}
+
+    stand_in.route("GET", "/assets", assets)
+    catalog = addon.PolyHavenCatalog(str(tmp_path / "catalog.json"), ttl=3600, api_url=stand_in.url)
+
+    page = catalog.search(asset_type="textures", query="bri", limit=1)
+    assert list(page["assets"]) == ["brick_floor"]  # Most downloaded first
+    assert (page["total_count"], page["next_offset"]) == (2, 1)
+    assert list(catalog.search(tags="brick,wall")["assets"]) == ["red_brick"]
+    assert list(catalog.search(query="sky sun")["assets"]) == ["sunset_sky"]
+    assert catalog.search(query="marble")["total_count"] == 0
+    # Answered from memory within the ttl
+    assert len(stand_in.hits("GET", "/assets")) == 1
+
+    assert catalog.refresh(force=True)
+    assert catalog.status()["not_modified"] == 1
+    reloaded = addon.PolyHavenCatalog(str(tmp_path / "catalog.json"), api_url=stand_in.url)
+    assert reloaded.status()["asset_count"] == 3
+    assert reloaded.etag == '"v1"'
+
+
+def test_histogram_quantiles(addon):
+    histogram = addon.Histogram((1, 10, 100))
+    assert histogram.quantile(0.5) == 0.0
+    for value in [0.5] * 50 + [5] * 45 + [50] * 5:
+        histogram.observe(value)
+    summary = histogram.summary()
+    assert summary["count"] == 100
+    assert summary["mean"] == pytest.approx((25 + 225 + 250) / 100)
+    assert 0.5 <= summary["p50"] <= 1
+    assert 1 <= summary["p95"] <= 10
+    assert 10 <= summary["p99"] <= 50
+    assert summary["max"] == 50
+    histogram.observe(1000)
+    assert histogram.counts[-1] == 1
+    assert histogram.quantile(1.0) == 1000
+
+
+def test_fair_command_queue_priorities_and_round_robin(addon):
+    queue = addon.FairCommandQueue()
+    for index in range(3):
+        queue.push("flood", f"flood-{index}", "normal", index)
+    queue.push("quiet", "quiet-0", "normal", 10)
+    queue.push("quiet", "urgent", "high", 11)
+    queue.push("flood", "later", "low", 12)
+    assert len(queue) == 6
+    assert queue.client_depth("flood") == 4
+    assert queue.oldest_enqueued_at() == 0
+
+    order = []
+    while (entry := queue.pop()) is not None:
+        order.append(entry[1])
+    assert order == ["urgent", "flood-0", "quiet-0", "flood-1", "flood-2", "later"]
+    assert len(queue) == 0 and queue.clients == {}
+
+
+def test_code_output_keeps_head_and_tail_and_streams(addon, monkeypatch):
+    monkeypatch.setattr(addon, "STREAM_FLUSH_CHARS", 4)
+    emitted = []
+    output = addon.CodeOutput(max_chars=10, emit=emitted.append)
+    for chunk in ("abc", "defgh", "ijklmnop", "qrstuvwxyz"):
+        output.write(chunk)
+    output.flush()
+    assert output.truncated
+    assert output.getvalue() == "abcde\n... [16 characters truncated] ...\nvwxyz"
+    assert "".join(emitted) == "abcdefghijklmnopqrstuvwxyz"
+    assert max(len(text) for text in emitted) <= 4
+
+    short = addon.CodeOutput(max_chars=100)
+    short.write("hello\n")
+    assert short.getvalue() == "hello\n" and not short.truncated
+
+
+def decode_png(data):
+    """Minimal decoder for the RGBA, filter-0 PNGs encode_png writes"""
+    assert data[:8] == b"\x89PNG\r\n\x1a\n"
+    position, chunks = 8, {}
+    while position < len(data):
+        (length,) = struct.unpack(">I", data[position:position + 4])
+        tag = data[position + 4:position + 8]
+        body = data[position + 8:position + 8 + length]
+        (crc,) = struct.unpack(">I", data[position + 8 + length:position + 12 + length])
+        assert crc == zlib.crc32(tag + body) & 0xffffffff
+        chunks[tag] = body
+        position += 12 + length
+    width, height, depth, color_type = struct.unpack(">IIBB", chunks[b"IHDR"][:10])
+    assert (depth, color_type) == (8, 6)
+    raw = np.frombuffer(zlib.decompress(chunks[b"IDAT"]), dtype=np.uint8).reshape(height, width * 4 + 1)
+    assert not raw[:, 0].any()
+    return raw[:, 1:].reshape(height, width, 4)
+
+
+def test_encode_png_round_trip(addon):
+    pixels = np.random.default_rng(7).integers(0, 256, size=(5, 3, 4), dtype=np.uint8)
+    assert np.array_equal(decode_png(addon.encode_png(pixels)), pixels)
+
+
+def test_code_output_with_tiny_limits(addon):
+    for max_chars in (0, 1):
+        output = addon.CodeOutput(max_chars=max_chars)
+        output.write("abc")
+        output.write("def")
+        assert output.truncated
+        assert output.getvalue().startswith("\n... [")
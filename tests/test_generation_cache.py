@@ -0,0 +1,158 @@
+"""
+Tests for the generation result cache in scripts/blender-mcp-server.py
+"""
+
+import asyncio
+import json
+import os
+
+
+def run(coroutine):
+    return asyncio.run(asyncio.wait_for(coroutine, 60))
+
+
+def edit_generator(project, old, new):
+    path = project / "scripts" / "generate_all_animals.py"
+    source = path.read_text()
+    assert old in source
+    path.write_text(source.replace(old, new))
+
+
+def glb(project, species_id, quality_level="mobile"):
+    return (project / "exports" / species_id / f"{species_id}_{quality_level}.glb").read_text()
+
+
+def test_cache_keys_follow_species_entry_and_code(server_module, blender_project):
+    definitions = server_module.load_generator_definitions(str(blender_project / "scripts"))
+    dog = server_module.generation_cache_key(definitions, "dog", "mobile")
+    horse = server_module.generation_cache_key(definitions, "horse", "mobile")
+    assert dog != server_module.generation_cache_key(definitions, "dog", "desktop")
+
+    edit_generator(blender_project, "'dog': {'template': 'quadruped_medium', 'features': []}",
+                   "'dog': {'template': 'quadruped_medium', 'features': ['collar']}")
+    edited = server_module.load_generator_definitions(str(blender_project / "scripts"))
+    assert server_module.generation_cache_key(edited, "dog", "mobile") != dog
+    assert server_module.generation_cache_key(edited, "horse", "mobile") == horse
+
+    edit_generator(blender_project, 'BUILD_TAG = "v1"', 'BUILD_TAG = "v2"')
+    recoded = server_module.load_generator_definitions(str(blender_project / "scripts"))
+    assert server_module.generation_cache_key(recoded, "horse", "mobile") != horse
+
+
+def test_cache_hit_force_and_missing_file(server_module, blender_project):
+    async def scenario():
+        server = server_module.BlenderMCPServer(workers=1)
+        await server.worker_pool.start()
+        try:
+            results = [await server.generate_single_animal({"species_id": "dog"}),
+                       await server.generate_single_animal({"species_id": "dog"}),
+                       await server.generate_single_animal({"species_id": "dog", "force": True})]
+            (blender_project / "exports" / "dog" / "dog_mobile.glb").unlink()
+            results.append(await server.generate_single_animal({"species_id": "dog"}))
+            return results, server.worker_pool.status()["jobs"]
+        finally:
+            await server.worker_pool.stop()
+
+    (first, hit, forced, partial), jobs = run(scenario())
+    assert first["cached"] is False
+    assert hit["cached"] is True
+    assert hit["cache_hits"] == ["mobile", "desktop"]
+    assert forced["cached"] is False
+    # Only the deleted quality level went back to Blender
+    assert partial["cache_hits"] == ["desktop"]
+    assert partial["quality_levels"] == ["mobile"]
+    assert jobs == 3
+
+
+def test_outputs_without_glb_are_not_cached(server_module, blender_project):
+    async def scenario():
+        server = server_module.BlenderMCPServer(workers=0)
+        return [await server.generate_single_animal({"species_id": "goldfish"}) for _ in range(2)]
+
+    first, second = run(scenario())
+    assert first["status"] == second["status"] == "completed"
+    assert second["cached"] is False
+
+
+def test_generator_edit_replaces_warm_worker_before_caching(server_module, blender_project):
+    """A worker that preloaded the old generator must not stamp its output with new keys"""
+    async def scenario():
+        server = server_module.BlenderMCPServer(workers=1)
+        await server.worker_pool.start()
+        try:
+            await server.generate_single_animal({"species_id": "dog"})
+            old_pid = server.worker_pool.status()["workers"][0]["pid"]
+            edit_generator(blender_project, 'BUILD_TAG = "v1"', 'BUILD_TAG = "v2"')
+            rebuilt = await server.generate_single_animal({"species_id": "dog"})
+            again = await server.generate_single_animal({"species_id": "dog"})
+            return rebuilt, again, old_pid, server.worker_pool.status()
+        finally:
+            await server.worker_pool.stop()
+
+    rebuilt, again, old_pid, status = run(scenario())
+    assert rebuilt["cached"] is False
+    assert glb(blender_project, "dog").startswith("v2:")
+    assert again["cached"] is True
+    assert old_pid not in [worker["pid"] for worker in status["workers"]]
+
+
+def test_output_from_stale_worker_is_not_recorded(server_module, blender_project):
+    async def scenario():
+        server = server_module.BlenderMCPServer(workers=1)
+        await server.worker_pool.start()
+        try:
+            keyed_with = server._generator()["file_sha256"]
+            # A reply built by a worker that loaded some other version
+            assert not server._generator_unchanged(keyed_with, "0" * 64)
+            assert server._generator_unchanged(keyed_with, keyed_with)
+            edit_generator(blender_project, 'BUILD_TAG = "v1"', 'BUILD_TAG = "v3"')
+            # Script edited while the job ran
+            assert not server._generator_unchanged(keyed_with)
+        finally:
+            await server.worker_pool.stop()
+
+    run(scenario())
+
+
+def test_mass_generation_skips_cached_species(server_module, blender_project):
+    async def scenario():
+        server = server_module.BlenderMCPServer(workers=0, max_concurrent_jobs=2)
+        species = ["horse", "dog", "cat"]
+        first = await server.generate_all_animals({"species": species, "parallel": True})
+        second = await server.generate_all_animals({"species": species, "parallel": True})
+        edit_generator(blender_project, "'cat': {'template': 'quadruped_small', 'features': []}",
+                       "'cat': {'template': 'quadruped_small', 'features': ['whiskers']}")
+        third = await server.generate_all_animals({"species": species, "parallel": True})
+        return first, second, third
+
+    first, second, third = run(scenario())
+    assert first["status"] == "completed" and first["cached"] == []
+    assert second["cached"] == ["cat", "dog", "horse"]
+    assert third["cached"] == ["dog", "horse"]
+    index = json.loads((blender_project / "exports" / "cat" / ".generation_cache.json").read_text())
+    assert set(index) == {"mobile", "desktop"}
+
+
+def test_cold_run_rebuilds_only_changed_outputs(server_module, blender_project):
+    async def scenario():
+        server = server_module.BlenderMCPServer(workers=0)
+        results = [await server.generate_single_animal({"species_id": "dog"})]
+        # Same size, different content: only the hash can tell
+        mobile = blender_project / "exports" / "dog" / "dog_mobile.glb"
+        mobile.write_text(mobile.read_text().replace("dog", "cat"))
+        desktop = blender_project / "exports" / "dog" / "dog_desktop.glb"
+        os.utime(desktop, ns=(0, 0))
+        results.append(await server.generate_single_animal({"species_id": "dog"}))
+        results.append(await server.generate_single_animal({"species_id": "dog"}))
+        return results, desktop.stat().st_mtime_ns
+
+    (first, rebuilt, hit), desktop_mtime = run(scenario())
+    # The intact level was left alone
+    assert desktop_mtime == 0
+    assert first["cached"] is False and first["cache_hits"] == []
+    assert rebuilt["cached"] is False
+    assert rebuilt["cache_hits"] == ["desktop"] and rebuilt["quality_levels"] == ["mobile"]
+    assert glb(blender_project, "dog") == "v1:dog:mobile"
+    assert hit["cached"] is True and hit["cache_hits"] == ["mobile", "desktop"]
+    index = json.loads((blender_project / "exports" / "dog" / ".generation_cache.json").read_text())
+    assert all(len(entry["sha256"]) == 64 for entry in index.values())
@@ -0,0 +1,238 @@
+"""
+Tests for the WebSocket generation server (scripts/blender-mcp-server.py)
+"""
+
+import asyncio
+import json
+import os
+
+import websockets
+
+
+def run(coroutine):
+    return asyncio.run(asyncio.wait_for(coroutine, 60))
+
+
+class RunningServer:
+    """BlenderMCPServer listening on a free localhost port"""
+
+    def __init__(self, module, **kwargs):
+        self.server = module.BlenderMCPServer(host='127.0.0.1', port=0, **kwargs)
+        self.websocket_server = None
+        self.request_id = 0
+        self.replies = {}  # Replies that arrived while call() waited for another one
+
+    async def __aenter__(self):
+        self.websocket_server = await self.server.start_server()
+        port = next(iter(self.websocket_server.sockets)).getsockname()[1]
+        self.url = f"ws://127.0.0.1:{port}"
+        return self
+
+    async def __aexit__(self, *exc):
+        self.websocket_server.close()
+        for runner in self.server.job_runners:
+            runner.cancel()
+        for job in self.server.active_jobs.values():
+            if job.task:
+                job.task.cancel()
+        if self.server.worker_pool:
+            await self.server.worker_pool.stop()
+
+    async def send(self, websocket, method, params=None):
+        """Send one request and return its id"""
+        self.request_id += 1
+        await websocket.send(json.dumps({"id": self.request_id, "method": method, "params": params or {}}))
+        return self.request_id
+
+    async def reply(self, websocket, request_id):
+        """The result for request_id, skipping notifications"""
+        while request_id not in self.replies:
+            message = json.loads(await websocket.recv())
+            if "id" in message:
+                self.replies[message["id"]] = message["result"]
+        return self.replies.pop(request_id)
+
+    async def call(self, websocket, method, params=None):
+        return await self.reply(websocket, await self.send(websocket, method, params))
+
+
+def test_server_imports_and_answers_health_check(server_module, blender_project):
+    async def scenario():
+        async with RunningServer(server_module, workers=0) as running:
+            async with websockets.connect(running.url) as websocket:
+                return await running.call(websocket, "health_check")
+
+    result = run(scenario())
+    assert result["status"] == "healthy"
+    assert result["workers"] is None
+
+
+def test_generate_single_animal_on_warm_worker(server_module, blender_project):
+    async def scenario():
+        async with RunningServer(server_module, workers=1) as running:
+            async with websockets.connect(running.url) as websocket:
+                first = await running.call(websocket, "generate_single_animal", {"species_id": "dog", "wait": True})
+                second = await running.call(websocket, "generate_single_animal",
+                                            {"species_id": "cat", "wait": True})
+                health = await running.call(websocket, "health_check")
+            return first, second, health
+
+    first, second, health = run(scenario())
+    assert first["status"] == "completed"
+    assert first["result"]["species_id"] == "dog"
+    assert second["status"] == "completed"
+    assert (blender_project / "exports" / "dog" / "dog_mobile.glb").is_file()
+    # Both jobs ran in the same warm process
+    workers = health["workers"]
+    assert workers["started"] == 1
+    assert workers["jobs"] == 2
+    assert workers["workers"][0]["jobs_done"] == 2
+
+
+def test_generator_exception_fails_job_but_keeps_worker(server_module, blender_project):
+    async def scenario():
+        server = server_module.BlenderMCPServer(workers=1)
+        await server.worker_pool.start()
+        try:
+            failed = await server.generate_single_animal({"species_id": "crash"})
+            completed = await server.generate_single_animal({"species_id": "dog"})
+            return failed, completed, server.worker_pool.status()
+        finally:
+            await server.worker_pool.stop()
+
+    failed, completed, status = run(scenario())
+    assert failed["status"] == "failed"
+    assert "generator crashed" in failed["error"]
+    assert completed["status"] == "completed"
+    assert status["recycled"] == 0
+
+
+def test_worker_recycled_after_max_jobs(server_module, blender_project):
+    async def scenario():
+        pool = server_module.BlenderWorkerPool(
+            1, os.environ["BLENDER_PATH"], str(blender_project / "scripts" / "blender_worker.py"),
+            str(blender_project / "scripts"), str(blender_project), max_jobs=2,
+        )
+        await pool.start()
+        try:
+            jobs_done = []
+            for species_id in ("dog", "cat", "horse"):
+                reply = await pool.run({"id": species_id, "species_id": species_id,
+                                        "export_path": str(blender_project / "exports")})
+                assert reply["status"] == "completed"
+                jobs_done.append(reply["jobs_done"])
+            return jobs_done, pool.status()
+        finally:
+            await pool.stop()
+
+    jobs_done, status = run(scenario())
+    assert jobs_done == [1, 2, 1]
+    assert status["recycled"] == 1
+    assert status["started"] == 2
+
+
+def test_job_timeout_kills_and_replaces_worker(server_module, blender_project):
+    async def scenario():
+        pool = server_module.BlenderWorkerPool(
+            1, os.environ["BLENDER_PATH"], str(blender_project / "scripts" / "blender_worker.py"),
+            str(blender_project / "scripts"), str(blender_project), job_timeout=1,
+        )
+        await pool.start()
+        try:
+            try:
+                await pool.run({"id": "slow", "species_id": "slow"})
+            except server_module.WorkerError as e:
+                error = str(e)
+            reply = await pool.run({"id": "dog", "species_id": "dog",
+                                    "export_path": str(blender_project / "exports")})
+            return error, reply, pool.status()
+        finally:
+            await pool.stop()
+
+    error, reply, status = run(scenario())
+    assert "timed out" in error
+    assert reply["status"] == "completed"
+    assert status["failed"] == 1
+    assert status["recycled"] == 1
+
+
+def test_cold_process_without_pool(server_module, blender_project):
+    async def scenario():
+        server = server_module.BlenderMCPServer(workers=0)
+        return await server.generate_single_animal({"species_id": "horse"})
+
+    result = run(scenario())
+    assert result["status"] == "completed"
+    assert (blender_project / "exports" / "horse" / "horse_desktop.glb").is_file()
+
+
+def test_get_generation_status_log_lines(server_module, blender_project):
+    async def scenario():
+        async with RunningServer(server_module, workers=1) as running:
+            async with websockets.connect(running.url) as websocket:
+                job = await running.call(websocket, "generate_single_animal", {"species_id": "dog", "wait": True})
+                replies = {}
+                for log_lines in (2, 0, "5", -1, 1.5, True):
+                    replies[repr(log_lines)] = await running.call(
+                        websocket, "get_generation_status", {"job_id": job["job_id"], "log_lines": log_lines})
+                return replies
+
+    replies = run(scenario())
+    assert len(replies["2"]["log_tail"]) == 2
+    assert "log_tail" not in replies["0"]
+    for bad in ("'5'", "-1", "1.5", "True"):
+        assert replies[bad] == {"error": "log_lines must be a non-negative integer"}
+
+
+def test_waiting_request_does_not_block_the_client_and_cancel_reports_progress(server_module, blender_project):
+    async def scenario():
+        async with RunningServer(server_module, workers=1) as running:
+            async with websockets.connect(running.url) as websocket:
+                waiting = await running.send(websocket, "generate_single_animal", {"species_id": "slow", "wait": True})
+                # The same connection keeps getting answers while the job runs
+                while True:
+                    jobs = await running.call(websocket, "list_jobs")
+                    if jobs["counts"].get("running"):
+                        break
+                    await asyncio.sleep(0.05)
+                job_id = jobs["jobs"][0]["job_id"]
+                cancel = await running.call(websocket, "cancel_job", {"job_id": job_id})
+                final = await running.reply(websocket, waiting)
+                status = await running.call(websocket, "get_generation_status", {"job_id": job_id})
+            return cancel, final, status
+
+    cancel, final, status = run(scenario())
+    assert (cancel["status"], cancel["cancelled"]) == ("cancelling", True)
+    assert final["status"] == status["status"] == "cancelled"
+
+
+def test_worker_pool_defaults_to_one_worker_per_concurrent_job(server_module, blender_project):
+    server = server_module.BlenderMCPServer(max_concurrent_jobs=3)
+    assert server.worker_pool.size == 3 and server.max_concurrent_jobs == 3
+    # An explicitly smaller pool still caps how many jobs run at once
+    assert server_module.BlenderMCPServer(workers=2, max_concurrent_jobs=3).max_concurrent_jobs == 2
+    assert server_module.BlenderMCPServer(workers=0, max_concurrent_jobs=3).worker_pool is None
+
+
+def test_generate_all_animals_is_serial_unless_asked(server_module, blender_project):
+    exports = blender_project / "exports"
+
+    def exported():
+        return sorted(path.name for path in exports.glob("*/*.glb"))
+
+    async def scenario():
+        server = server_module.BlenderMCPServer(workers=0)
+        parallel = await server.generate_all_animals(
+            {"parallel": True, "species": ["horse", "dog"], "quality_levels": ["desktop"], "shards": 2})
+        after_parallel = exported()
+        serial = await server.generate_all_animals({"quality_levels": ["mobile"]})
+        return parallel, after_parallel, serial
+
+    parallel, after_parallel, serial = run(scenario())
+    assert parallel["status"] == "completed" and (parallel["mode"], parallel["shards"]) == ("processes", 2)
+    # The shards exported only the quality level asked for
+    assert after_parallel == ["dog_desktop.glb", "horse_desktop.glb"]
+    assert serial == {"status": "completed", "message": "All animals generated"}
+    assert exported() == [
+        "cat_mobile.glb", "dog_desktop.glb", "dog_mobile.glb", "horse_desktop.glb", "horse_mobile.glb",
+    ]
@@ -0,0 +1,46 @@
+"""
+Tests for the client connection helper in scripts/mcp_connection.py
+"""
+
+import socket
+
+import pytest
+
+from conftest import SCRIPTS, load_script
+
+
+@pytest.fixture
+def mcp_connection():
+    return load_script("mcp_connection", SCRIPTS / "mcp_connection.py")
+
+
+@pytest.fixture
+def tcp_listener():
+    listener = socket.create_server(("127.0.0.1", 0))
+    yield listener
+    listener.close()
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="needs Unix domain sockets")
+def test_connect_prefers_unix_socket(mcp_connection, tcp_listener, tmp_path):
+    path = str(tmp_path / "blendermcp.sock")
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(path)
+    listener.listen()
+    try:
+        sock = mcp_connection.connect("127.0.0.1", tcp_listener.getsockname()[1], path, timeout=5)
+        sock.close()
+    finally:
+        listener.close()
+
+    assert sock.family == socket.AF_UNIX
+
+
+def test_connect_falls_back_to_tcp(mcp_connection, tcp_listener, tmp_path):
+    # A stale socket file left behind by a Blender that has exited
+    stale = tmp_path / "blendermcp.sock"
+    stale.touch()
+    for socket_path in (str(tmp_path / "missing.sock"), str(stale), None):
+        sock = mcp_connection.connect("127.0.0.1", tcp_listener.getsockname()[1], socket_path, timeout=5)
+        sock.close()
+        assert sock.family == socket.AF_INET